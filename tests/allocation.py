@@ -0,0 +1,210 @@
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date
+from hotel_system import BookingResult
+
+# A booking request for any room of a type
+Reservation = namedtuple("Reservation", "guest_name room_type start_date end_date")
+
+
+class _Gaps:
+    # Free windows [start, end) of a set of rooms, sorted by start, for a sweep over reservations
+    # in end date order. A reservation takes the window starting latest at or before its start
+    # (stranding the fewest idle nights in front of it) and, among windows starting then, the one
+    # ending soonest after it. Later reservations end no earlier, so what is left in front of it,
+    # and any window ending before it ends, can never be used again and is dropped; what is left
+    # after it goes back in as a new window. Windows passed over on the way are too short and are
+    # dropped, which keeps the sweep close to O(n log n).
+    def __init__(self):
+        self.starts = []
+        self.windows = []
+
+    def add(self, start, end, room):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.windows.insert(i, (start, end, room))
+
+    def take(self, start, end):
+        starts, windows = self.starts, self.windows
+        best = None
+        j = bisect_right(starts, start) - 1
+        while j >= 0:
+            window_start, window_end, room = windows[j]
+            if best is not None and window_start != windows[best][0]:
+                break
+            if window_end < end:
+                # Too short for this or any later reservation
+                del starts[j]
+                del windows[j]
+                if best is not None:
+                    best -= 1
+            elif best is None or window_end < windows[best][1]:
+                best = j
+            j -= 1
+        if best is None:
+            return None
+        _, window_end, room = windows[best]
+        del starts[best]
+        del windows[best]
+        if end < window_end:
+            self.add(end, window_end, room)
+        return room
+
+
+_END = date.max.toordinal() + 1  # past any booking
+
+
+def _plan(rooms, fixed, requests):
+    # Assign requests, (start, end, key) triples, to rooms around the fixed bookings of each room
+    # (sorted (start, end) pairs), all on day ordinals. Returns {key: room}; keys missing from it
+    # could not be placed.
+    if not requests:
+        return {}
+    requests = sorted(requests, key=lambda request: (request[1], request[1] - request[0]))
+    first = min(start for start, _, _ in requests)
+    gaps = _Gaps()
+    # Rooms listed first win ties
+    for room in reversed(rooms):
+        previous_end = 0
+        for start, end in fixed.get(room, ()) + [(_END, _END)]:
+            if start > previous_end and start > first:
+                gaps.add(previous_end, start, room)
+            previous_end = max(previous_end, end)
+    plan = {}
+    for start, end, key in requests:
+        room = gaps.take(start, end)
+        if room is not None:
+            plan[key] = room
+    return plan
+
+
+_OPEN = 10 ** 6  # idle nights before the first or after the last booking of a room
+
+
+def _idle(index, start, end, booking):
+    # Idle nights between [start, end) and the nearest other bookings of a room before and after it
+    i = bisect_left(index.starts, end)
+    before = i - 1
+    if before >= 0 and index.bookings[before] is booking:
+        before -= 1
+    idle_before = start - index.ends[before] if before >= 0 else _OPEN
+    idle_after = index.starts[i] - end if i < len(index) else _OPEN
+    return idle_before, idle_after
+
+
+def _stranded(nights, min_nights):
+    return nights if 0 < nights < min_nights else 0
+
+
+class Allocator:
+    # Assigns reservations for a room type to concrete rooms so that the free time left between
+    # bookings comes in as few, as long stretches as possible. Bookings whose IDs are locked are
+    # never moved by reoptimize.
+    def __init__(self, hotel, locked=()):
+        self.hotel = hotel
+        self.locked = set(locked)
+
+    def lock(self, booking_id):
+        self.locked.add(booking_id)
+
+    def unlock(self, booking_id):
+        self.locked.discard(booking_id)
+
+    def _rooms(self, room_type):
+        # Rooms of a type, cheapest first
+        return list(self.hotel.rooms.candidates(room_type=room_type))
+
+    def assign(self, reservations):
+        # Book reservations (Reservation tuples or (guest name, room type, start, end)) into the
+        # best fitting rooms. Returns a BookingResult per reservation, in order.
+        reservations = [Reservation(*reservation) for reservation in reservations]
+        results = [None] * len(reservations)
+        by_type = {}
+        for i, reservation in enumerate(reservations):
+            if reservation.start_date >= reservation.end_date:
+                results[i] = BookingResult(None, Exception("Invalid date range"))
+            else:
+                by_type.setdefault(reservation.room_type, []).append(
+                    (reservation.start_date.toordinal(), reservation.end_date.toordinal(), i))
+        placed = []
+        for room_type, requests in by_type.items():
+            rooms = self._rooms(room_type)
+            first = min(start for start, _, _ in requests)
+            # Only the bookings reaching past the earliest reservation matter
+            fixed = {}
+            for room in rooms:
+                index = room.bookings
+                k = max(index.gap_position(first) - 1, 0)
+                fixed[room] = list(zip(index.starts[k:], index.ends[k:]))
+            plan = _plan(rooms, fixed, requests)
+            placed.extend((i, room) for i, room in plan.items())
+        placed.sort()
+        booked = self.hotel.book_many([(room.number, reservations[i].guest_name, reservations[i].start_date,
+                                        reservations[i].end_date) for i, room in placed], atomic=False)
+        for (i, _), result in zip(placed, booked):
+            results[i] = result
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = BookingResult(None, Exception("No room of the requested type available for the selected dates"))
+        return results
+
+    def reoptimize(self, after_date, room_type=None, min_nights=2):
+        # Move unlocked bookings starting on or after after_date to other rooms of their type where
+        # that leaves fewer stranded nights (free nights in gaps shorter than min_nights), one
+        # update_booking move at a time. Bookings are visited in end date order and each move is
+        # made only if it is a strict improvement, so every step is a valid update and
+        # fragmentation never goes up. Moves keep the booking's price: the guest pays what they were
+        # quoted whichever room of the type they end up in.
+        # Returns the number of moves made.
+        hotel = self.hotel
+        types = [room_type] if room_type is not None else list(dict.fromkeys(room.room_type for room in hotel.rooms))
+        first_day = after_date.toordinal()
+        moved = 0
+        for room_type in types:
+            rooms = self._rooms(room_type)
+            bookings = []
+            for room in rooms:
+                index = room.bookings
+                bookings.extend(booking for booking in index.bookings[bisect_left(index.starts, first_day):]
+                                if booking.booking_id not in self.locked)
+            bookings.sort(key=lambda booking: (booking.end, booking.start))
+            for booking in bookings:
+                start, end = booking.start, booking.end
+                # Stranded nights given back by taking the booking out of its room
+                before, after = _idle(booking.room.bookings, start, end, booking)
+                freed = _stranded(before, min_nights) + _stranded(after, min_nights) - \
+                    _stranded(before + end - start + after, min_nights)
+                best, target = 0, None
+                for room in rooms:
+                    if room is booking.room or not room.is_free(start, end):
+                        continue
+                    before, after = _idle(room.bookings, start, end, None)
+                    added = _stranded(before, min_nights) + _stranded(after, min_nights) - \
+                        _stranded(before + end - start + after, min_nights)
+                    if added - freed < best:
+                        best, target = added - freed, room
+                if target is not None:
+                    hotel.update_booking(booking.booking_id, booking.start_date, booking.end_date, target.number,
+                                         keep_price=True)
+                    moved += 1
+        return moved
+
+    def fragmentation(self, start_date, end_date, min_nights=2, room_type=None):
+        # Free nights in [start_date, end_date) that lie in gaps shorter than min_nights, which no
+        # stay of min_nights or more can use
+        rooms = self._rooms(room_type) if room_type is not None else list(self.hotel.rooms)
+        start, end = start_date.toordinal(), end_date.toordinal()
+        stranded = 0
+        for room in rooms:
+            index = room.bookings
+            for i in range(index.gap_position(start), len(index) + 1):
+                gap_start, gap_end = index.gap(i)
+                gap_start = start if gap_start is None else max(gap_start, start)
+                gap_end = end if gap_end is None else min(gap_end, end)
+                if gap_start >= end:
+                    break
+                nights = gap_end - gap_start
+                # Gaps cut off by the window are not counted as stranded
+                if 0 < nights < min_nights and gap_start > start and gap_end < end:
+                    stranded += nights
+        return stranded
@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+
+class RangeFenwick:
+    # Fenwick tree pair over positions [0, size) supporting "add v to every position in
+    # [first, last)" and "sum of positions [first, last)", both in O(log size)
+    def __init__(self, size):
+        self.size = size
+        self._base = [0] * (size + 1)
+        self._slope = [0] * (size + 1)
+
+    def add(self, first, last, value):
+        if first >= last:
+            return
+        self._update_range(first, value)
+        if last < self.size:
+            self._update_range(last, -value)
+
+    def _update_range(self, i, value):
+        # Adds value to every position from i on
+        base, slope, size = self._base, self._slope, self.size
+        j = i + 1
+        while j <= size:
+            slope[j] += value
+            base[j] -= value * i
+            j += j & -j
+
+    def prefix(self, i):
+        # Sum of positions [0, i)
+        base, slope = self._base, self._slope
+        total_slope = total_base = 0
+        j = i
+        while j > 0:
+            total_slope += slope[j]
+            total_base += base[j]
+            j -= j & -j
+        return total_slope * i + total_base
+
+    def sum(self, first, last):
+        return self.prefix(last) - self.prefix(first)
+
+    def value(self, i):
+        return self.sum(i, i + 1)
+
+
+class Analytics:
+    # Occupied room-nights and revenue per day over a fixed horizon, for the whole hotel, per room
+    # and per room type. Kept current as a Hotel listener; every range total takes O(log days).
+    # A booking's total_price is attributed to its nights in proportion to its room's pricing policy
+    # (quote_nights), so nights charged at a higher rate carry more of it; nights outside the
+    # horizon are not counted. The policy a booking was recorded with is kept until the booking is
+    # removed, so set_pricing in between takes out exactly what was added.
+    def __init__(self, hotel, start_date, horizon_days=366):
+        if horizon_days <= 0:
+            raise Exception("Invalid horizon")
+        self.hotel = hotel
+        self.start_date = start_date
+        self.horizon_days = horizon_days
+        self._trees = {}  # key -> (occupancy tree, revenue tree); keys are None, ("room", n), ("type", t)
+        self._policies = {}  # booking ID -> pricing policy its revenue was attributed with
+        for booking in hotel.bookings.values():
+            self.booking_added(booking)
+        hotel.add_listener(self)
+
+    def detach(self):
+        self.hotel.remove_listener(self)
+
+    def _trees_for(self, key):
+        trees = self._trees.get(key)
+        if trees is None:
+            trees = self._trees[key] = (RangeFenwick(self.horizon_days), RangeFenwick(self.horizon_days))
+        return trees
+
+    def _record(self, room, start, end, total_price, sign, policy):
+        # start and end are day ordinals
+        nights = end - start
+        origin = self.start_date.toordinal()
+        first = max(start - origin, 0)
+        last = min(end - origin, self.horizon_days)
+        if nights <= 0 or first >= last:
+            return
+        rates = policy.quote_nights(room, start, end)
+        total = sum(rates)
+        if not total:
+            rates, total = [1.0] * nights, nights
+        scale = sign * total_price / total
+        # Runs of nights at the same rate are one range update each
+        offset = start - origin
+        runs = []
+        run = first
+        for i in range(first + 1, last + 1):
+            if i == last or rates[i - offset] != rates[run - offset]:
+                runs.append((run, i, rates[run - offset] * scale))
+                run = i
+        for key in (None, ("room", room.number), ("type", room.room_type)):
+            occupancy, revenue = self._trees_for(key)
+            occupancy.add(first, last, sign)
+            for run_first, run_last, nightly in runs:
+                revenue.add(run_first, run_last, nightly)
+
+    def _key(self, room_number, room_type):
+        if room_number is not None and room_type is not None:
+            raise Exception("Filter by room or by room type, not both")
+        if room_number is not None:
+            return ("room", room_number)
+        if room_type is not None:
+            return ("type", room_type)
+        return None
+
+    def _positions(self, start_date, end_date):
+        first = (start_date - self.start_date).days
+        last = (end_date - self.start_date).days
+        if not 0 <= first <= last <= self.horizon_days:
+            raise Exception("Date range outside analytics horizon")
+        return first, last
+
+    def occupancy(self, start_date, end_date, room_number=None, room_type=None):
+        # Occupied room-nights in [start_date, end_date)
+        trees = self._trees.get(self._key(room_number, room_type))
+        first, last = self._positions(start_date, end_date)
+        return trees[0].sum(first, last) if trees else 0
+
+    def revenue(self, start_date, end_date, room_number=None, room_type=None):
+        trees = self._trees.get(self._key(room_number, room_type))
+        first, last = self._positions(start_date, end_date)
+        return trees[1].sum(first, last) if trees else 0
+
+    def daily(self, start_date, end_date, room_number=None, room_type=None):
+        # [(date, occupied rooms, revenue)] for each night in [start_date, end_date)
+        trees = self._trees.get(self._key(room_number, room_type))
+        first, last = self._positions(start_date, end_date)
+        series = []
+        for i in range(first, last):
+            day = self.start_date + timedelta(days=i)
+            series.append((day, trees[0].value(i), trees[1].value(i)) if trees else (day, 0, 0))
+        return series
+
+    # Hotel listener interface
+
+    def booking_added(self, booking):
+        policy = self._policies[booking.booking_id] = booking.room.pricing
+        self._record(booking.room, booking.start, booking.end, booking.total_price, 1, policy)
+
+    def booking_cancelled(self, booking):
+        policy = self._policies.pop(booking.booking_id, booking.room.pricing)
+        self._record(booking.room, booking.start, booking.end, booking.total_price, -1, policy)
+
+    def booking_updated(self, booking, previous):
+        policy = self._policies.pop(booking.booking_id, previous.room.pricing)
+        self._record(previous.room, previous.start, previous.end, previous.total_price, -1, policy)
+        self.booking_added(booking)
+
+    def bookings_archived(self, bookings):
+        # Archived stays keep their revenue and never change again
+        for booking in bookings:
+            self._policies.pop(booking.booking_id, None)
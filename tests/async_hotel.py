@@ -0,0 +1,83 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncHotel:
+    # asyncio facade over a Hotel. All hotel work runs on a single worker thread, so the event loop
+    # never blocks on it and the hotel is only ever touched by one thread.
+    # Identical availability queries that are in flight at the same time share one computation,
+    # and writes are queued and applied in batches of up to batch_size per trip to the worker.
+    def __init__(self, hotel, batch_size=64):
+        self.hotel = hotel
+        self.batch_size = batch_size
+        self.stats = {"queries": 0, "coalesced": 0, "writes": 0, "write_batches": 0}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hotel")
+        self._queries = {}  # (start_date, end_date) -> future of the running query
+        self._writes = []  # Pending (method name, args, future)
+        self._flush_task = None
+
+    async def get_available_rooms(self, start_date, end_date):
+        key = (start_date, end_date)
+        future = self._queries.get(key)
+        if future is None:
+            self.stats["queries"] += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, self.hotel.get_available_rooms, start_date, end_date)
+            self._queries[key] = future
+            future.add_done_callback(lambda _: self._queries.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        # Shield the shared computation from cancellation of any one caller, and hand out copies
+        return list(await asyncio.shield(future))
+
+    async def book_room(self, room_number, guest_name, start_date, end_date):
+        return await self._submit("book_room", room_number, guest_name, start_date, end_date)
+
+    async def cancel_booking(self, booking_id):
+        return await self._submit("cancel_booking", booking_id)
+
+    async def update_booking(self, booking_id, new_start_date, new_end_date, new_room_number=None):
+        return await self._submit("update_booking", booking_id, new_start_date, new_end_date, new_room_number)
+
+    def _submit(self, method, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._writes.append((method, args, future))
+        if self._flush_task is None:
+            # Writes submitted before the task first runs end up in the same batch
+            self._flush_task = loop.create_task(self._flush())
+        return future
+
+    async def _flush(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._writes:
+                batch = self._writes[:self.batch_size]
+                del self._writes[:self.batch_size]
+                self.stats["writes"] += len(batch)
+                self.stats["write_batches"] += 1
+                results = await loop.run_in_executor(self._executor, self._apply, batch)
+                for (_, _, future), (error, value) in zip(batch, results):
+                    if future.cancelled():
+                        continue
+                    if error:
+                        future.set_exception(value)
+                    else:
+                        future.set_result(value)
+        finally:
+            self._flush_task = None
+
+    def _apply(self, batch):
+        # Runs on the worker thread; each write succeeds or fails on its own
+        results = []
+        for method, args, _ in batch:
+            try:
+                results.append((False, getattr(self.hotel, method)(*args)))
+            except Exception as e:
+                results.append((True, e))
+        return results
+
+    async def aclose(self):
+        while self._flush_task is not None:
+            await self._flush_task
+        self._executor.shutdown(wait=True)
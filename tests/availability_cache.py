@@ -0,0 +1,133 @@
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
+
+CacheStats = namedtuple("CacheStats", "hits misses evictions invalidations size")
+
+
+def _matches(key, room):
+    # Whether a room passes the filters of a cache key
+    _, _, room_type, min_capacity, max_price = key
+    return ((room_type is None or room.room_type == room_type)
+            and (min_capacity is None or room.capacity >= min_capacity)
+            and (max_price is None or room.price_per_day <= max_price))
+
+
+class AvailabilityCache:
+    # Bounded LRU cache of availability query results, keyed by date range and search filters,
+    # answering Hotel.get_available_rooms and Hotel.search_rooms while attached. Kept current as a
+    # Hotel listener: a booking added, cancelled or updated evicts only the entries whose range
+    # overlaps the booking's nights and whose filters match its room. Entries are also indexed by
+    # start day, and with the longest cached range known, the ones overlapping a stay are a single
+    # bisected slice of that index. Changes to the rooms or archives clear the whole cache; so
+    # must callers who change rooms in place (type, capacity, price) or bypass the Hotel methods.
+    def __init__(self, hotel, maxsize=1024):
+        if maxsize <= 0:
+            raise Exception("Invalid cache size")
+        self.hotel = hotel
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> tuple of room numbers, least recently used first
+        self._starts = []  # start days of the keys in _keys, sorted
+        self._keys = []
+        self._max_nights = 0  # longest range cached since the cache was last empty
+        self._lock = threading.Lock()
+        # Bumped on every change, so a result computed while the hotel changed is not cached
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        hotel.add_listener(self)
+        hotel.availability_cache = self
+
+    def detach(self):
+        self.hotel.remove_listener(self)
+        if self.hotel.availability_cache is self:
+            self.hotel.availability_cache = None
+
+    def stats(self):
+        return CacheStats(self.hits, self.misses, self.evictions, self.invalidations, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._starts.clear()
+            self._keys.clear()
+            self._max_nights = 0
+
+    def _unindex(self, key):
+        i = bisect_left(self._starts, key[0])
+        while self._keys[i] != key:
+            i += 1
+        del self._starts[i]
+        del self._keys[i]
+
+    def _lookup(self, key, compute):
+        with self._lock:
+            rooms = self._entries.get(key)
+            if rooms is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return rooms
+            self.misses += 1
+            version = self._version
+        rooms = tuple(compute())
+        with self._lock:
+            if self._version == version and key not in self._entries:
+                if len(self._entries) >= self.maxsize:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._unindex(evicted)
+                    self.evictions += 1
+                self._entries[key] = rooms
+                i = bisect_right(self._starts, key[0])
+                self._starts.insert(i, key[0])
+                self._keys.insert(i, key)
+                self._max_nights = max(self._max_nights, key[1] - key[0])
+        return rooms
+
+    def get_available_rooms(self, start_date, end_date):
+        key = (start_date.toordinal(), end_date.toordinal(), None, None, None)
+        return list(self._lookup(key, lambda: self.hotel.scan_available_rooms(start_date, end_date)))
+
+    def search_rooms(self, start_date, end_date, room_type=None, min_capacity=None, max_price=None):
+        # Numbers of the available rooms matching the filters, cheapest first
+        key = (start_date.toordinal(), end_date.toordinal(), room_type, min_capacity, max_price)
+        if key[2:] == (None, None, None):
+            # Same rooms as get_available_rooms, but in price order: keep them apart
+            key = key[:2] + ("",) + key[3:]
+        return self._lookup(key, lambda: self.hotel.scan_rooms(start_date, end_date, room_type, min_capacity,
+                                                                max_price))
+
+    def _invalidate(self, room, start, end):
+        # Evict the entries for ranges overlapping days [start, end) that could include room
+        with self._lock:
+            self._version += 1
+            starts, keys = self._starts, self._keys
+            # An entry overlaps when it starts before end and ends after start; no entry is longer
+            # than _max_nights, so only the ones starting in that window can
+            first = bisect_right(starts, start - self._max_nights)
+            for i in range(bisect_left(starts, end) - 1, first - 1, -1):
+                key = keys[i]
+                if key[1] > start and (key[2] == "" or _matches(key, room)):
+                    del self._entries[key]
+                    del starts[i]
+                    del keys[i]
+                    self.invalidations += 1
+            if not keys:
+                self._max_nights = 0
+
+    # Hotel listener interface
+
+    def booking_added(self, booking):
+        self._invalidate(booking.room, booking.start, booking.end)
+
+    def booking_cancelled(self, booking):
+        self._invalidate(booking.room, booking.start, booking.end)
+
+    def booking_updated(self, booking, previous):
+        self._invalidate(previous.room, previous.start, previous.end)
+        self._invalidate(booking.room, booking.start, booking.end)
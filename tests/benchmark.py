@@ -0,0 +1,236 @@
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from bisect import bisect_left
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+
+# Benchmarks for the core Hotel operations over seeded synthetic workloads.
+#
+#   python benchmark.py --rooms 50 500 --history 0 20000 --save baseline.json
+#   python benchmark.py --rooms 50 500 --history 0 20000 --compare baseline.json
+#
+# Each scenario (room count, booking history size) is filled with history, then a workload is run
+# twice: once timed, and once under tracemalloc for peak memory, since tracing skews timings.
+
+OPERATIONS = ("book", "available", "update", "cancel")
+ROOM_TYPES = (("standard", 90.0, 2), ("standard", 110.0, 3), ("luxury", 200.0, 2), ("suite", 350.0, 4))
+
+
+def build_hotel(room_count, seed=0):
+    rng = random.Random(seed)
+    rooms = []
+    for i in range(room_count):
+        room_type, price, capacity = rng.choice(ROOM_TYPES)
+        rooms.append(Room(100 + i, room_type, price + rng.randrange(-10, 11), capacity))
+    return Hotel("Benchmark", rooms)
+
+
+class Workload:
+    # Seeded generator of booking traffic over a season of days from start_date. Stay starts follow
+    # a yearly demand curve peaking in midsummer, with busier weekends; stays are mostly short.
+    # Updates and cancellations carry a fraction that picks one of the bookings live when they run,
+    # so a workload is a fixed list of operations whatever the outcome of the earlier ones.
+    def __init__(self, seed, room_count, start_date=date(2025, 1, 1), days=365,
+                 mix=(("book", 0.55), ("available", 0.25), ("update", 0.1), ("cancel", 0.1))):
+        self.rng = random.Random(seed)
+        self.room_count = room_count
+        self.start_date = start_date
+        self.days = days
+        self.mix = mix
+        weights = []
+        for i in range(days):
+            day = start_date + timedelta(days=i)
+            season = 1 + 0.8 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 196) / 365)
+            weights.append(season * (1.5 if day.weekday() >= 4 else 1.0))
+        total = 0.0
+        self._cumulative = []
+        for weight in weights:
+            total += weight
+            self._cumulative.append(total)
+
+    def dates(self):
+        rng = self.rng
+        i = min(bisect_left(self._cumulative, rng.random() * self._cumulative[-1]), self.days - 1)
+        nights = min(1 + int(rng.expovariate(1 / 3)), 21)
+        start = self.start_date + timedelta(days=i)
+        return start, start + timedelta(days=nights)
+
+    def operation(self):
+        rng = self.rng
+        op = rng.choices([op for op, _ in self.mix], [weight for _, weight in self.mix])[0]
+        start, end = self.dates()
+        if op == "book":
+            return op, (100 + rng.randrange(self.room_count), f"Guest {rng.randrange(10000)}", start, end)
+        if op == "available":
+            return op, (start, end)
+        if op == "update":
+            return op, (rng.random(), start, end)
+        return op, (rng.random(),)
+
+    def operations(self, count):
+        return [self.operation() for _ in range(count)]
+
+
+def fill_history(hotel, workload, count):
+    # Book until count bookings exist or too many attempts in a row fail (the season is full)
+    failures = 0
+    while len(hotel.bookings) < count and failures < 1000:
+        start, end = workload.dates()
+        try:
+            hotel.book_room(100 + workload.rng.randrange(workload.room_count), "History", start, end)
+            failures = 0
+        except Exception:
+            failures += 1
+
+
+def run_operations(hotel, operations, clock=time.perf_counter_ns):
+    # Run a workload; returns {operation: [latency in ns]} (failed operations included)
+    live = list(hotel.bookings)
+    latencies = {op: [] for op in OPERATIONS}
+    for op, args in operations:
+        if op == "book":
+            began = clock()
+            try:
+                live.append(hotel.book_room(*args))
+            except Exception:
+                pass
+        elif op == "available":
+            began = clock()
+            hotel.get_available_rooms(*args)
+        elif not live:
+            continue
+        elif op == "update":
+            pick, start, end = args
+            booking_id = live[int(pick * len(live))]
+            began = clock()
+            try:
+                hotel.update_booking(booking_id, start, end)
+            except Exception:
+                pass
+        else:
+            i = int(args[0] * len(live))
+            booking_id = live[i]
+            began = clock()
+            hotel.cancel_booking(booking_id)
+            live[i] = live[-1]
+            live.pop()
+        latencies[op].append(clock() - began)
+    return latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def run_scenario(room_count, history, operations, seed=1):
+    # Timing and memory figures for one scenario; latencies are in microseconds
+    workload = Workload(seed, room_count)
+    hotel = build_hotel(room_count, seed)
+    fill_history(hotel, workload, history)
+    result = {"rooms": room_count, "history": len(hotel.bookings), "operations": {}}
+    latencies = run_operations(hotel, workload.operations(operations))
+    total_ns = 0
+    for op, values in latencies.items():
+        if not values:
+            continue
+        total_ns += sum(values)
+        result["operations"][op] = {
+            "count": len(values),
+            "ops_per_sec": len(values) / (sum(values) / 1e9) if sum(values) else 0.0,
+            "p50_us": percentile(values, 0.5) / 1000,
+            "p99_us": percentile(values, 0.99) / 1000,
+        }
+    result["ops_per_sec"] = sum(len(values) for values in latencies.values()) / (total_ns / 1e9) if total_ns else 0.0
+    # Same scenario again under tracemalloc: peak memory of building the hotel and running the workload
+    tracemalloc.start()
+    try:
+        workload = Workload(seed, room_count)
+        hotel = build_hotel(room_count, seed)
+        fill_history(hotel, workload, history)
+        run_operations(hotel, workload.operations(operations))
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def scenario_key(room_count, history):
+    return f"rooms={room_count},history={history}"
+
+
+def run_suite(room_counts=(50, 500), histories=(0, 10000), operations=5000, seed=1):
+    return {scenario_key(room_count, history): run_scenario(room_count, history, operations, seed)
+            for room_count in room_counts for history in histories}
+
+
+def save_baseline(results, path):
+    with open(path, "w") as f:
+        json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(results, baseline, tolerance=0.2):
+    # Regressions of results against a baseline: throughput down, or p99 latency or peak memory up,
+    # by more than tolerance. Scenarios missing from either side are skipped.
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        for op, figures in result["operations"].items():
+            old = before["operations"].get(op)
+            if old is None:
+                continue
+            if figures["ops_per_sec"] < old["ops_per_sec"] * (1 - tolerance):
+                regressions.append(f"{key} {op}: {old['ops_per_sec']:.0f} -> {figures['ops_per_sec']:.0f} ops/sec")
+            if figures["p99_us"] > old["p99_us"] * (1 + tolerance):
+                regressions.append(f"{key} {op}: p99 {old['p99_us']:.1f} -> {figures['p99_us']:.1f} us")
+        if result["peak_memory_bytes"] > before["peak_memory_bytes"] * (1 + tolerance):
+            regressions.append(f"{key}: peak memory {before['peak_memory_bytes']} -> {result['peak_memory_bytes']} bytes")
+    return regressions
+
+
+def format_results(results):
+    lines = []
+    for key, result in results.items():
+        lines.append(f"{key}: {result['ops_per_sec']:.0f} ops/sec, peak {result['peak_memory_bytes'] / 2 ** 20:.1f} MiB")
+        for op, figures in result["operations"].items():
+            lines.append(f"  {op:<10} {figures['count']:>7} ops {figures['ops_per_sec']:>12.0f} ops/sec"
+                         f"  p50 {figures['p50_us']:>8.1f} us  p99 {figures['p99_us']:>8.1f} us")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Hotel operations")
+    parser.add_argument("--rooms", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 10000])
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", help="compare against a JSON baseline; exits with 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    results = run_suite(args.rooms, args.history, args.operations, args.seed)
+    print(format_results(results))
+    if args.save:
+        save_baseline(results, args.save)
+    if args.compare:
+        regressions = compare(results, load_baseline(args.compare), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+from bisect import bisect_left, insort
+
+
+class BookingIndex:
+    # Secondary indexes over a hotel's bookings, kept current as a Hotel listener: guest name to
+    # booking IDs (case-insensitive, with prefix search over the sorted names) and day to the
+    # bookings checking in or out that day. Lookups return lazy iterators of Booking objects.
+    def __init__(self, hotel):
+        self.hotel = hotel
+        self._guests = {}  # casefolded guest name -> {booking ID: None}, in booking order
+        self._names = []  # sorted keys of _guests
+        self._check_ins = {}  # day ordinal -> {booking ID: None}
+        self._check_outs = {}
+        for booking in hotel.bookings.values():
+            self.booking_added(booking)
+        hotel.add_listener(self)
+
+    def detach(self):
+        self.hotel.remove_listener(self)
+
+    @staticmethod
+    def _add(index, key, booking_id):
+        ids = index.get(key)
+        if ids is None:
+            ids = index[key] = {}
+        ids[booking_id] = None
+        return len(ids) == 1
+
+    @staticmethod
+    def _discard(index, key, booking_id):
+        ids = index[key]
+        del ids[booking_id]
+        if not ids:
+            del index[key]
+            return True
+        return False
+
+    def _bookings(self, ids):
+        bookings = self.hotel.bookings
+        # Copied so the hotel may change while the caller iterates
+        for booking_id in list(ids):
+            if booking_id in bookings:
+                yield bookings[booking_id]
+
+    def by_guest(self, guest_name):
+        return self._bookings(self._guests.get(guest_name.casefold(), ()))
+
+    def guest_names(self, prefix):
+        # Casefolded guest names starting with prefix, in sorted order
+        prefix = prefix.casefold()
+        names = self._names
+        i = bisect_left(names, prefix)
+        while i < len(names) and names[i].startswith(prefix):
+            yield names[i]
+            i += 1
+
+    def search_guests(self, prefix):
+        # Bookings of every guest whose name starts with prefix, ignoring case, by name
+        for name in self.guest_names(prefix):
+            yield from self._bookings(self._guests.get(name, ()))
+
+    def check_ins(self, day):
+        return self._bookings(self._check_ins.get(day.toordinal(), ()))
+
+    def check_outs(self, day):
+        return self._bookings(self._check_outs.get(day.toordinal(), ()))
+
+    # Hotel listener interface
+
+    def booking_added(self, booking):
+        key = booking.guest_name.casefold()
+        if self._add(self._guests, key, booking.booking_id):
+            insort(self._names, key)
+        self._add(self._check_ins, booking.start, booking.booking_id)
+        self._add(self._check_outs, booking.end, booking.booking_id)
+
+    def booking_cancelled(self, booking):
+        key = booking.guest_name.casefold()
+        if self._discard(self._guests, key, booking.booking_id):
+            del self._names[bisect_left(self._names, key)]
+        self._discard(self._check_ins, booking.start, booking.booking_id)
+        self._discard(self._check_outs, booking.end, booking.booking_id)
+
+    def bookings_archived(self, bookings):
+        # Only live bookings are indexed
+        for booking in bookings:
+            self.booking_cancelled(booking)
+
+    def booking_updated(self, booking, previous):
+        self._discard(self._check_ins, previous.start, booking.booking_id)
+        self._discard(self._check_outs, previous.end, booking.booking_id)
+        self._add(self._check_ins, booking.start, booking.booking_id)
+        self._add(self._check_outs, booking.end, booking.booking_id)
@@ -0,0 +1,87 @@
+import json
+import os
+from collections import namedtuple
+from datetime import date
+from itertools import islice
+
+# One line of a booking log. Lines look like
+#   {"op": "book", "room_number": 101, "guest_name": "Alice", "start_date": "2025-01-01", "end_date": "2025-01-05"}
+#   {"op": "cancel", "booking_id": 1}
+#   {"op": "update", "booking_id": 1, "start_date": "2025-01-02", "end_date": "2025-01-06"}
+# An update may also carry a "room_number" to move the booking to.
+Operation = namedtuple("Operation", "line_number op args")
+ReplayError = namedtuple("ReplayError", "line_number error")
+
+
+def parse_operation(line):
+    record = json.loads(line)
+    op = record.get("op")
+    if op == "book":
+        args = (record["room_number"], record["guest_name"],
+                date.fromisoformat(record["start_date"]), date.fromisoformat(record["end_date"]))
+    elif op == "cancel":
+        args = (record["booking_id"],)
+    elif op == "update":
+        args = (record["booking_id"],
+                date.fromisoformat(record["start_date"]), date.fromisoformat(record["end_date"]),
+                record.get("room_number"))
+    else:
+        raise Exception(f"Unknown operation: {op}")
+    return op, args
+
+
+def read_operations(source):
+    # Lazily yield an Operation per non-blank line of source, a path or an iterable of lines.
+    # Lines that cannot be parsed are yielded with op None and the parse error as args.
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as lines:
+            yield from read_operations(lines)
+        return
+    for line_number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            op, args = parse_operation(line)
+        except Exception as e:
+            yield Operation(line_number, None, e)
+        else:
+            yield Operation(line_number, op, args)
+
+
+def replay(hotel, source, chunk_size=1000):
+    # Apply a booking log to hotel, reading and applying at most chunk_size lines at a time.
+    # Runs of book operations within a chunk go through Hotel.book_many in best-effort mode.
+    # Failures do not stop the replay; each one is yielded as a ReplayError once its chunk is applied.
+    operations = read_operations(source)
+    while True:
+        chunk = list(islice(operations, chunk_size))
+        if not chunk:
+            return
+        yield from _apply_chunk(hotel, chunk)
+
+
+def _apply_chunk(hotel, chunk):
+    errors = []
+    bookings = []
+    for operation in chunk + [None]:
+        if operation is not None and operation.op == "book":
+            bookings.append(operation)
+            continue
+        if bookings:
+            results = hotel.book_many([b.args for b in bookings], atomic=False)
+            errors.extend(ReplayError(b.line_number, r.error)
+                          for b, r in zip(bookings, results) if r.error is not None)
+            bookings = []
+        if operation is None:
+            break
+        try:
+            if operation.op is None:
+                raise operation.args
+            if operation.op == "cancel":
+                hotel.cancel_booking(*operation.args)
+            else:
+                hotel.update_booking(*operation.args)
+        except Exception as e:
+            errors.append(ReplayError(operation.line_number, e))
+    errors.sort(key=lambda error: error.line_number)
+    return errors
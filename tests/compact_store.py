@@ -0,0 +1,416 @@
+import weakref
+from array import array
+from bisect import bisect_left
+from datetime import date
+from hotel_system import Booking, BookingTable, IntervalIndex
+
+
+class BookingStore:
+    # Columnar booking storage: one typed array per field instead of one object per booking.
+    # Dates are kept as day ordinals and guest names are interned in a shared table.
+    # attach(hotel) moves a hotel onto the store: its booking table and room indexes then refer to
+    # rows, and bookings are BookingView objects made when read. A view of a row is shared while it
+    # is alive, so identity checks on bookings keep working. A row is recycled once it is out of
+    # the booking table and no view of it is left, which covers cancelled and archived bookings
+    # as well as bookings made for a rejected book_many batch. Not thread-safe.
+    def __init__(self):
+        self.booking_ids = array("q")
+        self.room_ids = array("I")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.prices = array("d")
+        self.guest_ids = array("I")
+        self.room_table = []  # Room objects referenced by room_ids
+        self.guest_table = []  # Interned guest names referenced by guest_ids
+        self._room_ids = {}
+        self._guest_ids = {}
+        self._live = bytearray()  # 1 for rows held by a RowTable
+        self._free = array("I")  # Recycled rows
+        self._views = {}  # row -> _ViewRef to the row's view, while one is alive
+        self._on_view_dropped = self._view_dropped
+
+    def __len__(self):
+        # Rows in use
+        return len(self.booking_ids) - len(self._free)
+
+    def _intern(self, table, ids, value):
+        i = ids.get(value)
+        if i is None:
+            i = ids[value] = len(table)
+            table.append(value)
+        return i
+
+    def attach(self, hotel):
+        # Keep hotel's bookings in this store: existing bookings are copied into rows, the booking
+        # table and room indexes are replaced with a RowTable and RowIndexes, and hotel.booking_factory
+        # becomes new_booking. Attach after loading the hotel (persistence.load_snapshot fills room
+        # indexes directly) and before taking snapshot views or adding listeners.
+        table = RowTable(self)
+        by_room = {}
+        for booking_id, booking in hotel.bookings.items():
+            view = self._copy(booking)
+            table[booking_id] = view
+            by_room.setdefault(view.room, []).append(view)
+        for archive in hotel.bookings.archives:
+            table.attach_archive(archive)
+        for room in hotel.rooms:
+            room.bookings = RowIndex(self, by_room.get(room, ()))
+        hotel.bookings = table
+        hotel.booking_factory = self.new_booking
+        return table
+
+    def _copy(self, booking):
+        row = self._new_row(booking.booking_id, booking.room, booking.guest_name, booking.start, booking.end,
+                            booking.total_price)
+        return self.view(row)
+
+    def _new_row(self, booking_id, room, guest_name, start, end, price):
+        values = (-1 if booking_id is None else booking_id, self._intern(self.room_table, self._room_ids, room),
+                  start, end, price, self._intern(self.guest_table, self._guest_ids, guest_name))
+        columns = (self.booking_ids, self.room_ids, self.starts, self.ends, self.prices, self.guest_ids)
+        if self._free:
+            row = self._free.pop()
+            for column, value in zip(columns, values):
+                column[row] = value
+        else:
+            row = len(self._live)
+            for column, value in zip(columns, values):
+                column.append(value)
+            self._live.append(0)
+        return row
+
+    def new_booking(self, booking_id, room, guest_name, start_date, end_date):
+        # Same signature as the Booking constructor; returns a view of the new row
+        if not isinstance(room.bookings, RowIndex) or room.bookings.store is not self:
+            # A room added to the hotel after attach
+            if room.bookings:
+                raise Exception("Room has bookings outside the booking store")
+            room.bookings = RowIndex(self)
+        view = self.view(self._new_row(booking_id, room, guest_name, start_date.toordinal(),
+                                       end_date.toordinal(), 0.0))
+        view.total_price = view.calculate_total_price()
+        return view
+
+    def view(self, row):
+        ref = self._views.get(row)
+        view = None if ref is None else ref()
+        if view is None:
+            view = BookingView(self, row)
+            ref = self._views[row] = _ViewRef(view, self._on_view_dropped)
+            ref.row = row
+        return view
+
+    def row_of(self, booking):
+        if booking.__class__ is not BookingView or booking.store is not self:
+            raise Exception("Booking is not stored in this BookingStore")
+        return booking.row
+
+    def _view_dropped(self, ref):
+        row = ref.row
+        if self._views.get(row) is ref:
+            del self._views[row]
+            if not self._live[row]:
+                self._free.append(row)
+
+    def _commit(self, row):
+        self._live[row] = 1
+
+    def _release(self, row):
+        # The row left the booking table; it is recycled now, or once its last view is gone
+        self._live[row] = 0
+        if row not in self._views:
+            self._free.append(row)
+
+    def nbytes(self):
+        # Memory held by the columns, excluding the shared room and guest tables
+        columns = (self.booking_ids, self.room_ids, self.starts, self.ends, self.prices, self.guest_ids)
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+class _ViewRef(weakref.ref):
+    __slots__ = ("row",)
+
+
+class RowTable(BookingTable):
+    # BookingTable whose bookings live in a BookingStore. Booking IDs map to rows through an array
+    # indexed by ID (IDs far past the others go to a dict), and bookings are views made on access.
+    # Aggregates, archives and on_count_change work as in BookingTable; iteration is in ID order.
+    _SPREAD = 4096  # How far past the highest ID in the array a new ID may be before it goes to the dict
+
+    def __init__(self, store):
+        self.store = store
+        self._rows = array("i")  # Booking ID -> row, -1 for none
+        self._far = {}
+        self._len = 0
+        super().__init__()
+
+    def _row(self, booking_id):
+        if type(booking_id) is int and 0 <= booking_id < len(self._rows):
+            row = self._rows[booking_id]
+            if row >= 0 or not self._far:
+                return row
+        return self._far.get(booking_id, -1)
+
+    def _put(self, booking_id, row):
+        rows = self._rows
+        if type(booking_id) is int and 0 <= booking_id < len(rows) + self._SPREAD:
+            if booking_id >= len(rows):
+                size = len(rows)
+                rows.extend(array("i", [-1]) * (booking_id + 1 - size))
+                for far_id in [i for i in self._far if type(i) is int and size <= i <= booking_id]:
+                    rows[far_id] = self._far.pop(far_id)
+            if rows[booking_id] >= 0 or booking_id not in self._far:
+                rows[booking_id] = row
+                return
+        if row < 0:
+            del self._far[booking_id]
+        else:
+            self._far[booking_id] = row
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, booking_id):
+        return self._row(booking_id) >= 0
+
+    def __getitem__(self, booking_id):
+        row = self._row(booking_id)
+        if row < 0:
+            return self.__missing__(booking_id)
+        return self.store.view(row)
+
+    def get(self, booking_id, default=None):
+        row = self._row(booking_id)
+        return default if row < 0 else self.store.view(row)
+
+    def items(self):
+        view = self.store.view
+        for booking_id, row in enumerate(self._rows):
+            if row >= 0:
+                yield booking_id, view(row)
+        for booking_id, row in list(self._far.items()):
+            yield booking_id, view(row)
+
+    def snapshot_items(self):
+        return list(self.items())
+
+    def __iter__(self):
+        return (booking_id for booking_id, _ in self.items())
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        return (booking for _, booking in self.items())
+
+    def __repr__(self):
+        return f"RowTable({dict(self.items())!r})"
+
+    def __setitem__(self, booking_id, booking):
+        if booking.__class__ is not BookingView or booking.store is not self.store:
+            # Bookings from elsewhere are copied into a row
+            booking = self.store._copy(booking)
+        row = booking.row
+        previous = self._row(booking_id)
+        if previous >= 0:
+            self._count(self.store.view(previous), -1)
+            if previous != row:
+                self.store._release(previous)
+        else:
+            self._len += 1
+        self._put(booking_id, row)
+        self.store._commit(row)
+        self._count(booking, 1)
+
+    def __delitem__(self, booking_id):
+        self.pop(booking_id)
+
+    def pop(self, booking_id, default=BookingTable._missing):
+        row = self._row(booking_id)
+        if row < 0:
+            if default is BookingTable._missing:
+                raise KeyError(booking_id)
+            return default
+        booking = self.store.view(row)
+        self._put(booking_id, -1)
+        self._len -= 1
+        self.store._release(row)
+        self._count(booking, -1)
+        return booking
+
+    def popitem(self):
+        if not self._len:
+            raise KeyError("popitem(): dictionary is empty")
+        if self._far:
+            booking_id = next(reversed(self._far))
+        else:
+            booking_id = len(self._rows) - 1
+            while self._rows[booking_id] < 0:
+                booking_id -= 1
+        return booking_id, self.pop(booking_id)
+
+    def update(self, *args, **kwargs):
+        for booking_id, booking in dict(*args, **kwargs).items():
+            self[booking_id] = booking
+
+    def clear(self):
+        rows = [row for row in self._rows if row >= 0] + list(self._far.values())
+        self._rows = array("i")
+        self._far = {}
+        self._len = 0
+        for row in rows:
+            self.store._release(row)
+        super().clear()
+
+
+class RowList:
+    # The bookings of a RowIndex: an array of store rows read and written as views
+    __slots__ = ("store", "rows")
+
+    def __init__(self, store):
+        self.store = store
+        self.rows = array("I")
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        view = self.store.view
+        return (view(row) for row in self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            view = self.store.view
+            return [view(row) for row in self.rows[i]]
+        return self.store.view(self.rows[i])
+
+    def __setitem__(self, i, bookings):
+        if isinstance(i, slice):
+            self.rows[i] = array("I", map(self.store.row_of, bookings))
+        else:
+            self.rows[i] = self.store.row_of(bookings)
+
+    def __delitem__(self, i):
+        del self.rows[i]
+
+    def insert(self, i, booking):
+        self.rows.insert(i, self.store.row_of(booking))
+
+    def clear(self):
+        del self.rows[:]
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class RowIndex(IntervalIndex):
+    # IntervalIndex of a room whose bookings live in a BookingStore: start and end ordinals are
+    # typed arrays and bookings is a RowList
+    __slots__ = ("store",)
+
+    def __init__(self, store, bookings=()):
+        self.store = store
+        self.starts = array("i")
+        self.ends = array("i")
+        self.bookings = RowList(store)
+        self.fill(bookings)
+
+    def fill(self, bookings):
+        bookings = sorted(bookings, key=lambda booking: booking.start)
+        self.bookings[:] = bookings
+        self.starts[:] = array("i", (booking.start for booking in bookings))
+        self.ends[:] = array("i", (booking.end for booking in bookings))
+
+    def position(self, booking):
+        # Compares rows instead of making a view per candidate
+        row = self.store.row_of(booking)
+        rows = self.bookings.rows
+        start = booking.start
+        i = bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if rows[i] == row:
+                return i
+            i += 1
+        raise Exception("Booking not indexed")
+
+    def clear(self):
+        del self.starts[:]
+        del self.ends[:]
+        self.bookings.clear()
+
+
+class BookingView:
+    # A booking stored in a BookingStore row, with the attribute API of Booking
+    __slots__ = ("store", "row", "__weakref__")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    @property
+    def booking_id(self):
+        booking_id = self.store.booking_ids[self.row]
+        return None if booking_id < 0 else booking_id
+
+    @booking_id.setter
+    def booking_id(self, booking_id):
+        self.store.booking_ids[self.row] = booking_id
+
+    @property
+    def room(self):
+        return self.store.room_table[self.store.room_ids[self.row]]
+
+    @room.setter
+    def room(self, room):
+        store = self.store
+        store.room_ids[self.row] = store._intern(store.room_table, store._room_ids, room)
+
+    @property
+    def guest_name(self):
+        return self.store.guest_table[self.store.guest_ids[self.row]]
+
+    @property
+    def start(self):
+        return self.store.starts[self.row]
+
+    @start.setter
+    def start(self, start):
+        self.store.starts[self.row] = start
+
+    @property
+    def end(self):
+        return self.store.ends[self.row]
+
+    @end.setter
+    def end(self, end):
+        self.store.ends[self.row] = end
+
+    @property
+    def start_date(self):
+        return date.fromordinal(self.store.starts[self.row])
+
+    @start_date.setter
+    def start_date(self, start_date):
+        self.store.starts[self.row] = start_date.toordinal()
+
+    @property
+    def end_date(self):
+        return date.fromordinal(self.store.ends[self.row])
+
+    @end_date.setter
+    def end_date(self, end_date):
+        self.store.ends[self.row] = end_date.toordinal()
+
+    @property
+    def total_price(self):
+        return self.store.prices[self.row]
+
+    @total_price.setter
+    def total_price(self, total_price):
+        self.store.prices[self.row] = total_price
+
+    calculate_total_price = Booking.calculate_total_price
+    update_dates = Booking.update_dates
+
+    def __repr__(self):
+        return f"BookingView({self.booking_id}, room {self.room.number}, {self.start_date} to {self.end_date})"
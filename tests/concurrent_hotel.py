@@ -0,0 +1,132 @@
+import threading
+from contextlib import ExitStack
+from hotel_system import Hotel
+
+
+class ConcurrentHotel(Hotel):
+    # Hotel that can be shared between threads. Checking and changing a room's bookings happens
+    # under that room's lock, so operations on different rooms do not wait for each other.
+    # The structures shared by all rooms (booking table, aggregates, listeners) are only touched
+    # under a short commit lock, and booking IDs come from a locked allocator.
+    def __init__(self, name, rooms, **kwargs):
+        self._id_lock = threading.Lock()
+        self._commit_lock = threading.RLock()
+        self._room_locks = {}
+        self._room_locks_lock = threading.Lock()
+        super().__init__(name, rooms, **kwargs)
+
+    def room_lock(self, room_number):
+        lock = self._room_locks.get(room_number)
+        if lock is None:
+            with self._room_locks_lock:
+                lock = self._room_locks.setdefault(room_number, threading.RLock())
+        return lock
+
+    def _locked_rooms(self, room_numbers):
+        # Acquire several room locks in a global order so that batches cannot deadlock
+        stack = ExitStack()
+        for lock in sorted({self.room_lock(number) for number in room_numbers}, key=id):
+            stack.enter_context(lock)
+        return stack
+
+    def _booking_room_lock(self, booking_id):
+        # Lock the room a booking is in, retrying if the booking moves before the lock is taken
+        while True:
+            booking = self.bookings.get(booking_id)
+            if booking is None:
+                raise Exception("Booking not found")
+            lock = self.room_lock(booking.room.number)
+            lock.acquire()
+            if self.bookings.get(booking_id) is booking and self.room_lock(booking.room.number) is lock:
+                return lock
+            lock.release()
+
+    def generate_booking_id(self):
+        with self._id_lock:
+            return super().generate_booking_id()
+
+    def _commit_booking(self, booking):
+        with self._commit_lock:
+            return super()._commit_booking(booking)
+
+    def _commit_update(self, booking, previous):
+        with self._commit_lock:
+            super()._commit_update(booking, previous)
+
+    def snapshot_view(self):
+        # Taken between operations: an update changes a booking under its room lock only, before
+        # committing its income under the commit lock
+        with self._locked_rooms(self.rooms.numbers()), self._commit_lock:
+            return super().snapshot_view()
+
+    def archive_bookings(self, watermark, archive_factory, replaces=None):
+        with self._locked_rooms(self.rooms.numbers()), self._commit_lock:
+            return super().archive_bookings(watermark, archive_factory, replaces)
+
+    def book_room(self, room_number, guest_name, start_date, end_date):
+        with self.room_lock(room_number):
+            return super().book_room(room_number, guest_name, start_date, end_date)
+
+    def book_many(self, requests, atomic=True):
+        requests = list(requests)
+        with self._locked_rooms(request[0] for request in requests):
+            return super().book_many(requests, atomic)
+
+    def cancel_booking(self, booking_id):
+        lock = self._booking_room_lock(booking_id)
+        try:
+            with self._commit_lock:
+                super().cancel_booking(booking_id)
+        finally:
+            lock.release()
+
+    def update_booking(self, booking_id, new_start_date, new_end_date, new_room_number=None, keep_price=False):
+        if new_room_number is None:
+            lock = self._booking_room_lock(booking_id)
+            try:
+                super().update_booking(booking_id, new_start_date, new_end_date, keep_price=keep_price)
+            finally:
+                lock.release()
+            return
+        # A move locks both rooms, retrying if the booking moves before the locks are taken
+        while True:
+            booking = self.bookings.get(booking_id)
+            if booking is None:
+                raise Exception("Booking not found")
+            room = booking.room
+            with self._locked_rooms((room.number, new_room_number)):
+                if self.bookings.get(booking_id) is booking and booking.room is room:
+                    super().update_booking(booking_id, new_start_date, new_end_date, new_room_number, keep_price)
+                    return
+
+    def scan_available_rooms(self, start_date, end_date):
+        if self.occupancy is not None and self.occupancy.covers(start_date, end_date):
+            with self._commit_lock:
+                return self.occupancy.available_rooms(start_date, end_date)
+        start, end = start_date.toordinal(), end_date.toordinal()
+        available = []
+        for room in list(self.rooms):
+            with self.room_lock(room.number):
+                if room.is_free(start, end):
+                    available.append(room.number)
+        return available
+
+    def scan_rooms(self, start_date, end_date, room_type=None, min_capacity=None, max_price=None):
+        start, end = start_date.toordinal(), end_date.toordinal()
+        for room in list(self.rooms.candidates(room_type, min_capacity, max_price)):
+            with self.room_lock(room.number):
+                free = room.is_free(start, end)
+            if free:
+                yield room.number
+
+    def _room_windows(self, room, order, start, nights, forward):
+        # Walks a copy of the room's gaps taken under its lock, confirming each window against the
+        # current bookings under the lock again, as writers may have filled it since
+        lock = self.room_lock(room.number)
+        with lock:
+            index = room.bookings.copy()
+        for distance, window in index.windows(start, nights, forward):
+            with lock:
+                free = room.is_free(window, window + nights)
+            if free:
+                yield distance, window, order, room
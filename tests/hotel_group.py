@@ -0,0 +1,229 @@
+import heapq
+import math
+import multiprocessing
+import os
+from datetime import date
+from hotel_system import BookingResult
+from persistence import dump_snapshot, load_snapshot
+
+# Requests travel to the workers in batches of (op, hotel name, args) tuples and come back as
+# (error message, value) pairs. Arguments and results are plain ints, floats and strings, with
+# dates sent as ordinals, so pipe traffic stays small; hotels themselves travel as snapshots, with
+# their rooms' pricing policies (which snapshots leave out) pickled alongside.
+
+
+def _pricing(hotel):
+    return {room.number: room.pricing for room in hotel.rooms}
+
+
+def _book(hotel, room_number, guest_name, start, end):
+    return hotel.book_room(room_number, guest_name, date.fromordinal(start), date.fromordinal(end))
+
+
+def _book_many(hotel, requests):
+    results = hotel.book_many([(room_number, guest_name, date.fromordinal(start), date.fromordinal(end))
+                               for room_number, guest_name, start, end in requests], atomic=False)
+    return [(booking_id, None if error is None else str(error)) for booking_id, error in results]
+
+
+def _update(hotel, booking_id, start, end, room_number):
+    hotel.update_booking(booking_id, date.fromordinal(start), date.fromordinal(end), room_number)
+
+
+def _available(hotel, start, end):
+    return hotel.get_available_rooms(date.fromordinal(start), date.fromordinal(end))
+
+
+def _search(hotel, start, end, room_type, min_capacity, max_price, limit):
+    numbers = hotel.search_rooms(date.fromordinal(start), date.fromordinal(end), room_type, min_capacity,
+                                 max_price, limit)
+    return [(hotel.rooms.get(number).price_per_day, number) for number in numbers]
+
+
+_HANDLERS = {
+    "book": _book,
+    "book_many": _book_many,
+    "cancel": lambda hotel, booking_id: hotel.cancel_booking(booking_id),
+    "update": _update,
+    "info": lambda hotel, booking_id: hotel.get_booking_info(booking_id),
+    "available": _available,
+    "search": _search,
+    "income": lambda hotel: hotel.get_total_income(),
+    "report": lambda hotel: hotel.report(),
+    "dump": lambda hotel: (dump_snapshot(hotel), _pricing(hotel)),
+}
+
+
+def _worker(connection):
+    hotels = {}
+    while True:
+        batch = connection.recv()
+        if batch is None:
+            break
+        replies = []
+        for op, name, args in batch:
+            try:
+                if op == "load":
+                    data, pricing = args
+                    hotels[name] = load_snapshot(data, pricing=pricing)[0]
+                    replies.append((None, None))
+                else:
+                    replies.append((None, _HANDLERS[op](hotels[name], *args)))
+            except Exception as e:
+                replies.append((str(e), None))
+        connection.send(replies)
+    connection.close()
+
+
+class HotelGroup:
+    # Hotels of several properties sharded over worker processes and addressed by hotel name.
+    # Each hotel is owned by one worker: booking operations go to its owner, and queries fan out to
+    # every worker at once and are merged here. The hotels are copied into the workers when the
+    # group starts (with their pricing policies but without listeners), and the group owns their
+    # state from then on; hotel() fetches a copy back.
+    def __init__(self, hotels, processes=None, context=None):
+        hotels = list(hotels)
+        processes = max(1, min(processes or os.cpu_count() or 1, len(hotels)))
+        context = multiprocessing.get_context(context)
+        self._connections = []
+        self._processes = []
+        for _ in range(processes):
+            connection, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+        # Biggest hotels first, each to the worker with the fewest rooms so far
+        self._owners = {}
+        loads = [0] * processes
+        batches = [[] for _ in range(processes)]
+        for hotel in sorted(hotels, key=lambda h: len(h.rooms), reverse=True):
+            if hotel.name in self._owners:
+                self.close()
+                raise Exception("Duplicate hotel name")
+            worker = loads.index(min(loads))
+            loads[worker] += len(hotel.rooms)
+            self._owners[hotel.name] = worker
+            batches[worker].append(("load", hotel.name, (dump_snapshot(hotel), _pricing(hotel))))
+        self._raise_errors(self._exchange(batches))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def hotel_names(self):
+        return list(self._owners)
+
+    def _exchange(self, batches):
+        # Send every worker its batch before reading any reply, so the workers run in parallel
+        for connection, batch in zip(self._connections, batches):
+            if batch:
+                connection.send(batch)
+        return [connection.recv() if batch else [] for connection, batch in zip(self._connections, batches)]
+
+    @staticmethod
+    def _raise_errors(replies):
+        for worker_replies in replies:
+            for error, _ in worker_replies:
+                if error is not None:
+                    raise Exception(error)
+
+    def _call(self, hotel_name, op, *args):
+        worker = self._owners.get(hotel_name)
+        if worker is None:
+            raise Exception("Hotel not found")
+        connection = self._connections[worker]
+        connection.send([(op, hotel_name, args)])
+        [(error, value)] = connection.recv()
+        if error is not None:
+            raise Exception(error)
+        return value
+
+    def _broadcast(self, op, *args):
+        # Run op against every hotel; returns {hotel name: value}
+        batches = [[] for _ in self._connections]
+        for name, worker in self._owners.items():
+            batches[worker].append((op, name, args))
+        replies = self._exchange(batches)
+        self._raise_errors(replies)
+        return {name: value for batch, worker_replies in zip(batches, replies)
+                for (_, name, _), (_, value) in zip(batch, worker_replies)}
+
+    def book_room(self, hotel_name, room_number, guest_name, start_date, end_date):
+        return self._call(hotel_name, "book", room_number, guest_name, start_date.toordinal(), end_date.toordinal())
+
+    def book_many(self, requests):
+        # Best-effort batch of (hotel name, room number, guest name, start date, end date) requests,
+        # run on all owning workers in parallel. Returns a BookingResult per request, in order.
+        requests = list(requests)
+        per_hotel = {}
+        results = [None] * len(requests)
+        for i, (hotel_name, room_number, guest_name, start_date, end_date) in enumerate(requests):
+            if hotel_name not in self._owners:
+                results[i] = BookingResult(None, Exception("Hotel not found"))
+                continue
+            positions, batch = per_hotel.setdefault(hotel_name, ([], []))
+            positions.append(i)
+            batch.append((room_number, guest_name, start_date.toordinal(), end_date.toordinal()))
+        batches = [[] for _ in self._connections]
+        for hotel_name, (_, batch) in per_hotel.items():
+            batches[self._owners[hotel_name]].append(("book_many", hotel_name, (batch,)))
+        replies = self._exchange(batches)
+        self._raise_errors(replies)
+        for batch, worker_replies in zip(batches, replies):
+            for (_, hotel_name, _), (_, hotel_results) in zip(batch, worker_replies):
+                for i, (booking_id, error) in zip(per_hotel[hotel_name][0], hotel_results):
+                    results[i] = BookingResult(booking_id, None if error is None else Exception(error))
+        return results
+
+    def cancel_booking(self, hotel_name, booking_id):
+        self._call(hotel_name, "cancel", booking_id)
+
+    def update_booking(self, hotel_name, booking_id, new_start_date, new_end_date, new_room_number=None):
+        self._call(hotel_name, "update", booking_id, new_start_date.toordinal(), new_end_date.toordinal(),
+                   new_room_number)
+
+    def get_booking_info(self, hotel_name, booking_id):
+        return self._call(hotel_name, "info", booking_id)
+
+    def get_available_rooms(self, start_date, end_date):
+        # {hotel name: [available room numbers]}
+        return self._broadcast("available", start_date.toordinal(), end_date.toordinal())
+
+    def search_rooms(self, start_date, end_date, room_type=None, min_capacity=None, max_price=None, limit=None):
+        # [(hotel name, room number)] of available rooms across the group, cheapest first
+        found = self._broadcast("search", start_date.toordinal(), end_date.toordinal(), room_type, min_capacity,
+                                max_price, limit)
+        merged = heapq.merge(*([(price, name, number) for price, number in rooms] for name, rooms in found.items()),
+                             key=lambda room: room[0])
+        rooms = [(name, number) for _, name, number in merged]
+        return rooms if limit is None else rooms[:limit]
+
+    def incomes(self):
+        return self._broadcast("income")
+
+    def get_total_income(self):
+        return math.fsum(self.incomes().values())
+
+    def report(self):
+        # {hotel name: {room number: booking count}}
+        return self._broadcast("report")
+
+    def hotel(self, hotel_name):
+        # A copy of a hotel's current state
+        data, pricing = self._call(hotel_name, "dump")
+        return load_snapshot(data, pricing=pricing)[0]
+
+    def close(self):
+        for connection, process in zip(self._connections, self._processes):
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            connection.close()
+            process.join()
+        self._connections = []
+        self._processes = []
@@ -1,20 +1,208 @@
-from datetime import date, timedelta
+import heapq
+import math
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, namedtuple
+from datetime import date
+from itertools import islice
+
+from pricing import DEFAULT_PRICING
+
+# Internally dates are integer day ordinals (date.toordinal()): the interval indexes, pricing and
+# availability checks compare and subtract plain ints. Public methods take and return date objects,
+# and Booking.start_date and end_date remain available as date properties.
+
+# State of a booking before an update, passed to listeners alongside the updated booking;
+# start and end are day ordinals
+BookingState = namedtuple("BookingState", "room start end total_price")
+# Outcome of one request in a best-effort Hotel.book_many call; exactly one field is None
+BookingResult = namedtuple("BookingResult", "booking_id error")
+
+
+class IntervalIndex:
+    # Bookings of a single room sorted by start day, with their start and end day ordinals in
+    # parallel lists. Bookings in one room never overlap, so their ends are sorted too and an
+    # overlap query only has to look at one neighbour, and append rejects a booking that would
+    # overlap another. Days passed in and returned are ordinals.
+    # Supports the list operations callers used on room.bookings (append, remove, clear, ...).
+    __slots__ = ("starts", "ends", "bookings")
+
+    def __init__(self, bookings=()):
+        self.starts = []
+        self.ends = []
+        self.bookings = []
+        for booking in bookings:
+            self.append(booking)
+
+    def __len__(self):
+        return len(self.bookings)
+
+    def __iter__(self):
+        return iter(self.bookings)
+
+    def __getitem__(self, i):
+        return self.bookings[i]
+
+    def __contains__(self, booking):
+        try:
+            self.position(booking)
+        except Exception:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"IntervalIndex({self.bookings!r})"
+
+    def append(self, booking):
+        if self.overlaps(booking.start, booking.end):
+            raise Exception("Room not available for the selected dates")
+        i = bisect_right(self.starts, booking.start)
+        self.starts.insert(i, booking.start)
+        self.ends.insert(i, booking.end)
+        self.bookings.insert(i, booking)
+
+    def copy(self):
+        index = IntervalIndex()
+        index.starts = list(self.starts)
+        index.ends = list(self.ends)
+        index.bookings = list(self.bookings)
+        return index
+
+    def fill(self, bookings):
+        # Replace the contents with bookings that do not overlap, in one sort
+        self.bookings[:] = sorted(bookings, key=lambda booking: booking.start)
+        self.starts[:] = [booking.start for booking in self.bookings]
+        self.ends[:] = [booking.end for booking in self.bookings]
+
+    def position(self, booking):
+        start = booking.start
+        i = bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.bookings[i] is booking:
+                return i
+            i += 1
+        raise Exception("Booking not indexed")
+
+    def remove(self, booking):
+        i = self.position(booking)
+        del self.starts[i]
+        del self.ends[i]
+        del self.bookings[i]
+
+    def clear(self):
+        self.starts.clear()
+        self.ends.clear()
+        self.bookings.clear()
+
+    def ended(self, day):
+        # Bookings ending on or before day; they come first, as the ends are sorted too
+        return self.bookings[:bisect_right(self.ends, day)]
+
+    def drop_ended(self, day):
+        i = bisect_right(self.ends, day)
+        del self.starts[:i]
+        del self.ends[:i]
+        del self.bookings[:i]
+
+    def fits(self, i, start, end):
+        # Whether booking i could take [start, end) instead of its own days. As in overlaps, only
+        # the last other booking starting before end has to be looked at.
+        j = bisect_left(self.starts, end) - 1
+        if j == i:
+            j -= 1
+        return j < 0 or self.ends[j] <= start
+
+    def reposition(self, i):
+        # Restore the order after booking i's days changed in place. A booking that stays between
+        # its neighbours (shrunk, extended or shifted a little) only has its keys updated.
+        booking = self.bookings[i]
+        start = booking.start
+        starts = self.starts
+        if (i == 0 or starts[i - 1] <= start) and (i + 1 == len(starts) or start <= starts[i + 1]):
+            starts[i] = start
+            self.ends[i] = booking.end
+        else:
+            del starts[i]
+            del self.ends[i]
+            del self.bookings[i]
+            self.append(booking)
+
+    def overlapping(self, start, end):
+        # Bookings overlapping [start, end), in start order
+        i = bisect_left(self.starts, end)
+        j = i
+        while j > 0 and self.ends[j - 1] > start:
+            j -= 1
+        return self.bookings[j:i]
+
+    def gap(self, i):
+        # Free window [start, end) between booking i - 1 and booking i; None marks an open end
+        start = self.ends[i - 1] if i > 0 else None
+        end = self.starts[i] if i < len(self.starts) else None
+        return start, end
+
+    def gap_position(self, day):
+        # Index of the first gap that ends after day; gaps before it end on or before day
+        return bisect_right(self.starts, day)
+
+    def windows(self, start, nights, forward=True):
+        # Starts of open windows of the given number of nights, one per gap, walking the gaps away
+        # from start: (distance in days, window start) pairs in order of increasing distance
+        k = self.gap_position(start)
+        if forward:
+            for i in range(k, len(self.starts) + 1):
+                gap_start, gap_end = self.gap(i)
+                window = start if gap_start is None else max(start, gap_start)
+                if gap_end is None or window + nights <= gap_end:
+                    yield window - start, window
+        else:
+            # Windows starting before start, beginning with the gap that contains it
+            for i in range(k, -1, -1):
+                gap_start, gap_end = self.gap(i)
+                window = start - 1 if gap_end is None else min(start - 1, gap_end - nights)
+                if gap_start is None or window >= gap_start:
+                    yield start - window, window
+
+    def overlaps(self, start, end):
+        # Only the last booking starting before end can reach past start.
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.ends[i - 1] > start
 
 
 class Room:
-    def __init__(self, number, room_type, price_per_day, capacity):
+    __slots__ = ("number", "room_type", "price_per_day", "capacity", "bookings", "archives", "pricing")
+
+    def __init__(self, number, room_type, price_per_day, capacity, pricing=DEFAULT_PRICING):
         self.number = number
         self.room_type = room_type
         self.price_per_day = price_per_day
         self.capacity = capacity
-        self.bookings = []  # List of Booking objects
+        self.bookings = IntervalIndex()  # Booking objects sorted by start date
+        self.archives = ()  # Read-only booking history attached through Hotel.attach_archive
+        self.pricing = pricing  # Pricing policy quoting stays in this room, see pricing.py
 
     def is_available_for(self, start_date, end_date):
         # Check if the room is available for the date range [start_date, end_date)
-        for booking in self.bookings:
-            # Bookings do not overlap if the requested end date is on or before a booking's start,
-            # or the requested start date is on or after a booking's end.
-            if not (end_date <= booking.start_date or start_date >= booking.end_date):
+        return self.is_free(start_date.toordinal(), end_date.toordinal())
+
+    def is_free(self, start, end):
+        # is_available_for on day ordinals, with IntervalIndex.overlaps inlined for the hot path
+        index = self.bookings
+        i = bisect_left(index.starts, end)
+        if i and index.ends[i - 1] > start:
+            return False
+        for archive in self.archives:
+            # Queries past the end of archived history, the usual case, skip the segment
+            if start < archive.end and archive.overlaps(start, end):
+                return False
+        return True
+
+    def can_reschedule(self, i, start, end):
+        # Whether booking i of this room could be moved to days [start, end) in place
+        if not self.bookings.fits(i, start, end):
+            return False
+        for archive in self.archives:
+            if start < archive.end and archive.overlaps(start, end):
                 return False
         return True
 
@@ -22,92 +210,865 @@ class Room:
         self.bookings.append(booking)
 
 
+class RoomRegistry(list):
+    # List of Room objects that also maps room numbers to rooms, so lookups are O(1).
+    # Every list mutation keeps the mapping in sync; with duplicate numbers the first room wins,
+    # as it did with a linear search. on_change(number, present) is called whenever a room number
+    # appears in or disappears from the registry.
+    # Rooms are also indexed by room type and capacity, each bucket sorted by price, for
+    # candidates(); rooms whose price, type or capacity change in place need a reindex().
+    def __init__(self, rooms=(), on_change=None):
+        super().__init__(rooms)
+        self.on_change = None
+        self._reindex()
+        self.on_change = on_change
+
+    def reindex(self):
+        self._reindex()
+
+    def _reindex(self):
+        old_numbers = getattr(self, "_counts", {}).keys()
+        self._by_number = {}
+        self._counts = {}
+        self._by_type = {}  # room type -> capacity -> [(price, sequence, room)] sorted
+        self._capacities = {}  # room type -> sorted capacities
+        self._entries = {}  # room -> (room type, capacity, entry) as indexed in _by_type
+        self._sequence = 0
+        for room in self:
+            self._by_number.setdefault(room.number, room)
+            self._counts[room.number] = self._counts.get(room.number, 0) + 1
+            self._index(room)
+        if self.on_change is not None:
+            for number in old_numbers - self._counts.keys():
+                self.on_change(number, False)
+            for number in self._counts.keys() - old_numbers:
+                self.on_change(number, True)
+
+    def _index(self, room):
+        entry = (room.price_per_day, self._sequence, room)
+        self._entries[room] = (room.room_type, room.capacity, entry)
+        self._sequence += 1
+        buckets = self._by_type.setdefault(room.room_type, {})
+        bucket = buckets.get(room.capacity)
+        if bucket is None:
+            bucket = buckets[room.capacity] = []
+            insort(self._capacities.setdefault(room.room_type, []), room.capacity)
+        insort(bucket, entry)
+
+    def _unindex(self, room):
+        room_type, capacity, entry = self._entries.pop(room)
+        buckets = self._by_type[room_type]
+        bucket = buckets[capacity]
+        bucket.remove(entry)
+        if not bucket:
+            del buckets[capacity]
+            self._capacities[room_type].remove(capacity)
+            if not buckets:
+                del self._by_type[room_type]
+                del self._capacities[room_type]
+
+    def _added(self, room):
+        self._by_number.setdefault(room.number, room)
+        self._counts[room.number] = self._counts.get(room.number, 0) + 1
+        self._index(room)
+        if self._counts[room.number] == 1 and self.on_change is not None:
+            self.on_change(room.number, True)
+
+    def _discarded(self, room):
+        self._unindex(room)
+        count = self._counts[room.number] - 1
+        if count:
+            self._counts[room.number] = count
+            if self._by_number[room.number] is room:
+                self._by_number[room.number] = next(r for r in self if r.number == room.number)
+        else:
+            del self._counts[room.number]
+            del self._by_number[room.number]
+            if self.on_change is not None:
+                self.on_change(room.number, False)
+
+    def get(self, number, default=None):
+        return self._by_number.get(number, default)
+
+    def numbers(self):
+        return self._by_number.keys()
+
+    def candidates(self, room_type=None, min_capacity=None, max_price=None):
+        # Lazily yield rooms matching the filters, cheapest first
+        types = self._by_type if room_type is None else [room_type]
+        buckets = []
+        for t in types:
+            capacities = self._capacities.get(t, [])
+            first = 0 if min_capacity is None else bisect_left(capacities, min_capacity)
+            buckets.extend(self._by_type[t][capacity] for capacity in capacities[first:])
+        for price, _, room in heapq.merge(*buckets):
+            if max_price is not None and price > max_price:
+                return
+            yield room
+
+    def append(self, room):
+        super().append(room)
+        self._added(room)
+
+    def extend(self, rooms):
+        rooms = list(rooms)
+        super().extend(rooms)
+        for room in rooms:
+            self._added(room)
+
+    def __iadd__(self, rooms):
+        self.extend(rooms)
+        return self
+
+    def remove(self, room):
+        super().remove(room)
+        self._discarded(room)
+
+    def pop(self, i=-1):
+        room = super().pop(i)
+        self._discarded(room)
+        return room
+
+    def clear(self):
+        super().clear()
+        self._reindex()
+
+    # Mutations that can reorder rooms or replace several at once simply rebuild the mapping.
+    def insert(self, i, room):
+        super().insert(i, room)
+        self._reindex()
+
+    def __setitem__(self, i, value):
+        super().__setitem__(i, value)
+        self._reindex()
+
+    def __delitem__(self, i):
+        super().__delitem__(i)
+        self._reindex()
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._reindex()
+        return self
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._reindex()
+
+    def reverse(self):
+        super().reverse()
+        self._reindex()
+
+
+class BookingTable(dict):
+    # Mapping of booking IDs to Booking objects that keeps running aggregates of its contents:
+    # total income and the number of bookings per room number. Income is accumulated exactly, as an
+    # integer count of 2**-1074 (the smallest float), so any sequence of additions and removals
+    # matches a fresh sum of the remaining prices.
+    # on_count_change(room_number, count) is called whenever a room's count changes.
+    # Attached archives are read-only history: they count towards income and per-room counts,
+    # and table[booking_id] falls back to them, but they are not part of the dict itself.
+    _INCOME_BITS = 1074
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._income = 0
+        self.counts = {}
+        self.archives = []
+        self._archived_income = 0
+        self.archived_counts = {}
+        self.on_count_change = None
+        self.update(*args, **kwargs)
+
+    def __missing__(self, booking_id):
+        for archive in self.archives:
+            booking = archive.find(booking_id)
+            if booking is not None:
+                return booking
+        raise KeyError(booking_id)
+
+    def count(self, room_number):
+        return self.counts.get(room_number, 0) + self.archived_counts.get(room_number, 0)
+
+    def attach_archive(self, archive):
+        self.archives.append(archive)
+        self._archived_income += archive.exact_income
+        for number, count in archive.counts.items():
+            self.archived_counts[number] = self.archived_counts.get(number, 0) + count
+            if self.on_count_change is not None:
+                self.on_count_change(number, self.count(number))
+
+    def detach_archive(self, archive):
+        self.archives.remove(archive)
+        self._archived_income -= archive.exact_income
+        for number, count in archive.counts.items():
+            count = self.archived_counts[number] - count
+            if count:
+                self.archived_counts[number] = count
+            else:
+                del self.archived_counts[number]
+            if self.on_count_change is not None:
+                self.on_count_change(number, self.count(number))
+
+    @classmethod
+    def _exact(cls, price):
+        # Prices are taken as floats: the shift below needs a power of two denominator, which a
+        # Decimal or Fraction price does not have
+        numerator, denominator = float(price).as_integer_ratio()
+        return numerator << (cls._INCOME_BITS + 1 - denominator.bit_length())
+
+    @property
+    def income(self):
+        # Income of the bookings in the table; integer true division rounds correctly
+        return self._income / (1 << self._INCOME_BITS)
+
+    @property
+    def total_income(self):
+        # Income including attached archives
+        return (self._income + self._archived_income) / (1 << self._INCOME_BITS)
+
+    def adjust_income(self, old_price, new_price):
+        # Account for a booking whose total price changed in place
+        self._income += self._exact(new_price) - self._exact(old_price)
+
+    def _count(self, booking, delta):
+        if delta > 0:
+            self._income += self._exact(booking.total_price)
+        else:
+            self._income -= self._exact(booking.total_price)
+        self._count_room(booking.room.number, delta)
+
+    def _count_room(self, number, delta):
+        count = self.counts.get(number, 0) + delta
+        if count:
+            self.counts[number] = count
+        else:
+            del self.counts[number]
+        if self.on_count_change is not None:
+            self.on_count_change(number, self.count(number))
+
+    def moved(self, previous_room, room):
+        # Account for a booking that moved between rooms in place
+        self._count_room(previous_room.number, -1)
+        self._count_room(room.number, 1)
+
+    def __setitem__(self, booking_id, booking):
+        if booking_id in self:
+            self._count(dict.__getitem__(self, booking_id), -1)
+        super().__setitem__(booking_id, booking)
+        self._count(booking, 1)
+
+    def __delitem__(self, booking_id):
+        booking = self[booking_id]
+        super().__delitem__(booking_id)
+        self._count(booking, -1)
+
+    _missing = object()
+
+    def pop(self, booking_id, default=_missing):
+        if booking_id not in self:
+            if default is BookingTable._missing:
+                raise KeyError(booking_id)
+            return default
+        booking = super().pop(booking_id)
+        self._count(booking, -1)
+        return booking
+
+    def popitem(self):
+        booking_id, booking = super().popitem()
+        self._count(booking, -1)
+        return booking_id, booking
+
+    def setdefault(self, booking_id, booking=None):
+        if booking_id not in self:
+            self[booking_id] = booking
+        return self[booking_id]
+
+    def update(self, *args, **kwargs):
+        bookings = dict(*args, **kwargs)
+        if self:
+            for booking_id, booking in bookings.items():
+                self[booking_id] = booking
+            return
+        # Loading into an empty table: aggregate everything in one pass
+        super().update(bookings)
+        exact = self._exact
+        self._income = sum(exact(booking.total_price) for booking in bookings.values())
+        self.counts = dict(Counter(booking.room.number for booking in bookings.values()))
+        if self.on_count_change is not None:
+            for number in self.counts:
+                self.on_count_change(number, self.count(number))
+
+    def snapshot_items(self):
+        # The (booking ID, booking) pairs as a list copied in one step, which a writer on another
+        # thread cannot interleave with
+        return list(dict.items(self))
+
+    def clear(self):
+        numbers = list(self.counts)
+        super().clear()
+        self._income = 0
+        self.counts.clear()
+        if self.on_count_change is not None:
+            for number in numbers:
+                self.on_count_change(number, self.count(number))
+
+
 class Booking:
+    __slots__ = ("booking_id", "room", "guest_name", "start", "end", "total_price")
+
     def __init__(self, booking_id, room, guest_name, start_date, end_date):
         self.booking_id = booking_id
         self.room = room
         self.guest_name = guest_name
-        self.start_date = start_date
-        self.end_date = end_date
+        self.start = start_date.toordinal()  # Day ordinals
+        self.end = end_date.toordinal()
         self.total_price = self.calculate_total_price()
 
+    @property
+    def start_date(self):
+        return date.fromordinal(self.start)
+
+    @start_date.setter
+    def start_date(self, start_date):
+        self.start = start_date.toordinal()
+
+    @property
+    def end_date(self):
+        return date.fromordinal(self.end)
+
+    @end_date.setter
+    def end_date(self, end_date):
+        self.end = end_date.toordinal()
+
     def calculate_total_price(self):
-        num_days = (self.end_date - self.start_date).days
-        price = num_days * self.room.price_per_day
-        if num_days > 5:
-            price *= 0.9  # Apply 10% discount for stays longer than 5 days
-        return price
+        return self.room.pricing.quote_days(self.room, self.start, self.end)
 
     def update_dates(self, new_start_date, new_end_date):
         if new_start_date >= new_end_date:
             raise Exception("Invalid date range")
-        self.start_date = new_start_date
-        self.end_date = new_end_date
+        self.start = new_start_date.toordinal()
+        self.end = new_end_date.toordinal()
         self.total_price = self.calculate_total_price()
 
 
+def _frozen(booking):
+    # A detached copy of a booking's current state
+    copy = Booking.__new__(Booking)
+    copy.booking_id = booking.booking_id
+    copy.room = booking.room
+    copy.guest_name = booking.guest_name
+    copy.start = booking.start
+    copy.end = booking.end
+    copy.total_price = booking.total_price
+    return copy
+
+
+def _booking_info(b):
+    return (f"Booking {b.booking_id} for room {b.room.number} by {b.guest_name} "
+            f"from {b.start_date} to {b.end_date} for {b.total_price:.2f}")
+
+
+_ABSENT = object()  # Marks a booking that did not exist yet when a SnapshotView was taken
+
+
+class SnapshotView:
+    # Read-only view of a hotel as it was when Hotel.snapshot_view() was called, which stays
+    # consistent while the hotel goes on changing. Taking one is O(1): the view shares the hotel's
+    # booking table and report counts, and the hotel freezes the prior state of every booking it
+    # adds, changes or removes into its open views first, so a view only holds what changed since.
+    # Reads copy a live booking and then check for a frozen state, which a writer always records
+    # before touching the booking. Bookings read through a view are detached copies; archived
+    # bookings are found by ID but, as with Hotel.bookings, not iterated. A view stops costing
+    # writers anything once it is closed or garbage collected.
+    def __init__(self, hotel):
+        self.name = hotel.name
+        self._table = hotel.bookings
+        self._overrides = {}  # booking ID -> frozen Booking, or _ABSENT
+        self._len = len(hotel.bookings)
+        self._income = hotel.bookings.total_income
+        self._room_counts = hotel._share_room_counts()
+        self._hotel = weakref.ref(hotel)
+
+    def _freeze(self, booking_id, booking):
+        if booking_id not in self._overrides:
+            self._overrides[booking_id] = _ABSENT if booking is None else _frozen(booking)
+
+    def close(self):
+        hotel = self._hotel()
+        if hotel is not None:
+            hotel._close_view(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, booking_id):
+        try:
+            self[booking_id]
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, booking_id):
+        try:
+            booking = _frozen(self._table[booking_id])
+        except KeyError:
+            booking = None
+        frozen = self._overrides.get(booking_id)
+        if frozen is not None:
+            booking = None if frozen is _ABSENT else frozen
+        if booking is None:
+            raise KeyError(booking_id)
+        return booking
+
+    def get(self, booking_id, default=None):
+        try:
+            return self[booking_id]
+        except KeyError:
+            return default
+
+    def items(self):
+        # (booking ID, Booking) pairs: bookings still live in the hotel's order, then the ones
+        # removed since the view was taken
+        overrides = self._overrides
+        live = self._table.snapshot_items()
+        for booking_id, booking in live:
+            booking = _frozen(booking)
+            frozen = overrides.get(booking_id)
+            if frozen is None:
+                yield booking_id, booking
+            elif frozen is not _ABSENT:
+                yield booking_id, frozen
+        live = dict(live)
+        for booking_id, frozen in list(overrides.items()):
+            if frozen is not _ABSENT and booking_id not in live:
+                yield booking_id, frozen
+
+    def __iter__(self):
+        return (booking_id for booking_id, _ in self.items())
+
+    def values(self):
+        return (booking for _, booking in self.items())
+
+    def get_booking_info(self, booking_id):
+        try:
+            return _booking_info(self[booking_id])
+        except KeyError:
+            raise Exception("Booking not found") from None
+
+    def get_total_income(self):
+        return self._income
+
+    def report(self):
+        return dict(self._room_counts)
+
+
 class Hotel:
-    def __init__(self, name, rooms):
+    def __init__(self, name, rooms, debug=False, booking_factory=None):
         self.name = name
-        self.rooms = rooms  # List of Room objects
-        self.bookings = {}  # Mapping booking_id to Booking objects
+        self._views = ()  # Weak references to open SnapshotViews
+        self._room_counts_shared = False  # Whether a view holds _room_counts (copied on write)
+        # Called like the Booking constructor to create bookings; compact_store.BookingStore.attach
+        # sets it to keep them in columnar storage instead
+        self.booking_factory = booking_factory or Booking
+        self.occupancy = None  # Optional OccupancyEngine answering get_available_rooms
+        self.availability_cache = None  # Optional AvailabilityCache in front of get_available_rooms and search_rooms
+        self._room_counts = {}  # Running report(): room number -> bookings in that room
+        self.bookings = {}  # Mapping booking_id to Booking objects, with running aggregates
+        self.rooms = rooms  # List of Room objects, indexed by room number
+        self.debug = debug  # Check running aggregates against a full recompute on every read
         self.next_booking_id = 1  # Unique booking ID counter
+        self.listeners = []  # Objects notified of booking changes, see _notify
+
+    @property
+    def rooms(self):
+        return self._rooms
+
+    @rooms.setter
+    def rooms(self, rooms):
+        # A RoomRegistry is used as is; any other list is copied into one, so rooms added to or
+        # removed from that list afterwards do not reach the hotel and must go through hotel.rooms
+        previous = getattr(self, "_rooms", None)
+        self._rooms = rooms if isinstance(rooms, RoomRegistry) else RoomRegistry(rooms)
+        if previous is not None and previous is not self._rooms:
+            previous.on_change = None
+        self._rooms.on_change = self._room_number_changed
+        self._room_counts = {number: self.bookings.count(number) for number in self._rooms.numbers()}
+        self._room_counts_shared = False
+        self._availability_changed()
+        if previous is not None:
+            self._notify("rooms_changed")
+
+    @property
+    def bookings(self):
+        return self._bookings
+
+    @bookings.setter
+    def bookings(self, bookings):
+        self._bookings = bookings if isinstance(bookings, BookingTable) else BookingTable(bookings)
+        self._bookings.on_count_change = self._room_count_changed
+        self._room_counts = {number: self._bookings.count(number) for number in self._room_counts}
+
+    def _share_room_counts(self):
+        self._room_counts_shared = True
+        return self._room_counts
+
+    def _unshare_room_counts(self):
+        if self._room_counts_shared:
+            self._room_counts = dict(self._room_counts)
+            self._room_counts_shared = False
+
+    def _availability_changed(self):
+        # Rooms or archived history changed under the availability cache
+        if self.availability_cache is not None:
+            self.availability_cache.clear()
+
+    def _room_number_changed(self, number, present):
+        self._availability_changed()
+        self._unshare_room_counts()
+        if present:
+            self._room_counts[number] = self.bookings.count(number)
+        else:
+            del self._room_counts[number]
+        self._notify("rooms_changed")
+
+    def _room_count_changed(self, number, count):
+        if number in self._room_counts:
+            self._unshare_room_counts()
+            self._room_counts[number] = count
+
+    def snapshot_view(self):
+        # A SnapshotView of the hotel as it is now
+        view = SnapshotView(self)
+        self._views += (weakref.ref(view, self._view_dropped),)
+        return view
+
+    def _close_view(self, view):
+        self._views = tuple(ref for ref in self._views if ref() is not view and ref() is not None)
+
+    def _view_dropped(self, ref):
+        self._views = tuple(other for other in self._views if other is not ref)
+
+    def _before_change(self, booking_id, booking):
+        # Freeze the state of a booking about to be added (booking is None), changed or removed
+        # into the open snapshot views
+        for ref in self._views:
+            view = ref()
+            if view is not None:
+                view._freeze(booking_id, booking)
+
+    def attach_archive(self, archive):
+        # Attach read-only booking history, such as an mmap_store.MmapArchive. An archive provides
+        # segments(), mapping room numbers to objects with starts and ends, the sorted start and end
+        # day ordinals of their bookings, overlaps(start, end) on day ordinals and end, the day by
+        # which all their bookings have ended; counts, bookings per room number; exact_income, its
+        # income in BookingTable units; and find(booking_id), returning a Booking or None.
+        self._attach_archive(archive)
+        self._archives_changed()
+
+    def detach_archive(self, archive):
+        self._detach_archive(archive)
+        self._archives_changed()
+
+    def _attach_archive(self, archive):
+        for number, segment in archive.segments().items():
+            room = self.rooms.get(number)
+            if room is not None:
+                room.archives += (segment,)
+        self.bookings.attach_archive(archive)
+
+    def _detach_archive(self, archive):
+        for number, segment in archive.segments().items():
+            room = self.rooms.get(number)
+            if room is not None:
+                room.archives = tuple(other for other in room.archives if other is not segment)
+        self.bookings.detach_archive(archive)
+
+    def _archives_changed(self):
+        # Attached history changed which dates are free
+        self._availability_changed()
+        if self.occupancy is not None:
+            self.occupancy.rebuild()
+
+    def archive_bookings(self, watermark, archive_factory, replaces=None):
+        # Move the bookings that ended on or before watermark out of the live structures into a
+        # read-only archive built by archive_factory(bookings), attached in place of the archive
+        # replaces if given (see retention.py). Every booking is live or archived throughout, so
+        # availability never misses one. Listeners get bookings_archived(bookings).
+        # Returns the new archive, or None if no booking had ended.
+        day = watermark.toordinal()
+        ended = [booking for room in self.rooms for booking in room.bookings.ended(day)]
+        if not ended:
+            return None
+        archive = archive_factory(ended)
+        # Moving bookings into an archive leaves every date as free as it was
+        self._attach_archive(archive)
+        if replaces is not None:
+            self._detach_archive(replaces)
+        if self._views:
+            for booking in ended:
+                self._before_change(booking.booking_id, booking)
+        for room in self.rooms:
+            room.bookings.drop_ended(day)
+        for booking in ended:
+            del self.bookings[booking.booking_id]
+        self._notify("bookings_archived", ended)
+        return archive
+
+    def check_aggregates(self):
+        # Compare the running aggregates with a full recompute
+        income = math.fsum(booking.total_price for booking in self.bookings.values())
+        if not math.isclose(self.bookings.income, income, rel_tol=1e-9, abs_tol=1e-9):
+            raise Exception(f"Income aggregate mismatch: {self.bookings.income} != {income}")
+        counts = Counter(booking.room.number for booking in self.bookings.values())
+        counts.update(self.bookings.archived_counts)
+        report = {room.number: counts.get(room.number, 0) for room in self.rooms}
+        if report != self._room_counts:
+            raise Exception(f"Report aggregate mismatch: {self._room_counts} != {report}")
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def _notify(self, event, *args):
+        # Listeners implement any of booking_added(booking), booking_cancelled(booking),
+        # booking_updated(booking, previous) where previous is a BookingState, and
+        # bookings_archived(bookings) for bookings moved into an archive by archive_bookings, and
+        # rooms_changed() when a room number appears in or disappears from hotel.rooms.
+        for listener in self.listeners:
+            handler = getattr(listener, event, None)
+            if handler is not None:
+                handler(*args)
 
     def generate_booking_id(self):
         booking_id = self.next_booking_id
         self.next_booking_id += 1
         return booking_id
 
-    def book_room(self, room_number, guest_name, start_date, end_date):
-        room = next((r for r in self.rooms if r.number == room_number), None)
+    def _check_booking(self, room_number, start_date, end_date):
+        room = self.rooms.get(room_number)
         if room is None:
             raise Exception("Room not found")
         if start_date >= end_date:
             raise Exception("Invalid date range")
-        if not room.is_available_for(start_date, end_date):
+        if not room.is_free(start_date.toordinal(), end_date.toordinal()):
             raise Exception("Room not available for the selected dates")
-        booking_id = self.generate_booking_id()
-        booking = Booking(booking_id, room, guest_name, start_date, end_date)
-        room.add_booking(booking)
-        self.bookings[booking_id] = booking
-        return booking_id
+        return room
+
+    def _commit_booking(self, booking):
+        booking.booking_id = self.generate_booking_id()
+        if self._views:
+            self._before_change(booking.booking_id, None)
+        booking.room.add_booking(booking)
+        self.bookings[booking.booking_id] = booking
+        self._notify("booking_added", booking)
+        return booking.booking_id
+
+    def book_room(self, room_number, guest_name, start_date, end_date):
+        room = self._check_booking(room_number, start_date, end_date)
+        return self._commit_booking(self.booking_factory(None, room, guest_name, start_date, end_date))
+
+    def book_many(self, requests, atomic=True):
+        # Book a batch of (room_number, guest_name, start_date, end_date) requests, validated against
+        # the current bookings and against each other before anything is committed.
+        # atomic=True books all requests or none and returns their booking IDs in request order;
+        # atomic=False books what it can and returns a BookingResult per request.
+        pending = {}  # Room -> IntervalIndex of bookings accepted earlier in this batch
+        accepted = []
+        results = []
+        for i, (room_number, guest_name, start_date, end_date) in enumerate(requests):
+            try:
+                room = self._check_booking(room_number, start_date, end_date)
+                batch = pending.setdefault(room, IntervalIndex())
+                if batch.overlaps(start_date.toordinal(), end_date.toordinal()):
+                    raise Exception("Room not available for the selected dates")
+            except Exception as e:
+                if atomic:
+                    raise Exception(f"Booking request {i} failed: {e}") from e
+                results.append(e)
+                continue
+            booking = self.booking_factory(None, room, guest_name, start_date, end_date)
+            batch.append(booking)
+            accepted.append(booking)
+            results.append(booking)
+        for booking in accepted:
+            self._commit_booking(booking)
+        if atomic:
+            return [booking.booking_id for booking in accepted]
+        return [BookingResult(None, r) if isinstance(r, Exception) else BookingResult(r.booking_id, None)
+                for r in results]
 
     def cancel_booking(self, booking_id):
         if booking_id not in self.bookings:
             raise Exception("Booking not found")
+        if self._views:
+            self._before_change(booking_id, self.bookings[booking_id])
         booking = self.bookings.pop(booking_id)
         booking.room.bookings.remove(booking)
+        self._notify("booking_cancelled", booking)
 
     def get_available_rooms(self, start_date, end_date):
-        return [room.number for room in self.rooms if room.is_available_for(start_date, end_date)]
+        if self.availability_cache is not None:
+            return self.availability_cache.get_available_rooms(start_date, end_date)
+        return self.scan_available_rooms(start_date, end_date)
+
+    def scan_available_rooms(self, start_date, end_date):
+        # get_available_rooms without the availability cache
+        if self.occupancy is not None and self.occupancy.covers(start_date, end_date):
+            return self.occupancy.available_rooms(start_date, end_date)
+        start, end = start_date.toordinal(), end_date.toordinal()
+        return [room.number for room in self.rooms if room.is_free(start, end)]
+
+    def set_pricing(self, pricing, room_type=None):
+        # Price future quotes for all rooms, or the rooms of one type, with a pricing policy.
+        # Existing bookings keep their price until their dates change.
+        for room in self.rooms:
+            if room_type is None or room.room_type == room_type:
+                room.pricing = pricing
+
+    def quote(self, room_numbers, ranges):
+        # Prices of each (start_date, end_date) stay in each room: one list per room, one price per range
+        rooms = []
+        for number in room_numbers:
+            room = self.rooms.get(number)
+            if room is None:
+                raise Exception("Room not found")
+            rooms.append(room)
+        quotes = []
+        for room in rooms:
+            quotes.extend(room.pricing.quote_many([room], ranges))
+        return quotes
+
+    def search_rooms(self, start_date, end_date, room_type=None, min_capacity=None, max_price=None, limit=None):
+        # Lazily yield numbers of rooms available for [start_date, end_date) that match the filters,
+        # cheapest first. The room registry's type/capacity/price indexes pick the candidates, so
+        # only those are checked for availability.
+        if self.availability_cache is not None:
+            rooms = iter(self.availability_cache.search_rooms(start_date, end_date, room_type, min_capacity, max_price))
+        else:
+            rooms = self.scan_rooms(start_date, end_date, room_type, min_capacity, max_price)
+        return rooms if limit is None else islice(rooms, limit)
+
+    def scan_rooms(self, start_date, end_date, room_type=None, min_capacity=None, max_price=None):
+        # search_rooms without the availability cache or a limit
+        start, end = start_date.toordinal(), end_date.toordinal()
+        return (room.number for room in self.rooms.candidates(room_type, min_capacity, max_price)
+                if room.is_free(start, end))
+
+    def _matching_rooms(self, target):
+        # target is a room number or a dict of search_rooms filters (room_type, min_capacity, max_price)
+        if isinstance(target, dict):
+            return list(self.rooms.candidates(**target))
+        room = self.rooms.get(target)
+        if room is None:
+            raise Exception("Room not found")
+        return [room]
+
+    def _room_windows(self, room, order, start, nights, forward):
+        for distance, window in room.bookings.windows(start, nights, forward):
+            # Archived history is not part of the gaps, so windows are confirmed against it
+            if not room.archives or room.is_free(window, window + nights):
+                yield distance, window, order, room
+
+    def _open_windows(self, rooms, start_date, nights, backward):
+        # Open windows across rooms nearest to start_date first, as (distance, start, order, room)
+        # with the start a day ordinal
+        start = start_date.toordinal()
+        directions = (True, False) if backward else (True,)
+        return heapq.merge(*(self._room_windows(room, order, start, nights, forward)
+                             for order, room in enumerate(rooms) for forward in directions))
+
+    def find_next_available(self, target, length, after_date):
+        # Earliest window of length nights starting on or after after_date in a room number or in
+        # the rooms matching criteria, as (room_number, start_date, end_date); None without rooms.
+        # Walks the gaps between bookings instead of probing day by day.
+        if length <= 0:
+            raise Exception("Invalid length")
+        for _, start, _, room in self._open_windows(self._matching_rooms(target), after_date, length, False):
+            return room.number, date.fromordinal(start), date.fromordinal(start + length)
+        return None
+
+    def suggest_alternatives(self, target, start_date, end_date, k=5, earliest=None):
+        # Up to k open windows as long as [start_date, end_date), in a room number or in the rooms
+        # matching criteria, nearest to start_date first (before or after it; ties go to the earlier
+        # date, then the cheaper room). Windows starting before earliest are skipped.
+        nights = (end_date - start_date).days
+        if nights <= 0:
+            raise Exception("Invalid date range")
+        earliest = None if earliest is None else earliest.toordinal()
+        suggestions = []
+        for _, start, _, room in self._open_windows(self._matching_rooms(target), start_date, nights, True):
+            if earliest is not None and start < earliest:
+                continue
+            suggestions.append((room.number, date.fromordinal(start), date.fromordinal(start + nights)))
+            if len(suggestions) == k:
+                break
+        return suggestions
 
     def get_total_income(self):
-        return sum(booking.total_price for booking in self.bookings.values())
+        if self.debug:
+            self.check_aggregates()
+        return self.bookings.total_income
 
     def get_booking_info(self, booking_id):
-        if booking_id not in self.bookings:
-            raise Exception("Booking not found")
-        b = self.bookings[booking_id]
-        return (f"Booking {b.booking_id} for room {b.room.number} by {b.guest_name} "
-                f"from {b.start_date} to {b.end_date} for {b.total_price:.2f}")
+        try:
+            b = self.bookings[booking_id]
+        except KeyError:
+            raise Exception("Booking not found") from None
+        return _booking_info(b)
 
     def report(self):
         # Report: number of bookings per room
-        return {room.number: len(room.bookings) for room in self.rooms}
+        if self.debug:
+            self.check_aggregates()
+        return dict(self._room_counts)
 
-    def update_booking(self, booking_id, new_start_date, new_end_date):
+    def update_booking(self, booking_id, new_start_date, new_end_date, new_room_number=None, keep_price=False):
+        # Change a booking's dates, and move it to new_room_number if given. Everything is checked
+        # before anything changes, so a rejected update leaves the hotel as it was. The booking is
+        # priced again for its new room and dates unless keep_price is set.
         if booking_id not in self.bookings:
             raise Exception("Booking not found")
         booking = self.bookings[booking_id]
         room = booking.room
-        # Temporarily remove the booking from the room's list
-        room.bookings.remove(booking)
-        if not room.is_available_for(new_start_date, new_end_date):
-            room.bookings.append(booking)
-            raise Exception("Room not available for the new selected dates")
-        try:
+        target = room if new_room_number is None else self.rooms.get(new_room_number)
+        if target is None:
+            raise Exception("Room not found")
+        if new_start_date >= new_end_date:
+            raise Exception("Invalid date range")
+        previous = BookingState(room, booking.start, booking.end, booking.total_price)
+        start, end = new_start_date.toordinal(), new_end_date.toordinal()
+        if self._views:
+            self._before_change(booking_id, booking)
+        if target is room:
+            # Only the bookings next to the new dates are checked; the booking keeps its place in
+            # the index unless it jumps past a neighbour
+            i = room.bookings.position(booking)
+            if not room.can_reschedule(i, start, end):
+                raise Exception("Room not available for the new selected dates")
             booking.update_dates(new_start_date, new_end_date)
-        except Exception as e:
-            room.bookings.append(booking)
-            raise e
-        room.bookings.append(booking)
\ No newline at end of file
+            room.bookings.reposition(i)
+        else:
+            if not target.is_free(start, end):
+                raise Exception("Room not available for the new selected dates")
+            room.bookings.remove(booking)
+            booking.room = target
+            booking.update_dates(new_start_date, new_end_date)
+            target.bookings.append(booking)
+        if keep_price:
+            booking.total_price = previous.total_price
+        self._commit_update(booking, previous)
+
+    def _commit_update(self, booking, previous):
+        if booking.room is not previous.room:
+            self.bookings.moved(previous.room, booking.room)
+        self.bookings.adjust_income(previous.total_price, booking.total_price)
+        self._notify("booking_updated", booking, previous)
\ No newline at end of file
@@ -0,0 +1,213 @@
+import os
+import time
+from bisect import bisect_left
+from hotel_system import Room
+
+# Opt-in metrics for a hotel. Nothing is patched until enable() is called, so an uninstrumented
+# hotel runs exactly the plain code; disable() puts everything back.
+#
+# While enabled, the hotel's public operations are wrapped on the instance, each room's pricing
+# policy is wrapped, and Room.is_free, the availability check on day ordinals that
+# is_available_for also goes through (a slotted class, so it cannot be wrapped per room), is
+# replaced on the class for as long as any hotel is instrumented. Booking events come in
+# through the hotel listener interface and are counted and passed on to on_event.
+
+OPERATIONS = ("book_room", "book_many", "cancel_booking", "update_booking", "get_available_rooms",
+              "search_rooms", "get_booking_info", "get_total_income", "report")
+DEFAULT_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0)
+SCAN_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+
+_instrumented_rooms = {}  # room -> Instrumentation, for the rooms of enabled instrumentations
+_is_free = Room.is_free
+
+
+def _instrumented_is_free(room, start, end):
+    instrumentation = _instrumented_rooms.get(room)
+    if instrumentation is None:
+        return _is_free(room, start, end)
+    began = time.perf_counter()
+    available = _is_free(room, start, end)
+    instrumentation._availability_checked(room, end, time.perf_counter() - began)
+    return available
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class _TimedPricing:
+    def __init__(self, policy, instrumentation):
+        self.policy = policy
+        self.instrumentation = instrumentation
+
+    def quote(self, room, start_date, end_date):
+        return self.quote_days(room, start_date.toordinal(), end_date.toordinal())
+
+    def quote_days(self, room, start, end):
+        began = time.perf_counter()
+        price = self.policy.quote_days(room, start, end)
+        self.instrumentation._observe("pricing_seconds", (("policy", type(self.policy).__name__),),
+                                      time.perf_counter() - began)
+        return price
+
+    def quote_many(self, rooms, ranges):
+        return self.policy.quote_many(rooms, ranges)
+
+    def __getattr__(self, name):
+        return getattr(self.policy, name)
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}" if labels else ""
+
+
+class Instrumentation:
+    # Counts and latency histograms of hotel operations, availability checks and pricing, the
+    # number of bookings each availability check compares against, and booking events.
+    # on_event(event, booking) is called for "booking_added", "booking_cancelled" and
+    # "booking_updated".
+    def __init__(self, hotel, buckets=DEFAULT_BUCKETS, on_event=None):
+        self.hotel = hotel
+        self.buckets = buckets
+        self.on_event = on_event
+        self.enabled = False
+        self.counters = {}  # (name, labels) -> count
+        self.histograms = {}  # (name, labels) -> Histogram
+        self._rooms = []
+
+    def _count(self, name, labels=()):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + 1
+
+    def _observe(self, name, labels, value, buckets=None):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(buckets or self.buckets)
+        histogram.observe(value)
+
+    def _timed(self, operation, method):
+        labels = (("operation", operation),)
+
+        def timed(*args, **kwargs):
+            began = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                self._count("operations_total", labels + (("outcome", "error"),))
+                raise
+            finally:
+                self._observe("operation_seconds", labels, time.perf_counter() - began)
+            self._count("operations_total", labels + (("outcome", "ok"),))
+            return result
+        return timed
+
+    def _availability_checked(self, room, end, seconds):
+        # The interval index compares only the booking starting last before end, and each archive
+        # segment one more
+        scanned = (1 if bisect_left(room.bookings.starts, end) else 0) + len(room.archives)
+        self._count("availability_checks_total")
+        self._observe("availability_check_seconds", (), seconds)
+        self._observe("availability_scanned_bookings", (), scanned, SCAN_BUCKETS)
+
+    def enable(self):
+        if self.enabled:
+            return
+        hotel = self.hotel
+        if any(operation in vars(hotel) for operation in OPERATIONS):
+            raise Exception("Hotel is already instrumented")
+        for operation in OPERATIONS:
+            setattr(hotel, operation, self._timed(operation, getattr(hotel, operation)))
+        self._rooms = list(hotel.rooms)
+        for room in self._rooms:
+            _instrumented_rooms[room] = self
+            room.pricing = _TimedPricing(room.pricing, self)
+        Room.is_free = _instrumented_is_free
+        hotel.add_listener(self)
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        hotel = self.hotel
+        hotel.remove_listener(self)
+        for operation in OPERATIONS:
+            delattr(hotel, operation)
+        for room in self._rooms:
+            if _instrumented_rooms.get(room) is self:
+                del _instrumented_rooms[room]
+            # Leave pricing set while enabled alone
+            if isinstance(room.pricing, _TimedPricing) and room.pricing.instrumentation is self:
+                room.pricing = room.pricing.policy
+        self._rooms = []
+        if not _instrumented_rooms:
+            Room.is_free = _is_free
+        self.enabled = False
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def export_text(self, prefix="hotel_"):
+        # Prometheus text exposition format
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {prefix}{name} counter")
+            lines.append(f"{prefix}{name}{_labels(labels)} {value}")
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {prefix}{name} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f"{prefix}{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{prefix}{name}_sum{_labels(labels)} {histogram.sum}")
+            lines.append(f"{prefix}{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, target):
+        # Write the text snapshot to a file path (replaced atomically) or pass it to a callable
+        text = self.export_text()
+        if callable(target):
+            target(text)
+            return
+        temporary = target + ".tmp"
+        with open(temporary, "w") as f:
+            f.write(text)
+        os.replace(temporary, target)
+
+    # Hotel listener interface
+
+    def _event(self, event, booking):
+        self._count("events_total", (("event", event),))
+        if self.on_event is not None:
+            self.on_event(event, booking)
+
+    def booking_added(self, booking):
+        self._event("booking_added", booking)
+
+    def booking_cancelled(self, booking):
+        self._event("booking_cancelled", booking)
+
+    def booking_updated(self, booking, previous):
+        self._event("booking_updated", booking)
@@ -0,0 +1,179 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from hotel_system import Booking, BookingTable
+
+# Archived booking history, one memory-mapped file per room plus an index of booking IDs.
+# Room files hold a header, then fixed-width columns (booking IDs, prices, start and end ordinals,
+# guest indexes) sorted by start date, then the room's guest name table. The columns are read
+# through memoryview casts of the mapping, so availability checks, counts and income never copy
+# records or build Booking objects. Columns use native byte order.
+ROOM_HEADER = struct.Struct("<4sIQQ")  # magic, padding, booking count, guest table offset
+ROOM_MAGIC = b"HARC"
+INDEX_HEADER = struct.Struct("<4sIQQ")  # magic, padding, room count, booking count
+INDEX_MAGIC = b"HIDX"
+INDEX_FILE = "index.bin"
+STRING = struct.Struct("<H")
+
+
+def _room_file(directory, number):
+    return os.path.join(directory, f"room-{number}.bin")
+
+
+def _write(path, parts):
+    with open(path, "wb") as f:
+        for part in parts:
+            f.write(part)
+
+
+def write_archive(directory, bookings):
+    # Write bookings (any iterable of Booking-like objects) as an archive in directory
+    by_room = {}
+    for booking in bookings:
+        by_room.setdefault(booking.room.number, []).append(booking)
+    os.makedirs(directory, exist_ok=True)
+    numbers = sorted(by_room)
+    index = []
+    for slot, number in enumerate(numbers):
+        room_bookings = sorted(by_room[number], key=lambda b: b.start)
+        guests = {}
+        guest_ids = array("I", (guests.setdefault(b.guest_name, len(guests)) for b in room_bookings))
+        columns = [array("q", (b.booking_id for b in room_bookings)),
+                   array("d", (b.total_price for b in room_bookings)),
+                   array("i", (b.start for b in room_bookings)),
+                   array("i", (b.end for b in room_bookings)),
+                   guest_ids]
+        guest_offset = ROOM_HEADER.size + sum(len(column) * column.itemsize for column in columns)
+        names = b"".join(STRING.pack(len(data)) + data for data in (name.encode("utf-8") for name in guests))
+        header = ROOM_HEADER.pack(ROOM_MAGIC, 0, len(room_bookings), guest_offset)
+        _write(_room_file(directory, number), [header] + [column.tobytes() for column in columns] + [names])
+        index.extend((b.booking_id, slot, row) for row, b in enumerate(room_bookings))
+    index.sort()
+    _write(os.path.join(directory, INDEX_FILE), [
+        INDEX_HEADER.pack(INDEX_MAGIC, 0, len(numbers), len(index)),
+        array("q", numbers).tobytes(),
+        array("q", (booking_id for booking_id, _, _ in index)).tobytes(),
+        array("I", (slot for _, slot, _ in index)).tobytes(),
+        array("I", (row for _, _, row in index)).tobytes(),
+    ])
+
+
+def _map(path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class RoomArchive:
+    # Memory-mapped booking history of one room
+    def __init__(self, path, room):
+        self.room = room
+        self._mmap = _map(path)
+        view = memoryview(self._mmap)
+        magic, _, count, self._guest_offset = ROOM_HEADER.unpack_from(view)
+        if magic != ROOM_MAGIC:
+            raise Exception("Not a room archive")
+        offset = ROOM_HEADER.size
+        self.booking_ids, offset = self._column(view, offset, "q", count)
+        self.prices, offset = self._column(view, offset, "d", count)
+        self.starts, offset = self._column(view, offset, "i", count)
+        self.ends, offset = self._column(view, offset, "i", count)
+        self.guest_ids, offset = self._column(view, offset, "I", count)
+        self.end = self.ends[-1] if count else 0  # Bookings in a room do not overlap, so ends are sorted
+        self._guests = None
+        self._exact_income = None
+
+    @staticmethod
+    def _column(view, offset, typecode, count):
+        end = offset + count * struct.calcsize(typecode)
+        return view[offset:end].cast(typecode), end
+
+    def __len__(self):
+        return len(self.booking_ids)
+
+    def overlaps(self, start, end):
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.ends[i - 1] > start
+
+    @property
+    def exact_income(self):
+        if self._exact_income is None:
+            exact = BookingTable._exact
+            self._exact_income = sum(exact(price) for price in self.prices)
+        return self._exact_income
+
+    def guest_name(self, row):
+        if self._guests is None:
+            # The guest table is only decoded once some booking is materialized
+            self._guests = []
+            view = self._mmap
+            offset = self._guest_offset
+            while offset < len(view):
+                (length,) = STRING.unpack_from(view, offset)
+                offset += STRING.size
+                self._guests.append(view[offset:offset + length].decode("utf-8"))
+                offset += length
+        return self._guests[self.guest_ids[row]]
+
+    def booking(self, row):
+        booking = Booking.__new__(Booking)
+        booking.booking_id = self.booking_ids[row]
+        booking.room = self.room
+        booking.guest_name = self.guest_name(row)
+        booking.start = self.starts[row]
+        booking.end = self.ends[row]
+        booking.total_price = self.prices[row]
+        return booking
+
+    def __iter__(self):
+        return (self.booking(row) for row in range(len(self)))
+
+    def close(self):
+        for column in (self.booking_ids, self.prices, self.starts, self.ends, self.guest_ids):
+            column.release()
+        self._mmap.close()
+
+
+class MmapArchive:
+    # An archive directory written by write_archive, opened against a hotel's rooms.
+    # Attach it with Hotel.attach_archive.
+    def __init__(self, directory, rooms):
+        self._mmap = _map(os.path.join(directory, INDEX_FILE))
+        view = memoryview(self._mmap)
+        magic, _, room_count, count = INDEX_HEADER.unpack_from(view)
+        if magic != INDEX_MAGIC:
+            raise Exception("Not a booking archive")
+        offset = INDEX_HEADER.size
+        self.numbers, offset = RoomArchive._column(view, offset, "q", room_count)
+        self.booking_ids, offset = RoomArchive._column(view, offset, "q", count)
+        self.slots, offset = RoomArchive._column(view, offset, "I", count)
+        self.rows, offset = RoomArchive._column(view, offset, "I", count)
+        self.rooms = [RoomArchive(_room_file(directory, number), rooms.get(number)) for number in self.numbers]
+
+    def __len__(self):
+        return len(self.booking_ids)
+
+    def segments(self):
+        return {number: room for number, room in zip(self.numbers, self.rooms)}
+
+    @property
+    def counts(self):
+        return {number: len(room) for number, room in zip(self.numbers, self.rooms)}
+
+    @property
+    def exact_income(self):
+        return sum(room.exact_income for room in self.rooms)
+
+    def find(self, booking_id):
+        i = bisect_left(self.booking_ids, booking_id)
+        if i < len(self.booking_ids) and self.booking_ids[i] == booking_id:
+            return self.rooms[self.slots[i]].booking(self.rows[i])
+        return None
+
+    def close(self):
+        for room in self.rooms:
+            room.close()
+        for column in (self.numbers, self.booking_ids, self.slots, self.rows):
+            column.release()
+        self._mmap.close()
@@ -0,0 +1,144 @@
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+# Bit positions set in each byte value, for walking the set bits of a mask a byte at a time
+_BITS = [tuple(i for i in range(8) if byte >> i & 1) for byte in range(256)]
+
+
+class OccupancyEngine:
+    # Occupancy bitmap over a rolling horizon of days. Each day is a Python int whose bit n is set
+    # when the room in slot n is booked for that night, so the occupancy of every room over a
+    # date range is a single OR-reduction of the day masks in that range. Slot n is position n of
+    # hotel.rooms, and free rooms are read off the set bits of the complement in slot order; the
+    # slots are rebuilt when a query finds the room list changed.
+    def __init__(self, hotel, start_date, horizon_days=365):
+        if horizon_days <= 0:
+            raise Exception("Invalid horizon")
+        self.hotel = hotel
+        self.start_date = start_date
+        self.horizon_days = horizon_days
+        self.rebuild()
+        hotel.add_listener(self)
+        hotel.occupancy = self
+
+    @property
+    def end_date(self):
+        return self.start_date + timedelta(days=self.horizon_days)
+
+    def detach(self):
+        self.hotel.remove_listener(self)
+        if self.hotel.occupancy is self:
+            self.hotel.occupancy = None
+
+    def rebuild(self):
+        self.days = [0] * self.horizon_days
+        self.rooms = list(self.hotel.rooms)  # Slot -> room
+        self.slots = {}  # Room -> mask of its slots
+        for i, room in enumerate(self.rooms):
+            self.slots[room] = self.slots.get(room, 0) | 1 << i
+        self.all_slots = (1 << len(self.rooms)) - 1
+        for room, mask in self.slots.items():
+            self._mark_bookings(room, mask, self.start_date, self.end_date)
+
+    def _slot(self, room):
+        # A room added since the last rebuild has no slot yet; the next query rebuilds
+        return self.slots.get(room, 0)
+
+    def _sync(self):
+        if self.rooms != self.hotel.rooms:
+            self.rebuild()
+
+    def _free_rooms(self, occupied):
+        # Numbers of the rooms whose slots are clear in occupied, in slot order
+        free = ~occupied & self.all_slots
+        rooms = self.rooms
+        numbers = []
+        for base, byte in enumerate(free.to_bytes((len(rooms) + 7) // 8, "little")):
+            if byte:
+                base *= 8
+                numbers.extend(rooms[base + i].number for i in _BITS[byte])
+        return numbers
+
+    def _mark_bookings(self, room, bit, start_date, end_date):
+        start, end = start_date.toordinal(), end_date.toordinal()
+        for booking in room.bookings.overlapping(start, end):
+            self._mark(bit, booking.start, booking.end, True)
+        for segment in room.archives:
+            if segment.end > start:
+                # Archived bookings ending after start and starting before end
+                for i in range(bisect_right(segment.ends, start), bisect_left(segment.starts, end)):
+                    self._mark(bit, segment.starts[i], segment.ends[i], True)
+
+    def _mark(self, bit, start, end, occupied):
+        # start and end are day ordinals
+        if not bit:
+            return
+        origin = self.start_date.toordinal()
+        first = max(start - origin, 0)
+        last = min(end - origin, self.horizon_days)
+        days = self.days
+        if occupied:
+            for i in range(first, last):
+                days[i] |= bit
+        else:
+            for i in range(first, last):
+                days[i] &= ~bit
+
+    def covers(self, start_date, end_date):
+        return self.start_date <= start_date < end_date <= self.end_date
+
+    def advance(self, start_date):
+        # Roll the horizon forward so it starts at start_date, keeping its length
+        shift = (start_date - self.start_date).days
+        if shift <= 0:
+            if shift < 0:
+                self.start_date = start_date
+                self.rebuild()
+            return
+        old_end = self.end_date
+        self.start_date = start_date
+        if shift >= self.horizon_days:
+            self.rebuild()
+            return
+        self.days = self.days[shift:] + [0] * shift
+        for room, bit in self.slots.items():
+            self._mark_bookings(room, bit, max(old_end, self.start_date), self.end_date)
+
+    def occupied_mask(self, start_date, end_date):
+        first = (start_date - self.start_date).days
+        last = (end_date - self.start_date).days
+        return reduce(or_, self.days[first:last], 0)
+
+    def available_rooms(self, start_date, end_date):
+        if not self.covers(start_date, end_date):
+            raise Exception("Date range outside occupancy horizon")
+        self._sync()
+        return self._free_rooms(self.occupied_mask(start_date, end_date))
+
+    def available_rooms_batch(self, ranges):
+        # Availability for many (start_date, end_date) ranges, one result list per range.
+        # Ranges outside the horizon fall back to the per-room interval indexes.
+        self._sync()
+        rooms = self.hotel.rooms
+        results = []
+        for start_date, end_date in ranges:
+            if self.covers(start_date, end_date):
+                results.append(self._free_rooms(self.occupied_mask(start_date, end_date)))
+            else:
+                start, end = start_date.toordinal(), end_date.toordinal()
+                results.append([room.number for room in rooms if room.is_free(start, end)])
+        return results
+
+    # Hotel listener interface
+
+    def booking_added(self, booking):
+        self._mark(self._slot(booking.room), booking.start, booking.end, True)
+
+    def booking_cancelled(self, booking):
+        self._mark(self._slot(booking.room), booking.start, booking.end, False)
+
+    def booking_updated(self, booking, previous):
+        self._mark(self._slot(previous.room), previous.start, previous.end, False)
+        self._mark(self._slot(booking.room), booking.start, booking.end, True)
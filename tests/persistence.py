@@ -0,0 +1,353 @@
+import os
+import struct
+import zlib
+from datetime import date
+from hotel_system import Room, Booking, Hotel
+from pricing import DEFAULT_PRICING
+from retention import ArchivePartition, Retention
+
+# Operation log records: a header with the operation code and payload length, the payload, then a
+# CRC32 of header and payload. A torn record at the end of the log (from a crash mid-write) fails
+# its length or CRC check, and replay stops there.
+HEADER = struct.Struct("<BH")
+CRC = struct.Struct("<I")
+# BOOK and UPDATE records come from logs written before prices were logged and are priced again by
+# the room's policy on replay; PRICED_BOOK and PRICED_UPDATE keep the price the booking was given.
+BOOK, CANCEL, UPDATE, ARCHIVE, PRICED_BOOK, PRICED_UPDATE = 1, 2, 3, 4, 5, 6
+BOOK_PAYLOAD = struct.Struct("<qqii")  # booking ID, room number, start and end ordinals; then the guest name
+CANCEL_PAYLOAD = struct.Struct("<q")  # booking ID
+UPDATE_PAYLOAD = struct.Struct("<qqii")  # booking ID, room number, new start and end ordinals
+PRICED_BOOK_PAYLOAD = struct.Struct("<qqiid")  # BOOK_PAYLOAD and the total price; then the guest name
+PRICED_UPDATE_PAYLOAD = struct.Struct("<qqiid")  # UPDATE_PAYLOAD and the new total price
+ARCHIVE_PAYLOAD = struct.Struct("<i")  # end ordinal of the last archived stay
+
+# Snapshots are a zlib-compressed header, rooms, guest name table and fixed-width booking records,
+# followed (from version 2) by the archived bookings, written to a temporary file and renamed into place
+SNAPSHOT_MAGIC = b"HSNP"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct("<4sHqqQQQ")  # magic, version, log offset, next booking ID, rooms, guests, bookings
+SNAPSHOT_ROOM = struct.Struct("<qdq")  # number, price per day, capacity; then the room type
+SNAPSHOT_BOOKING = struct.Struct("<qqiidI")  # booking ID, room number, start, end, total price, guest index
+SNAPSHOT_ARCHIVE = struct.Struct("<iQ")  # archive watermark ordinal, archived bookings; then their records
+STRING = struct.Struct("<H")
+
+
+def _pack_string(value):
+    data = value.encode("utf-8")
+    return STRING.pack(len(data)) + data
+
+
+def _unpack_string(buffer, offset):
+    (length,) = STRING.unpack_from(buffer, offset)
+    offset += STRING.size
+    return bytes(buffer[offset:offset + length]).decode("utf-8"), offset + length
+
+
+class OperationLog:
+    # Append-only log of booking operations, attached to a Hotel as a listener.
+    # Records are buffered and written with a single fsync once group_size of them are pending
+    # (group commit); commit() forces the pending group out.
+    def __init__(self, path, group_size=64, fsync=True):
+        self.path = path
+        self.group_size = group_size
+        self.fsync = fsync
+        self._file = open(path, "ab")
+        self._pending = bytearray()
+        self._pending_count = 0
+        self.position = self._file.tell()  # Bytes durably written
+
+    def _append(self, op, payload):
+        header = HEADER.pack(op, len(payload))
+        self._pending += header
+        self._pending += payload
+        self._pending += CRC.pack(zlib.crc32(payload, zlib.crc32(header)))
+        self._pending_count += 1
+        if self._pending_count >= self.group_size:
+            self.commit()
+
+    def commit(self):
+        if not self._pending:
+            return
+        self._file.write(self._pending)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.position = self._file.tell()
+        self._pending.clear()
+        self._pending_count = 0
+
+    def close(self):
+        self.commit()
+        self._file.close()
+
+    # Hotel listener interface
+
+    def booking_added(self, booking):
+        payload = PRICED_BOOK_PAYLOAD.pack(booking.booking_id, booking.room.number,
+                                           booking.start, booking.end, booking.total_price)
+        self._append(PRICED_BOOK, payload + _pack_string(booking.guest_name))
+
+    def booking_cancelled(self, booking):
+        self._append(CANCEL, CANCEL_PAYLOAD.pack(booking.booking_id))
+
+    def booking_updated(self, booking, previous):
+        self._append(PRICED_UPDATE, PRICED_UPDATE_PAYLOAD.pack(booking.booking_id, booking.room.number,
+                                                               booking.start, booking.end, booking.total_price))
+
+    def bookings_archived(self, bookings):
+        # Archiving as of the day the last of these stays ended moves exactly the same bookings
+        self._append(ARCHIVE, ARCHIVE_PAYLOAD.pack(max(booking.end for booking in bookings)))
+
+
+def _records(data):
+    # Yield (op, payload, end) for each complete, intact record in data, stopping at a torn tail
+    position = 0
+    while position + HEADER.size <= len(data):
+        header = data[position:position + HEADER.size]
+        op, length = HEADER.unpack(header)
+        end = position + HEADER.size + length
+        if end + CRC.size > len(data):
+            return
+        payload = data[position + HEADER.size:end]
+        if CRC.unpack_from(data, end)[0] != zlib.crc32(payload, zlib.crc32(header)):
+            return
+        position = end + CRC.size
+        yield op, payload, position
+
+
+def read_log(path, offset=0):
+    # Yield (op, fields, end offset) for each complete record from offset on. Book and update
+    # fields end with the total price, None for records without one.
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    for op, payload, end in _records(data):
+        if op == BOOK:
+            fields = BOOK_PAYLOAD.unpack_from(payload) + (None, _unpack_string(payload, BOOK_PAYLOAD.size)[0])
+        elif op == PRICED_BOOK:
+            fields = PRICED_BOOK_PAYLOAD.unpack_from(payload) + \
+                (_unpack_string(payload, PRICED_BOOK_PAYLOAD.size)[0],)
+        elif op == CANCEL:
+            fields = CANCEL_PAYLOAD.unpack_from(payload)
+        elif op == UPDATE:
+            fields = UPDATE_PAYLOAD.unpack_from(payload) + (None,)
+        elif op == PRICED_UPDATE:
+            fields = PRICED_UPDATE_PAYLOAD.unpack_from(payload)
+        elif op == ARCHIVE:
+            fields = ARCHIVE_PAYLOAD.unpack_from(payload)
+        else:
+            raise Exception(f"Unknown log operation: {op}")
+        yield op, fields, offset + end
+
+
+def _restore_price(hotel, booking_id, price):
+    # Give a replayed booking its logged price, whatever the room's policy quotes now
+    booking = hotel.bookings[booking_id]
+    if price is not None and booking.total_price != price:
+        hotel.bookings.adjust_income(booking.total_price, price)
+        booking.total_price = price
+
+
+def replay_log(hotel, path, offset=0):
+    # Re-apply logged operations to hotel, reproducing the logged booking IDs and prices.
+    # Returns the offset just past the last complete record.
+    retention = None
+    for op, fields, offset in read_log(path, offset):
+        if op in (BOOK, PRICED_BOOK):
+            booking_id, room_number, start, end, price, guest_name = fields
+            hotel.next_booking_id = booking_id
+            hotel.book_room(room_number, guest_name, date.fromordinal(start), date.fromordinal(end))
+            _restore_price(hotel, booking_id, price)
+        elif op == CANCEL:
+            hotel.cancel_booking(fields[0])
+        elif op == ARCHIVE:
+            if retention is None:
+                retention = Retention(hotel)
+            retention.archive_before(date.fromordinal(fields[0]))
+        else:
+            booking_id, room_number, start, end, price = fields
+            hotel.update_booking(booking_id, date.fromordinal(start), date.fromordinal(end), room_number)
+            _restore_price(hotel, booking_id, price)
+    return offset
+
+
+def dump_snapshot(hotel, log_offset=0):
+    # The compressed snapshot of hotel as bytes. Attached archives are saved with it and restored
+    # as a single ArchivePartition.
+    guests = {}
+
+    def pack(bookings):
+        records = bytearray()
+        for booking in bookings:
+            guest = guests.setdefault(booking.guest_name, len(guests))
+            records += SNAPSHOT_BOOKING.pack(booking.booking_id, booking.room.number, booking.start,
+                                             booking.end, booking.total_price, guest)
+        return records
+
+    records = pack(hotel.bookings.values())
+    archives = hotel.bookings.archives
+    archived = [booking for archive in archives for segment in archive.segments().values() for booking in segment]
+    watermark = max([booking.end for booking in archived] +
+                    [archive.watermark.toordinal() for archive in archives if isinstance(archive, ArchivePartition)],
+                    default=0)
+    archived_records = pack(archived)
+    parts = [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, log_offset, hotel.next_booking_id,
+                                  len(hotel.rooms), len(guests), len(hotel.bookings)), _pack_string(hotel.name)]
+    for room in hotel.rooms:
+        parts.append(SNAPSHOT_ROOM.pack(room.number, room.price_per_day, room.capacity))
+        parts.append(_pack_string(room.room_type))
+    parts.extend(_pack_string(guest_name) for guest_name in guests)
+    parts.append(records)
+    parts.append(SNAPSHOT_ARCHIVE.pack(watermark, len(archived)))
+    parts.append(archived_records)
+    return zlib.compress(b"".join(parts), 1)
+
+
+def write_snapshot(hotel, path, log_offset=0):
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(dump_snapshot(hotel, log_offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def _policy(pricing, number):
+    if isinstance(pricing, dict):
+        return pricing.get(number, DEFAULT_PRICING)
+    return DEFAULT_PRICING if pricing is None else pricing
+
+
+def load_snapshot(data, hotel_class=Hotel, pricing=None):
+    # Rebuild a hotel from snapshot bytes without re-validating or re-pricing its bookings.
+    # Pricing policies are not stored: pricing is the policy of every room, or a dict of room
+    # numbers to policies, with DEFAULT_PRICING for the rest.
+    # Returns the hotel and the log offset the snapshot covers.
+    data = zlib.decompress(data)
+    magic, version, log_offset, next_booking_id, room_count, guest_count, booking_count = \
+        SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version not in (1, SNAPSHOT_VERSION):
+        raise Exception("Not a hotel snapshot")
+    name, offset = _unpack_string(data, SNAPSHOT_HEADER.size)
+    rooms = []
+    for _ in range(room_count):
+        number, price_per_day, capacity = SNAPSHOT_ROOM.unpack_from(data, offset)
+        room_type, offset = _unpack_string(data, offset + SNAPSHOT_ROOM.size)
+        rooms.append(Room(number, room_type, price_per_day, capacity, _policy(pricing, number)))
+    guests = []
+    for _ in range(guest_count):
+        guest_name, offset = _unpack_string(data, offset)
+        guests.append(guest_name)
+    hotel = hotel_class(name, rooms)
+    room_by_number = {room.number: room for room in rooms}
+    by_room = {room.number: [] for room in rooms}
+    bookings = {}
+    archive_offset = offset + booking_count * SNAPSHOT_BOOKING.size
+    records = memoryview(data)[offset:archive_offset]
+    new = Booking.__new__
+    for booking_id, number, start, end, price, guest in SNAPSHOT_BOOKING.iter_unpack(records):
+        booking = new(Booking)
+        booking.booking_id = booking_id
+        booking.room = room_by_number[number]
+        booking.guest_name = guests[guest]
+        booking.start = start
+        booking.end = end
+        booking.total_price = price
+        by_room[number].append(booking)
+        bookings[booking_id] = booking
+    # Fill each room's interval index in one go rather than one sorted insert at a time
+    for room in rooms:
+        room.bookings.fill(by_room[room.number])
+    hotel.bookings = bookings
+    hotel.next_booking_id = next_booking_id
+    if version >= 2:
+        watermark, archived_count = SNAPSHOT_ARCHIVE.unpack_from(data, archive_offset)
+        if archived_count:
+            offset = archive_offset + SNAPSHOT_ARCHIVE.size
+            archived = {}
+            records = memoryview(data)[offset:offset + archived_count * SNAPSHOT_BOOKING.size]
+            for booking_id, number, start, end, price, guest in SNAPSHOT_BOOKING.iter_unpack(records):
+                archived.setdefault(room_by_number[number], []).append((start, end, booking_id, price, guests[guest]))
+            hotel.attach_archive(ArchivePartition(archived, date.fromordinal(watermark)))
+    return hotel, log_offset
+
+
+def read_snapshot(path, hotel_class=Hotel, pricing=None):
+    with open(path, "rb") as f:
+        return load_snapshot(f.read(), hotel_class, pricing)
+
+
+class Persistence:
+    # Durable storage for one hotel in a directory: an operation log plus the latest snapshot.
+    # A snapshot is taken every snapshot_every logged operations (if set) or on demand, and
+    # recovery loads it and replays only the part of the log written after it. Rooms are not
+    # logged: a snapshot is taken when the persistence starts without one and whenever the hotel's
+    # rooms change, so the log only ever refers to rooms the snapshot before it has.
+    LOG = "operations.log"
+    SNAPSHOT = "snapshot.bin"
+
+    def __init__(self, hotel, directory, group_size=64, snapshot_every=None, fsync=True):
+        self.hotel = hotel
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+        self.log = OperationLog(os.path.join(directory, self.LOG), group_size, fsync)
+        self._since_snapshot = 0
+        if not os.path.exists(os.path.join(directory, self.SNAPSHOT)):
+            self.snapshot()
+        hotel.add_listener(self)
+
+    @classmethod
+    def open(cls, directory, hotel_class=Hotel, pricing=None, **kwargs):
+        # Recover the hotel stored in directory, with its rooms priced by pricing as in
+        # load_snapshot; returns the Persistence attached to it
+        snapshot_path = os.path.join(directory, cls.SNAPSHOT)
+        log_path = os.path.join(directory, cls.LOG)
+        if not os.path.exists(snapshot_path):
+            raise Exception("No snapshot found")
+        hotel, log_offset = read_snapshot(snapshot_path, hotel_class, pricing)
+        if os.path.exists(log_path):
+            end = replay_log(hotel, log_path, log_offset)
+            # Drop a torn record left at the end of the log so new records follow a complete one
+            with open(log_path, "r+b") as f:
+                f.truncate(end)
+        return cls(hotel, directory, **kwargs)
+
+    def snapshot(self):
+        self.log.commit()
+        write_snapshot(self.hotel, os.path.join(self.directory, self.SNAPSHOT), self.log.position)
+        self._since_snapshot = 0
+
+    def commit(self):
+        self.log.commit()
+
+    def close(self):
+        self.hotel.remove_listener(self)
+        self.log.close()
+
+    def _logged(self):
+        self._since_snapshot += 1
+        if self.snapshot_every is not None and self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    # Hotel listener interface
+
+    def booking_added(self, booking):
+        self.log.booking_added(booking)
+        self._logged()
+
+    def booking_cancelled(self, booking):
+        self.log.booking_cancelled(booking)
+        self._logged()
+
+    def booking_updated(self, booking, previous):
+        self.log.booking_updated(booking, previous)
+        self._logged()
+
+    def bookings_archived(self, bookings):
+        self.log.bookings_archived(bookings)
+        self._logged()
+
+    def rooms_changed(self):
+        self.snapshot()
+
@@ -0,0 +1,100 @@
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import timedelta
+
+# A rate multiplier for the nights in [start_date, end_date), for one room type or (None) all of them
+Season = namedtuple("Season", "start_date end_date multiplier room_type", defaults=(None,))
+
+
+class DefaultPricing:
+    # The original rule: price per day for every night, 10% off stays longer than 5 nights.
+    # Policies implement quote_days on day ordinals, which bookings call, and quote_nights, which
+    # decides how a stay's price is attributed to its nights; quote takes dates.
+    def quote(self, room, start_date, end_date):
+        return self.quote_days(room, start_date.toordinal(), end_date.toordinal())
+
+    def quote_days(self, room, start, end):
+        num_days = end - start
+        price = num_days * room.price_per_day
+        if num_days > 5:
+            price *= 0.9  # Apply 10% discount for stays longer than 5 days
+        return price
+
+    def quote_nights(self, room, start, end):
+        # The price of each night of a stay, in order, adding up to quote_days; the discount is
+        # spread evenly over the nights
+        nights = end - start
+        return [self.quote_days(room, start, end) / nights] * nights if nights > 0 else []
+
+    def quote_many(self, rooms, ranges):
+        ranges = [(start_date.toordinal(), end_date.toordinal()) for start_date, end_date in ranges]
+        return [[self.quote_days(room, start, end) for start, end in ranges] for room in rooms]
+
+
+DEFAULT_PRICING = DefaultPricing()
+
+
+class RulePricing(DefaultPricing):
+    # Seasonal, day-of-week and length-of-stay pricing over a calendar of horizon_days nights.
+    # A night costs the room's price_per_day times its season and weekday multipliers; a stay is
+    # discounted by the factor of the longest stay tier it reaches. Each room type's nightly
+    # multipliers are compiled once into a cumulative array, so quoting any stay is O(1) apart from
+    # the tier lookup. Nights outside the calendar are charged at the plain price_per_day.
+    def __init__(self, start_date, horizon_days, seasons=(), weekday_multipliers=None, stay_tiers=((6, 0.9),)):
+        self.start_date = start_date
+        self._origin = start_date.toordinal()
+        self.horizon_days = horizon_days
+        self.seasons = list(seasons)
+        self.weekday_multipliers = list(weekday_multipliers or [1.0] * 7)  # Monday first
+        if len(self.weekday_multipliers) != 7:
+            raise Exception("Need one weekday multiplier per day of the week")
+        tiers = sorted(stay_tiers)
+        self._tier_nights = [nights for nights, _ in tiers]
+        self._tier_factors = [factor for _, factor in tiers]
+        self._calendars = {}  # room type -> cumulative multipliers, length horizon_days + 1
+        self._multipliers = {}  # room type -> nightly multipliers, length horizon_days
+
+    def _calendar(self, room_type):
+        calendar = self._calendars.get(room_type)
+        if calendar is None:
+            multipliers = [self.weekday_multipliers[(self.start_date + timedelta(days=i)).weekday()]
+                           for i in range(self.horizon_days)]
+            for season in self.seasons:
+                if season.room_type is not None and season.room_type != room_type:
+                    continue
+                first = max((season.start_date - self.start_date).days, 0)
+                last = min((season.end_date - self.start_date).days, self.horizon_days)
+                for i in range(first, last):
+                    multipliers[i] *= season.multiplier
+            self._multipliers[room_type] = multipliers
+            calendar = [0.0] * (self.horizon_days + 1)
+            total = 0.0
+            for i, multiplier in enumerate(multipliers):
+                total += multiplier
+                calendar[i + 1] = total
+            self._calendars[room_type] = calendar
+        return calendar
+
+    def stay_factor(self, nights):
+        i = bisect_right(self._tier_nights, nights)
+        return self._tier_factors[i - 1] if i else 1.0
+
+    def quote_days(self, room, start, end):
+        calendar = self._calendar(room.room_type)
+        nights = end - start
+        first = min(max(start - self._origin, 0), self.horizon_days)
+        last = min(max(end - self._origin, first), self.horizon_days)
+        rated_nights = calendar[last] - calendar[first] + (nights - (last - first))
+        price = room.price_per_day * rated_nights
+        factor = self.stay_factor(nights)
+        if factor != 1.0:
+            price *= factor
+        return price
+
+    def quote_nights(self, room, start, end):
+        self._calendar(room.room_type)
+        multipliers = self._multipliers[room.room_type]
+        rate = room.price_per_day * self.stay_factor(end - start)
+        horizon = range(self.horizon_days)
+        return [rate * multipliers[day - self._origin] if day - self._origin in horizon else rate
+                for day in range(start, end)]
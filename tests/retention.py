@@ -0,0 +1,174 @@
+import struct
+import zlib
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+from hotel_system import Booking, BookingTable
+
+# Retention of past stays. A booking that ended on or before a watermark can never overlap a stay
+# starting after it, so Retention moves such bookings out of the hotel's live structures (the
+# booking table and the rooms' interval indexes) into an ArchivePartition, attached through the
+# archive protocol of Hotel.attach_archive. Income and report() keep counting them from the
+# partition's precomputed totals, availability checks of past dates still see them, and
+# hotel.bookings[booking_id] still finds them, read-only.
+#
+# A partition keeps each room's start and end ordinals as arrays for overlap checks. The rest of
+# the records (booking IDs, prices, guest names) is zlib-compressed per room and only decompressed
+# to materialize a booking. Partitions live in memory; to keep one across restarts write it out
+# with mmap_store.write_archive, which takes any iterable of bookings.
+STRING = struct.Struct("<H")
+
+
+class ArchiveSegment:
+    # One room's archived bookings, sorted by start
+    __slots__ = ("room", "starts", "ends", "end", "_data")
+
+    def __init__(self, room, records):
+        # records are (start, end, booking ID, total price, guest name) tuples sorted by start
+        self.room = room
+        self.starts = array("i", (record[0] for record in records))
+        self.ends = array("i", (record[1] for record in records))
+        self.end = self.ends[-1] if records else 0
+        guests = {}
+        guest_ids = array("I", (guests.setdefault(record[4], len(guests)) for record in records))
+        parts = [array("q", (record[2] for record in records)).tobytes(),
+                 array("d", (record[3] for record in records)).tobytes(),
+                 guest_ids.tobytes()]
+        parts.extend(STRING.pack(len(data)) + data for data in (name.encode("utf-8") for name in guests))
+        self._data = zlib.compress(b"".join(parts))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps(self, start, end):
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.ends[i - 1] > start
+
+    def _columns(self):
+        # Decompress the booking ID, price and guest columns and the guest name table
+        data = memoryview(zlib.decompress(self._data))
+        count = len(self.starts)
+        booking_ids = data[:8 * count].cast("q")
+        prices = data[8 * count:16 * count].cast("d")
+        guest_ids = data[16 * count:20 * count].cast("I")
+        guests = []
+        offset = 20 * count
+        while offset < len(data):
+            (length,) = STRING.unpack_from(data, offset)
+            offset += STRING.size
+            guests.append(bytes(data[offset:offset + length]).decode("utf-8"))
+            offset += length
+        return booking_ids, prices, guest_ids, guests
+
+    def records(self):
+        # Decompress the records, in start order
+        booking_ids, prices, guest_ids, guests = self._columns()
+        return [(start, end, booking_id, price, guests[guest])
+                for start, end, booking_id, price, guest in zip(self.starts, self.ends, booking_ids, prices, guest_ids)]
+
+    def _booking(self, start, end, booking_id, price, guest_name):
+        booking = Booking.__new__(Booking)
+        booking.booking_id = booking_id
+        booking.room = self.room
+        booking.guest_name = guest_name
+        booking.start = start
+        booking.end = end
+        booking.total_price = price
+        return booking
+
+    def booking(self, row):
+        booking_ids, prices, guest_ids, guests = self._columns()
+        return self._booking(self.starts[row], self.ends[row], booking_ids[row], prices[row], guests[guest_ids[row]])
+
+    def __iter__(self):
+        # One decompression for the whole segment
+        for record in self.records():
+            yield self._booking(*record)
+
+
+class ArchivePartition:
+    # Read-only bookings of a hotel that ended on or before watermark, grouped by room.
+    # records_by_room maps Room objects to (start, end, booking ID, total price, guest name) tuples.
+    def __init__(self, records_by_room, watermark):
+        self.watermark = watermark
+        self._segments = {}
+        self.exact_income = 0
+        exact = BookingTable._exact
+        index = []
+        for room, records in records_by_room.items():
+            records = sorted(records)
+            self._segments[room.number] = ArchiveSegment(room, records)
+            self.exact_income += sum(exact(record[3]) for record in records)
+            index.extend((record[2], room.number, row) for row, record in enumerate(records))
+        index.sort()
+        self.booking_ids = array("q", (booking_id for booking_id, _, _ in index))
+        self._numbers = array("q", (number for _, number, _ in index))
+        self._rows = array("I", (row for _, _, row in index))
+
+    def __len__(self):
+        return len(self.booking_ids)
+
+    def __iter__(self):
+        for segment in self._segments.values():
+            yield from segment
+
+    def segments(self):
+        return dict(self._segments)
+
+    @property
+    def counts(self):
+        return {number: len(segment) for number, segment in self._segments.items()}
+
+    def find(self, booking_id):
+        i = bisect_left(self.booking_ids, booking_id)
+        if i < len(self.booking_ids) and self.booking_ids[i] == booking_id:
+            return self._segments[self._numbers[i]].booking(self._rows[i])
+        return None
+
+    def nbytes(self):
+        # Bytes held by the partition's compressed records and date columns
+        return sum(len(segment._data) + segment.starts.itemsize * 2 * len(segment)
+                   for segment in self._segments.values())
+
+
+class Retention:
+    # Keeps a hotel's live structures down to the stays ending after a watermark. Every run moves
+    # the newly ended bookings into a single partition that replaces the previous one, so a room
+    # never has more than one segment to check.
+    def __init__(self, hotel, keep_days=0):
+        self.hotel = hotel
+        self.keep_days = keep_days
+        # Carry on from a partition already attached, such as one restored by persistence.py
+        self.partition = next((archive for archive in hotel.bookings.archives if isinstance(archive, ArchivePartition)),
+                              None)
+
+    @property
+    def watermark(self):
+        return None if self.partition is None else self.partition.watermark
+
+    def _merged(self, watermark):
+        previous = self.partition
+
+        def build(bookings):
+            records = {}
+            if previous is not None:
+                for segment in previous.segments().values():
+                    records[segment.room] = segment.records()
+            for booking in bookings:
+                records.setdefault(booking.room, []).append(
+                    (booking.start, booking.end, booking.booking_id, booking.total_price, booking.guest_name))
+            return ArchivePartition(records, watermark if previous is None else max(watermark, previous.watermark))
+        return build
+
+    def archive_before(self, watermark):
+        # Archive the bookings that ended on or before watermark; returns how many were archived
+        partition = self.hotel.archive_bookings(watermark, self._merged(watermark), self.partition)
+        if partition is None:
+            return 0
+        archived = len(partition) - (0 if self.partition is None else len(self.partition))
+        self.partition = partition
+        return archived
+
+    def apply(self, today):
+        # Archive everything that ended more than keep_days before today
+        return self.archive_before(today - timedelta(days=self.keep_days))
@@ -0,0 +1,129 @@
+import random
+import time
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+from allocation import Allocator, Reservation
+
+
+def random_reservations(rng, count, room_types=("standard", "luxury")):
+    reservations = []
+    for _ in range(count):
+        start = date(2025, 1, 1) + timedelta(days=rng.randrange(120))
+        reservations.append(Reservation("Guest", rng.choice(room_types), start, start + timedelta(days=rng.randrange(1, 8))))
+    return reservations
+
+
+def build_hotel(count):
+    return Hotel("Florida Beach", [Room(100 + i, "standard" if i % 3 else "luxury", 100.0 + i % 3, 2) for i in range(count)])
+
+
+class TestAllocator(unittest.TestCase):
+    def setUp(self):
+        self.hotel = Hotel("Florida Beach", [Room(101, "standard", 100.0, 2), Room(102, "standard", 100.0, 2),
+                                             Room(103, "luxury", 200.0, 3)])
+        self.allocator = Allocator(self.hotel)
+
+    def test_best_fit(self):
+        self.hotel.book_room(101, "Ann", date(2025, 6, 1), date(2025, 6, 5))
+        self.hotel.book_room(102, "Ben", date(2025, 6, 1), date(2025, 6, 3))
+        results = self.allocator.assign([("Cal", "standard", date(2025, 6, 5), date(2025, 6, 8)),
+                                         ("Dee", "standard", date(2025, 6, 3), date(2025, 6, 5)),
+                                         ("Eve", "luxury", date(2025, 6, 3), date(2025, 6, 5))])
+        self.assertEqual([result.error for result in results], [None, None, None])
+        rooms = [self.hotel.bookings[result.booking_id].room.number for result in results]
+        self.assertEqual(rooms[1:], [102, 103])
+        self.assertEqual(self.allocator.fragmentation(date(2025, 5, 1), date(2025, 7, 1), room_type="standard"), 0)
+
+    def test_unplaceable_reservations(self):
+        results = self.allocator.assign([("Ann", "luxury", date(2025, 6, 1), date(2025, 6, 5)),
+                                         ("Ben", "luxury", date(2025, 6, 2), date(2025, 6, 3)),
+                                         ("Cal", "penthouse", date(2025, 6, 2), date(2025, 6, 3)),
+                                         ("Dee", "standard", date(2025, 6, 3), date(2025, 6, 2))])
+        # Taking the stay that ends first leaves the most room for others
+        self.assertEqual(results[1].booking_id, 1)
+        self.assertEqual(str(results[0].error), "No room of the requested type available for the selected dates")
+        self.assertEqual(str(results[2].error), "No room of the requested type available for the selected dates")
+        self.assertEqual(str(results[3].error), "Invalid date range")
+        self.assertEqual(len(self.hotel.bookings), 1)
+
+    def test_beats_greedy(self):
+        rng = random.Random(2)
+        reservations = random_reservations(rng, 600)
+        greedy = build_hotel(15)
+        for reservation in reservations:
+            for room in greedy.rooms.candidates(room_type=reservation.room_type):
+                if room.is_available_for(reservation.start_date, reservation.end_date):
+                    greedy.book_room(room.number, reservation.guest_name, reservation.start_date, reservation.end_date)
+                    break
+        hotel = build_hotel(15)
+        allocator = Allocator(hotel)
+        results = allocator.assign(reservations)
+        placed = sum(result.error is None for result in results)
+        self.assertGreater(placed, len(greedy.bookings))
+        window = (date(2025, 1, 1), date(2025, 5, 1))
+        self.assertLessEqual(allocator.fragmentation(*window), Allocator(greedy).fragmentation(*window))
+        hotel.check_aggregates()
+
+    def test_reoptimize(self):
+        # Booked greedily one at a time, leaving short holes
+        hotel = build_hotel(6)
+        rng = random.Random(5)
+        for reservation in random_reservations(rng, 150, ("standard",)):
+            for room in hotel.rooms.candidates(room_type="standard"):
+                if room.is_available_for(reservation.start_date, reservation.end_date):
+                    hotel.book_room(room.number, reservation.guest_name, reservation.start_date, reservation.end_date)
+                    break
+        allocator = Allocator(hotel)
+        locked = next(iter(hotel.bookings.values()))
+        allocator.lock(locked.booking_id)
+        locked_room = locked.room
+        window = (date(2025, 2, 1), date(2025, 5, 1))
+        before = allocator.fragmentation(*window, room_type="standard")
+        prices = {booking_id: booking.total_price for booking_id, booking in hotel.bookings.items()}
+        income = hotel.get_total_income()
+        self.assertGreater(allocator.reoptimize(date(2025, 2, 1)), 0)
+        # Rooms of the type differ in price, but moved guests keep theirs
+        self.assertEqual({booking_id: booking.total_price for booking_id, booking in hotel.bookings.items()}, prices)
+        self.assertEqual(hotel.get_total_income(), income)
+        self.assertIs(locked.room, locked_room)
+        self.assertLessEqual(allocator.fragmentation(*window, room_type="standard"), before)
+        for room in hotel.rooms:
+            for before_booking, after_booking in zip(room.bookings, room.bookings[1:]):
+                self.assertLessEqual(before_booking.end_date, after_booking.start_date)
+        hotel.check_aggregates()
+
+    def test_reoptimize_every_type(self):
+        def greedy_hotel():
+            hotel = build_hotel(9)
+            for reservation in random_reservations(random.Random(5), 200):
+                for room in hotel.rooms.candidates(room_type=reservation.room_type):
+                    if room.is_available_for(reservation.start_date, reservation.end_date):
+                        hotel.book_room(room.number, reservation.guest_name, reservation.start_date,
+                                        reservation.end_date)
+                        break
+            return hotel
+
+        hotel = greedy_hotel()
+        rooms = {booking_id: booking.room for booking_id, booking in hotel.bookings.items()
+                 if booking.start_date < date(2025, 2, 1)}
+        by_type = [Allocator(greedy_hotel()).reoptimize(date(2025, 2, 1), room_type)
+                   for room_type in ("standard", "luxury")]
+        self.assertGreater(min(by_type), 0)
+        self.assertEqual(Allocator(hotel).reoptimize(date(2025, 2, 1)), sum(by_type))
+        # Bookings starting before after_date stay put
+        self.assertTrue(all(hotel.bookings[booking_id].room is room for booking_id, room in rooms.items()))
+        hotel.check_aggregates()
+
+    def test_tens_of_thousands(self):
+        hotel = build_hotel(300)
+        reservations = random_reservations(random.Random(8), 20000)
+        began = time.perf_counter()
+        results = Allocator(hotel).assign(reservations)
+        elapsed = time.perf_counter() - began
+        self.assertGreater(sum(result.error is None for result in results), 12000)
+        self.assertLess(elapsed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import random
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+from analytics import Analytics, RangeFenwick
+from pricing import DEFAULT_PRICING, RulePricing, Season
+
+
+class TestRangeFenwick(unittest.TestCase):
+    def test_matches_plain_list(self):
+        rng = random.Random(1)
+        tree = RangeFenwick(50)
+        values = [0] * 50
+        for _ in range(200):
+            first = rng.randrange(50)
+            last = rng.randrange(first, 51)
+            value = rng.randrange(-5, 6)
+            tree.add(first, last, value)
+            for i in range(first, last):
+                values[i] += value
+            first = rng.randrange(50)
+            last = rng.randrange(first, 51)
+            self.assertEqual(tree.sum(first, last), sum(values[first:last]))
+        self.assertEqual([tree.value(i) for i in range(50)], values)
+
+
+class TestAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.hotel = Hotel("Florida Beach", [Room(101, "standard", 100.0, 2), Room(102, "standard", 120.0, 2),
+                                             Room(103, "luxury", 300.0, 4)])
+        self.start = date(2025, 7, 1)
+        self.hotel.book_room(101, "Existing", date(2025, 6, 29), date(2025, 7, 2))
+        self.analytics = Analytics(self.hotel, self.start, horizon_days=92)
+
+    def test_existing_bookings_clipped_to_horizon(self):
+        # 3 nights from June 29th, only July 1st falls inside the horizon
+        self.assertEqual(self.analytics.occupancy(self.start, date(2025, 10, 1)), 1)
+        self.assertAlmostEqual(self.analytics.revenue(self.start, date(2025, 10, 1)), 100.0)
+
+    def test_room_type_series(self):
+        self.hotel.book_room(102, "Ann", date(2025, 7, 3), date(2025, 7, 10))  # 7 nights, 756 with discount
+        self.hotel.book_room(103, "Ben", date(2025, 7, 4), date(2025, 7, 6))
+        series = self.analytics.daily(date(2025, 7, 2), date(2025, 7, 5), room_type="standard")
+        self.assertEqual([occupied for _, occupied, _ in series], [0, 1, 1])
+        self.assertEqual(series[1][0], date(2025, 7, 3))
+        self.assertAlmostEqual(series[1][2], 7 * 120.0 * 0.9 / 7)
+        self.assertAlmostEqual(self.analytics.revenue(self.start, date(2025, 8, 1), room_type="standard"),
+                               100.0 + 7 * 120.0 * 0.9)
+        self.assertEqual(self.analytics.occupancy(self.start, date(2025, 8, 1), room_type="luxury"), 2)
+        self.assertEqual(self.analytics.occupancy(self.start, date(2025, 8, 1), room_number=102), 7)
+        self.assertEqual(self.analytics.occupancy(self.start, date(2025, 8, 1), room_type="suite"), 0)
+
+    def test_updates_and_cancellations(self):
+        booking_id = self.hotel.book_room(103, "Ann", date(2025, 7, 10), date(2025, 7, 13))
+        self.hotel.update_booking(booking_id, date(2025, 7, 20), date(2025, 7, 27))
+        self.assertEqual(self.analytics.occupancy(date(2025, 7, 10), date(2025, 7, 13)), 0)
+        self.assertAlmostEqual(self.analytics.revenue(date(2025, 7, 20), date(2025, 7, 27), room_number=103),
+                               self.hotel.bookings[booking_id].total_price)
+        self.hotel.cancel_booking(booking_id)
+        self.assertAlmostEqual(self.analytics.revenue(self.start, date(2025, 10, 1), room_type="luxury"), 0)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(4)
+        for _ in range(300):
+            start = self.start + timedelta(days=rng.randrange(-5, 90))
+            end = start + timedelta(days=rng.randrange(1, 9))
+            try:
+                if rng.random() < 0.7 or not self.hotel.bookings:
+                    self.hotel.book_room(rng.choice([101, 102, 103]), "Guest", start, end)
+                elif rng.random() < 0.5:
+                    self.hotel.cancel_booking(rng.choice(list(self.hotel.bookings)))
+                else:
+                    self.hotel.update_booking(rng.choice(list(self.hotel.bookings)), start, end)
+            except Exception:
+                pass
+        for day_offset in range(0, 92, 7):
+            day = self.start + timedelta(days=day_offset)
+            nights = [b for b in self.hotel.bookings.values() if b.start_date <= day < b.end_date]
+            (_, occupied, revenue), = self.analytics.daily(day, day + timedelta(days=1))
+            self.assertEqual(occupied, len(nights))
+            self.assertAlmostEqual(revenue, sum(b.total_price / (b.end_date - b.start_date).days for b in nights))
+
+    def test_revenue_follows_nightly_rates(self):
+        pricing = RulePricing(self.start, 92, seasons=[Season(date(2025, 7, 12), date(2025, 7, 14), 3.0)],
+                              stay_tiers=())
+        self.hotel.set_pricing(pricing, room_type="standard")
+        booking_id = self.hotel.book_room(101, "Ann", date(2025, 7, 10), date(2025, 7, 14))
+        self.assertEqual(self.hotel.bookings[booking_id].total_price, 800.0)
+        series = self.analytics.daily(date(2025, 7, 10), date(2025, 7, 14), room_number=101)
+        self.assertEqual([revenue for _, _, revenue in series], [100.0, 100.0, 300.0, 300.0])
+        # Repricing the room later still takes out what the booking put in
+        self.hotel.set_pricing(DEFAULT_PRICING)
+        self.hotel.update_booking(booking_id, date(2025, 7, 11), date(2025, 7, 14))
+        series = self.analytics.daily(date(2025, 7, 10), date(2025, 7, 14), room_number=101)
+        self.assertEqual([revenue for _, _, revenue in series], [0, 100.0, 100.0, 100.0])
+        self.hotel.cancel_booking(booking_id)
+        self.assertAlmostEqual(self.analytics.revenue(date(2025, 7, 2), date(2025, 8, 1)), 0)
+
+    def test_outside_horizon(self):
+        with self.assertRaises(Exception) as context:
+            self.analytics.occupancy(date(2025, 6, 1), date(2025, 7, 5))
+        self.assertEqual(str(context.exception), "Date range outside analytics horizon")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import random
+import threading
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+from async_hotel import AsyncHotel
+
+
+class TestAsyncHotel(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.rooms = [Room(100 + i, "standard", 100.0, 2) for i in range(10)]
+        self.hotel = Hotel("Florida Beach", self.rooms)
+        self.async_hotel = AsyncHotel(self.hotel, batch_size=8)
+        self.start = date(2025, 1, 1)
+
+    async def asyncTearDown(self):
+        await self.async_hotel.aclose()
+
+    async def test_operations(self):
+        booking_id = await self.async_hotel.book_room(101, "Alice", self.start, self.start + timedelta(days=3))
+        self.assertEqual(booking_id, 1)
+        available = await self.async_hotel.get_available_rooms(self.start, self.start + timedelta(days=1))
+        self.assertNotIn(101, available)
+        await self.async_hotel.update_booking(booking_id, self.start + timedelta(days=5), self.start + timedelta(days=6))
+        available = await self.async_hotel.get_available_rooms(self.start, self.start + timedelta(days=1))
+        self.assertIn(101, available)
+        await self.async_hotel.cancel_booking(booking_id)
+        self.assertEqual(self.hotel.bookings, {})
+        with self.assertRaises(Exception) as context:
+            await self.async_hotel.cancel_booking(booking_id)
+        self.assertEqual(str(context.exception), "Booking not found")
+
+    async def test_coalesces_identical_queries(self):
+        computed = []
+        original = self.hotel.get_available_rooms
+        release = threading.Event()
+
+        def slow_query(start_date, end_date):
+            release.wait()
+            computed.append((start_date, end_date))
+            return original(start_date, end_date)
+
+        self.hotel.get_available_rooms = slow_query
+        end = self.start + timedelta(days=2)
+        queries = [asyncio.create_task(self.async_hotel.get_available_rooms(self.start, end)) for _ in range(50)]
+        other = asyncio.create_task(self.async_hotel.get_available_rooms(self.start, end + timedelta(days=1)))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*queries, other)
+        self.assertEqual(len(computed), 2)
+        self.assertEqual(self.async_hotel.stats["coalesced"], 49)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertIsNot(results[0], results[1])
+
+    async def test_batches_writes(self):
+        tasks = [self.async_hotel.book_room(100 + i % 10, "Guest", self.start + timedelta(days=i // 10),
+                                            self.start + timedelta(days=i // 10 + 1)) for i in range(40)]
+        tasks.append(self.async_hotel.book_room(100, "Late", self.start, self.start + timedelta(days=1)))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual(results[:40], list(range(1, 41)))
+        self.assertEqual(str(results[40]), "Room not available for the selected dates")
+        self.assertEqual(self.async_hotel.stats["write_batches"], 6)
+
+    async def test_load_generator(self):
+        rng = random.Random(3)
+
+        async def client(n):
+            booked = []
+            for _ in range(n):
+                start = self.start + timedelta(days=rng.randrange(60))
+                end = start + timedelta(days=rng.randrange(1, 5))
+                op = rng.random()
+                try:
+                    if op < 0.4:
+                        booked.append(await self.async_hotel.book_room(rng.choice(self.rooms).number, "Guest", start, end))
+                    elif op < 0.5 and booked:
+                        await self.async_hotel.cancel_booking(booked.pop())
+                    else:
+                        await self.async_hotel.get_available_rooms(start, end)
+                except Exception as e:
+                    self.assertEqual(str(e), "Room not available for the selected dates")
+            return booked
+
+        booked = await asyncio.gather(*(client(50) for _ in range(20)))
+        self.assertEqual(sorted(b for bs in booked for b in bs), sorted(self.hotel.bookings))
+        self.hotel.check_aggregates()
+
+
+if __name__ == '__main__':
+    unittest.main()
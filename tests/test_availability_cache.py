@@ -0,0 +1,149 @@
+import random
+import threading
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+from concurrent_hotel import ConcurrentHotel
+from availability_cache import AvailabilityCache
+
+
+def rooms():
+    return [Room(100 + i, "standard" if i % 2 else "deluxe", 100.0 + 10 * i, 2 + i % 3) for i in range(6)]
+
+
+class TestAvailabilityCache(unittest.TestCase):
+    def setUp(self):
+        self.hotel = Hotel("Florida Beach", rooms())
+        self.hotel.book_room(100, "Alice", date(2025, 6, 1), date(2025, 6, 4))
+        self.cache = AvailabilityCache(self.hotel, maxsize=8)
+
+    def test_hits_and_misses(self):
+        rooms = self.hotel.get_available_rooms(date(2025, 6, 2), date(2025, 6, 3))
+        self.assertEqual(rooms, [101, 102, 103, 104, 105])
+        rooms.append(999)  # callers get their own copy
+        self.assertEqual(self.hotel.get_available_rooms(date(2025, 6, 2), date(2025, 6, 3)), [101, 102, 103, 104, 105])
+        self.assertEqual(list(self.hotel.search_rooms(date(2025, 6, 2), date(2025, 6, 3), room_type="standard")),
+                         [101, 103, 105])
+        self.assertEqual(list(self.hotel.search_rooms(date(2025, 6, 2), date(2025, 6, 3), room_type="standard",
+                                                      limit=1)), [101])
+        stats = self.cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (2, 2, 2))
+        self.cache.detach()
+        self.assertIsNone(self.hotel.availability_cache)
+        self.hotel.get_available_rooms(date(2025, 6, 2), date(2025, 6, 3))
+        self.assertEqual(self.cache.stats().hits, 2)
+
+    def test_targeted_invalidation(self):
+        june = (date(2025, 6, 10), date(2025, 6, 15))
+        july = (date(2025, 7, 10), date(2025, 7, 15))
+        self.hotel.get_available_rooms(*june)
+        self.hotel.get_available_rooms(*july)
+        list(self.hotel.search_rooms(*june, room_type="deluxe"))
+        list(self.hotel.search_rooms(*june, min_capacity=4))
+        self.hotel.book_room(101, "Bob", date(2025, 6, 14), date(2025, 6, 20))
+        # Room 101 is standard with capacity 3: the deluxe and capacity 4 searches keep their entries
+        self.assertEqual(self.cache.stats().invalidations, 1)
+        self.assertEqual(len(self.cache), 3)
+        self.assertNotIn(101, self.hotel.get_available_rooms(*june))
+        self.assertIn(101, self.hotel.get_available_rooms(*july))
+        self.assertEqual(self.cache.stats().hits, 1)
+        # Stays touching the range without overlapping it leave it alone
+        self.hotel.book_room(102, "Carol", date(2025, 6, 15), date(2025, 6, 17))
+        self.hotel.book_room(102, "Carol", date(2025, 6, 5), date(2025, 6, 10))
+        self.assertEqual(len(self.cache), 4)
+        booking_id = self.hotel.book_room(103, "Dan", date(2025, 7, 1), date(2025, 7, 20))
+        self.hotel.update_booking(booking_id, date(2025, 6, 1), date(2025, 6, 11), 104)
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.hotel.get_available_rooms(*june), [100, 102, 103, 105])
+        self.hotel.cancel_booking(booking_id)
+        self.assertEqual(self.hotel.get_available_rooms(*june), [100, 102, 103, 104, 105])
+
+    def test_lru_bound(self):
+        for day in range(1, 11):
+            self.hotel.get_available_rooms(date(2025, 8, day), date(2025, 8, day + 1))
+        self.hotel.get_available_rooms(date(2025, 8, 3), date(2025, 8, 4))
+        self.hotel.get_available_rooms(date(2025, 8, 11), date(2025, 8, 12))
+        stats = self.cache.stats()
+        self.assertEqual((stats.size, stats.evictions, stats.hits), (8, 3, 1))
+        self.hotel.get_available_rooms(date(2025, 8, 3), date(2025, 8, 4))
+        self.hotel.get_available_rooms(date(2025, 8, 4), date(2025, 8, 5))
+        self.assertEqual(self.cache.stats().hits, 2)
+        self.hotel.book_room(105, "Eve", date(2025, 8, 1), date(2025, 8, 31))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_room_changes_clear(self):
+        self.hotel.get_available_rooms(date(2025, 6, 2), date(2025, 6, 3))
+        self.hotel.rooms.append(Room(200, "suite", 500.0, 4))
+        self.assertEqual(len(self.cache), 0)
+        self.assertIn(200, self.hotel.get_available_rooms(date(2025, 6, 2), date(2025, 6, 3)))
+        previous = self.hotel.rooms
+        self.hotel.rooms = rooms()[1:3]
+        self.assertEqual(self.hotel.get_available_rooms(date(2025, 6, 2), date(2025, 6, 3)), [101, 102])
+        # The replaced registry no longer reaches the hotel
+        previous.append(Room(300, "suite", 500.0, 4))
+        self.assertEqual(self.hotel.get_available_rooms(date(2025, 6, 2), date(2025, 6, 3)), [101, 102])
+        self.assertNotIn(300, self.hotel.report())
+
+    def test_matches_uncached_hotel(self):
+        reference = Hotel("Florida Beach", rooms())
+        reference.book_room(100, "Alice", date(2025, 6, 1), date(2025, 6, 4))
+        rng = random.Random(5)
+        queries = [(date(2025, 6, 1) + timedelta(days=rng.randrange(60)), rng.randrange(1, 8),
+                    rng.choice([None, "standard", "deluxe"]), rng.choice([None, 3, 4]), rng.choice([None, 130.0]))
+                   for _ in range(40)]
+        for step in range(1500):
+            start, nights, room_type, min_capacity, max_price = rng.choice(queries)
+            end = start + timedelta(days=nights)
+            if step % 3 == 0:
+                self.assertEqual(self.hotel.get_available_rooms(start, end), reference.get_available_rooms(start, end))
+                self.assertEqual(list(self.hotel.search_rooms(start, end, room_type, min_capacity, max_price)),
+                                 list(reference.search_rooms(start, end, room_type, min_capacity, max_price)))
+                continue
+            action, number = rng.random(), rng.randrange(100, 106)
+            booking_ids = list(reference.bookings)
+            for hotel in (self.hotel, reference):
+                try:
+                    if action < 0.5 or not booking_ids:
+                        hotel.book_room(number, "Guest", start, end)
+                    elif action < 0.75:
+                        hotel.cancel_booking(booking_ids[step % len(booking_ids)])
+                    else:
+                        hotel.update_booking(booking_ids[step % len(booking_ids)], start, end, 100 + step % 6)
+                except Exception:
+                    pass
+        stats = self.cache.stats()
+        self.assertGreater(stats.hits, 0)
+        self.assertGreater(stats.invalidations, 0)
+        self.assertLessEqual(stats.size, 8)
+
+    def test_concurrent_hotel(self):
+        hotel = ConcurrentHotel("Florida Beach", rooms())
+        cache = AvailabilityCache(hotel)
+        stays = [(date(2025, 6, day), date(2025, 6, day + nights)) for day in range(1, 28) for nights in (1, 3)]
+
+        def writer(number):
+            for day in range(1, 60, 2):
+                booking_id = hotel.book_room(number, "Guest", date(2025, 6, 1) + timedelta(days=day),
+                                             date(2025, 6, 1) + timedelta(days=day + 2))
+                if day % 3:
+                    hotel.cancel_booking(booking_id)
+
+        def reader():
+            for _ in range(20):
+                for stay in stays:
+                    hotel.get_available_rooms(*stay)
+
+        threads = [threading.Thread(target=writer, args=(100 + i,)) for i in range(6)]
+        threads += [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Results computed while a write went through were not kept
+        for stay in stays:
+            self.assertEqual(hotel.get_available_rooms(*stay), hotel.scan_available_rooms(*stay))
+        self.assertGreater(cache.stats().hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
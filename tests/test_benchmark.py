@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+from benchmark import Workload, build_hotel, fill_history, run_operations, run_suite, save_baseline, load_baseline, compare
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_workload_is_seeded(self):
+        self.assertEqual(Workload(7, 20).operations(500), Workload(7, 20).operations(500))
+        self.assertNotEqual(Workload(7, 20).operations(500), Workload(8, 20).operations(500))
+
+    def test_demand_is_seasonal(self):
+        workload = Workload(1, 20)
+        months = [workload.dates()[0].month for _ in range(5000)]
+        self.assertGreater(months.count(7), 2 * months.count(1))
+
+    def test_run_operations(self):
+        workload = Workload(3, 10)
+        hotel = build_hotel(10, 3)
+        fill_history(hotel, workload, 200)
+        self.assertEqual(len(hotel.bookings), 200)
+        latencies = run_operations(hotel, workload.operations(1000))
+        self.assertEqual(sum(len(values) for values in latencies.values()), 1000)
+        hotel.check_aggregates()
+
+    def test_baseline_round_trip_and_compare(self):
+        results = run_suite(room_counts=(5,), histories=(0, 50), operations=200)
+        self.assertEqual(sorted(results), ["rooms=5,history=0", "rooms=5,history=50"])
+        figures = results["rooms=5,history=0"]["operations"]["book"]
+        self.assertGreater(figures["ops_per_sec"], 0)
+        self.assertLessEqual(figures["p50_us"], figures["p99_us"])
+        self.assertGreater(results["rooms=5,history=0"]["peak_memory_bytes"], 0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            save_baseline(results, path)
+            baseline = load_baseline(path)
+        self.assertEqual(compare(results, baseline), [])
+        baseline["rooms=5,history=0"]["operations"]["book"]["ops_per_sec"] *= 10
+        baseline["rooms=5,history=50"]["peak_memory_bytes"] //= 10
+        regressions = compare(results, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("rooms=5,history=0 book"))
+
+
+if __name__ == '__main__':
+    unittest.main()
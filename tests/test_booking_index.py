@@ -0,0 +1,71 @@
+import random
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+from booking_index import BookingIndex
+
+
+class TestBookingIndex(unittest.TestCase):
+    def setUp(self):
+        self.hotel = Hotel("Florida Beach", [Room(100 + i, "standard", 100.0, 2) for i in range(4)])
+        self.hotel.book_room(100, "Alice Smith", date(2025, 6, 1), date(2025, 6, 4))
+        self.index = BookingIndex(self.hotel)
+
+    def ids(self, bookings):
+        return [booking.booking_id for booking in bookings]
+
+    def test_guest_lookup(self):
+        self.hotel.book_room(101, "alice smith", date(2025, 6, 2), date(2025, 6, 5))
+        self.hotel.book_room(102, "Alicia Keys", date(2025, 6, 2), date(2025, 6, 5))
+        self.hotel.book_room(103, "Bob", date(2025, 6, 2), date(2025, 6, 5))
+        self.assertEqual(self.ids(self.index.by_guest("ALICE SMITH")), [1, 2])
+        self.assertEqual(list(self.index.guest_names("ali")), ["alice smith", "alicia keys"])
+        self.assertEqual(self.ids(self.index.search_guests("Ali")), [1, 2, 3])
+        self.assertEqual(self.ids(self.index.search_guests("alic")), [1, 2, 3])
+        self.assertEqual(self.ids(self.index.search_guests("alici")), [3])
+        self.assertEqual(list(self.index.search_guests("z")), [])
+        self.hotel.cancel_booking(3)
+        self.assertEqual(list(self.index.guest_names("")), ["alice smith", "bob"])
+
+    def test_day_lookup(self):
+        self.hotel.book_room(101, "Bob", date(2025, 6, 4), date(2025, 6, 6))
+        self.assertEqual(self.ids(self.index.check_ins(date(2025, 6, 4))), [2])
+        self.assertEqual(self.ids(self.index.check_outs(date(2025, 6, 4))), [1])
+        self.hotel.update_booking(1, date(2025, 6, 1), date(2025, 6, 3))
+        self.assertEqual(self.ids(self.index.check_outs(date(2025, 6, 4))), [])
+        self.assertEqual(self.ids(self.index.check_outs(date(2025, 6, 3))), [1])
+
+    def test_results_are_lazy(self):
+        self.hotel.book_room(101, "Alice Jones", date(2025, 6, 1), date(2025, 6, 4))
+        results = self.index.search_guests("alice")
+        self.assertEqual(next(results).booking_id, 2)
+        self.hotel.cancel_booking(1)
+        self.assertEqual(list(results), [])
+
+    def test_matches_scan(self):
+        rng = random.Random(4)
+        names = ["Ann", "anna", "Anne Marie", "Ben", "bea", "Carl"]
+        for _ in range(500):
+            start = date(2025, 1, 1) + timedelta(days=rng.randrange(60))
+            end = start + timedelta(days=rng.randrange(1, 5))
+            try:
+                op = rng.random()
+                if op < 0.6 or not self.hotel.bookings:
+                    self.hotel.book_room(rng.randrange(100, 104), rng.choice(names), start, end)
+                elif op < 0.8:
+                    self.hotel.cancel_booking(rng.choice(list(self.hotel.bookings)))
+                else:
+                    self.hotel.update_booking(rng.choice(list(self.hotel.bookings)), start, end, rng.randrange(100, 104))
+            except Exception:
+                pass
+        bookings = list(self.hotel.bookings.values())
+        for prefix in ["a", "AN", "anne", "b", "x", ""]:
+            expected = {b.booking_id for b in bookings if b.guest_name.casefold().startswith(prefix.casefold())}
+            self.assertEqual(set(self.ids(self.index.search_guests(prefix))), expected)
+        for day in (date(2025, 1, 1) + timedelta(days=i) for i in range(70)):
+            self.assertEqual(set(self.ids(self.index.check_ins(day))), {b.booking_id for b in bookings if b.start_date == day})
+            self.assertEqual(set(self.ids(self.index.check_outs(day))), {b.booking_id for b in bookings if b.end_date == day})
+
+
+if __name__ == '__main__':
+    unittest.main()
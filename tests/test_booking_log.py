@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from hotel_system import Room, Hotel
+from booking_log import read_operations, replay
+
+
+def book(room_number, guest_name, start_date, end_date):
+    return json.dumps({"op": "book", "room_number": room_number, "guest_name": guest_name,
+                       "start_date": start_date, "end_date": end_date})
+
+
+class TestBookingLog(unittest.TestCase):
+    def setUp(self):
+        self.hotel = Hotel("Florida Beach", [Room(101, "standard", 100.0, 2), Room(102, "luxury", 200.0, 3)])
+
+    def test_replay_file(self):
+        lines = [
+            book(101, "Alice", "2025-01-01", "2025-01-05"),
+            book(101, "Bob", "2025-01-03", "2025-01-06"),  # overlaps Alice
+            "",
+            book(102, "Carol", "2025-01-01", "2025-01-08"),
+            json.dumps({"op": "update", "booking_id": 1, "start_date": "2025-01-02", "end_date": "2025-01-06"}),
+            json.dumps({"op": "cancel", "booking_id": 42}),
+            "{not json",
+            json.dumps({"op": "checkout", "booking_id": 1}),
+            json.dumps({"op": "cancel", "booking_id": 2}),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bookings.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            errors = list(replay(self.hotel, path, chunk_size=3))
+        self.assertEqual([e.line_number for e in errors], [2, 6, 7, 8])
+        self.assertEqual(str(errors[0].error), "Room not available for the selected dates")
+        self.assertEqual(str(errors[1].error), "Booking not found")
+        self.assertEqual(str(errors[3].error), "Unknown operation: checkout")
+        self.assertEqual(list(self.hotel.bookings), [1])
+        self.assertEqual(self.hotel.bookings[1].start_date, date(2025, 1, 2))
+
+    def test_update_moves_room(self):
+        lines = [
+            book(101, "Alice", "2025-01-01", "2025-01-05"),
+            json.dumps({"op": "update", "booking_id": 1, "start_date": "2025-01-02", "end_date": "2025-01-06",
+                        "room_number": 102}),
+        ]
+        self.assertEqual(list(replay(self.hotel, lines)), [])
+        self.assertEqual(self.hotel.bookings[1].room.number, 102)
+        self.assertEqual(self.hotel.report(), {101: 0, 102: 1})
+
+    def test_reads_lazily(self):
+        consumed = []
+
+        def lines():
+            for i in range(10000):
+                consumed.append(i)
+                yield book(101, "Guest", "2025-01-01", "2025-01-02")
+
+        errors = replay(self.hotel, lines(), chunk_size=100)
+        first = next(errors)
+        self.assertEqual(first.line_number, 2)
+        self.assertEqual(len(consumed), 100)
+        self.assertEqual(len(self.hotel.bookings), 1)
+
+    def test_read_operations(self):
+        operations = list(read_operations([json.dumps({"op": "cancel", "booking_id": 5})]))
+        self.assertEqual(operations[0].line_number, 1)
+        self.assertEqual(operations[0].op, "cancel")
+        self.assertEqual(operations[0].args, (5,))
+
+
+if __name__ == '__main__':
+    unittest.main()
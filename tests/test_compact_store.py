@@ -0,0 +1,129 @@
+import gc
+import tracemalloc
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Booking, Hotel
+from compact_store import BookingStore, BookingView
+
+
+class TestBookingStore(unittest.TestCase):
+    def setUp(self):
+        self.room1 = Room(101, "standard", 100.0, 2)
+        self.room2 = Room(102, "luxury", 200.0, 3)
+        self.store = BookingStore()
+        self.hotel = Hotel("Florida Beach", [self.room1, self.room2])
+        self.store.attach(self.hotel)
+
+    def test_slots(self):
+        for obj in (self.room1, Booking(1, self.room1, "Alice", date(2025, 1, 1), date(2025, 1, 2))):
+            self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_view_attribute_api(self):
+        booking_id = self.hotel.book_room(102, "Alice", date(2025, 1, 1), date(2025, 1, 8))
+        booking = self.hotel.bookings[booking_id]
+        self.assertIsInstance(booking, BookingView)
+        self.assertEqual(booking.booking_id, booking_id)
+        self.assertIs(booking.room, self.room2)
+        self.assertEqual(booking.guest_name, "Alice")
+        self.assertEqual(booking.start_date, date(2025, 1, 1))
+        self.assertEqual(booking.end_date, date(2025, 1, 8))
+        self.assertAlmostEqual(booking.total_price, 7 * 200.0 * 0.9)
+        self.assertIn(booking, self.room2.bookings)
+
+    def test_hotel_operations(self):
+        id1 = self.hotel.book_room(101, "Alice", date(2025, 1, 1), date(2025, 1, 4))
+        id2 = self.hotel.book_room(101, "Bob", date(2025, 1, 4), date(2025, 1, 6))
+        with self.assertRaises(Exception):
+            self.hotel.book_room(101, "Carol", date(2025, 1, 3), date(2025, 1, 5))
+        self.hotel.update_booking(id1, date(2025, 1, 1), date(2025, 1, 3))
+        self.assertEqual(self.hotel.bookings[id1].end_date, date(2025, 1, 3))
+        self.assertAlmostEqual(self.hotel.get_total_income(), 400.0)
+        self.hotel.cancel_booking(id2)
+        self.assertEqual(self.hotel.report(), {101: 1, 102: 0})
+        self.assertIn("Booking 1 for room 101 by Alice from 2025-01-01 to 2025-01-03",
+                      self.hotel.get_booking_info(id1))
+        with self.hotel.snapshot_view() as view:
+            self.hotel.cancel_booking(id1)
+            self.assertEqual([booking.guest_name for booking in view.values()], ["Alice"])
+        self.assertEqual(len(self.hotel.bookings), 0)
+
+    def test_attach_existing_bookings(self):
+        hotel = Hotel("Florida Beach", [Room(101, "standard", 100.0, 2), Room(102, "luxury", 200.0, 3)])
+        id1 = hotel.book_room(101, "Alice", date(2025, 1, 1), date(2025, 1, 4))
+        id2 = hotel.book_room(102, "Bob", date(2025, 1, 2), date(2025, 1, 3))
+        info, income = hotel.get_booking_info(id1), hotel.get_total_income()
+        self.store.attach(hotel)
+        self.assertIsInstance(hotel.bookings[id2], BookingView)
+        self.assertEqual(hotel.get_booking_info(id1), info)
+        self.assertEqual(hotel.get_total_income(), income)
+        self.assertEqual(hotel.report(), {101: 1, 102: 1})
+        with self.assertRaises(Exception):
+            hotel.book_room(101, "Carol", date(2025, 1, 3), date(2025, 1, 5))
+        hotel.cancel_booking(id1)
+        id3 = hotel.book_room(101, "Carol", date(2025, 1, 3), date(2025, 1, 5))
+        self.assertEqual(sorted(hotel.bookings), [id2, id3])
+        hotel.check_aggregates()
+
+    def test_rows_are_recycled(self):
+        start = date(2025, 1, 1)
+        for i in range(50):
+            booking_id = self.hotel.book_room(101, "Alice", start + timedelta(days=i), start + timedelta(days=i + 1))
+            if i % 2:
+                self.hotel.cancel_booking(booking_id)
+        # A batch rejected by its last request leaves no rows behind
+        with self.assertRaises(Exception):
+            self.hotel.book_many([(102, "Bob", start + timedelta(days=i), start + timedelta(days=i + 1))
+                                  for i in range(20)] + [(102, "Bob", start, start + timedelta(days=2))])
+        self.assertEqual(len(self.store), 25)
+        self.assertEqual(len(self.store.booking_ids), 45)
+        # The batch held 20 rows at once; later bookings reuse them
+        for i in range(20):
+            self.hotel.book_room(102, "Bob", start + timedelta(days=i), start + timedelta(days=i + 1))
+        self.assertEqual(len(self.store), 45)
+        self.assertEqual(len(self.store.booking_ids), 45)
+        self.assertEqual(self.hotel.report(), {101: 25, 102: 20})
+        self.hotel.check_aggregates()
+        # A view held by someone else keeps its row
+        booking = self.hotel.bookings[1]
+        self.hotel.cancel_booking(1)
+        self.hotel.book_room(102, "Carol", start + timedelta(days=30), start + timedelta(days=31))
+        self.assertEqual((booking.booking_id, booking.guest_name), (1, "Alice"))
+
+    def test_interned_guest_names(self):
+        start = date(2025, 1, 1)
+        for i in range(100):
+            self.hotel.book_room(101, "Alice", start + timedelta(days=i), start + timedelta(days=i + 1))
+        self.assertEqual(self.store.guest_table, ["Alice"])
+        self.assertEqual(self.store.room_table, [self.room1])
+        self.assertEqual(len(self.store), 100)
+        # 8 byte ID and price, 4 byte room, guest and both dates
+        self.assertEqual(self.store.nbytes(), 100 * 32)
+
+    def booking_memory(self, store):
+        # Bytes allocated per booking while one room takes a booking a night
+        hotel = Hotel("Florida Beach", [Room(101, "standard", 100.0, 2)])
+        if store is not None:
+            store.attach(hotel)
+        start = date(2025, 1, 1).toordinal()
+        count = 20000
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for day in range(start, start + count):
+                hotel.book_room(101, "Alice", date.fromordinal(day), date.fromordinal(day + 1))
+            gc.collect()
+            return (tracemalloc.get_traced_memory()[0] - before) / count
+        finally:
+            tracemalloc.stop()
+
+    def test_memory_per_booking(self):
+        objects = self.booking_memory(None)
+        columns = self.booking_memory(BookingStore())
+        # 32 bytes of columns, 4 for the booking table and 12 for the room index, plus array slack
+        self.assertLess(columns, 80)
+        self.assertLess(columns * 4, objects)
+
+
+if __name__ == '__main__':
+    unittest.main()
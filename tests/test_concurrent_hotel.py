@@ -0,0 +1,192 @@
+import random
+import sys
+import threading
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room
+from concurrent_hotel import ConcurrentHotel
+
+
+class TestConcurrentHotel(unittest.TestCase):
+    def setUp(self):
+        self.rooms = [Room(100 + i, "standard", 100.0, 2) for i in range(8)]
+        self.hotel = ConcurrentHotel("Florida Beach", self.rooms)
+        self.start = date(2025, 1, 1)
+        self.switch_interval = sys.getswitchinterval()
+        # Switch threads as often as possible to shake out races
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def run_threads(self, target, count=16):
+        errors = []
+
+        def run(seed):
+            try:
+                target(random.Random(seed))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(seed,)) for seed in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def random_range(self, rng):
+        start = self.start + timedelta(days=rng.randrange(60))
+        return start, start + timedelta(days=rng.randrange(1, 8))
+
+    def assert_consistent(self):
+        for room in self.rooms:
+            for before, after in zip(room.bookings, room.bookings[1:]):
+                self.assertLessEqual(before.end_date, after.start_date)
+        self.assertEqual(sorted(b for room in self.rooms for b in (x.booking_id for x in room.bookings)),
+                         sorted(self.hotel.bookings))
+        self.hotel.check_aggregates()
+        self.assertEqual(self.hotel.report(), {room.number: len(room.bookings) for room in self.rooms})
+
+    def test_unique_ids(self):
+        ids = []
+        self.run_threads(lambda rng: ids.extend(self.hotel.generate_booking_id() for _ in range(500)))
+        self.assertEqual(sorted(ids), list(range(1, 16 * 500 + 1)))
+
+    def test_stress(self):
+        booked = []
+
+        def worker(rng):
+            mine = []
+            for _ in range(300):
+                op = rng.random()
+                start, end = self.random_range(rng)
+                try:
+                    if op < 0.5 or not mine:
+                        mine.append(self.hotel.book_room(rng.choice(self.rooms).number, "Guest", start, end))
+                    elif op < 0.7:
+                        self.hotel.cancel_booking(mine.pop(rng.randrange(len(mine))))
+                    elif op < 0.8:
+                        self.hotel.update_booking(rng.choice(mine), start, end)
+                    elif op < 0.9:
+                        self.hotel.update_booking(rng.choice(mine), start, end, rng.choice(self.rooms).number)
+                    elif op < 0.925:
+                        self.hotel.get_available_rooms(start, end)
+                    elif op < 0.95:
+                        list(self.hotel.search_rooms(start, end, room_type="standard"))
+                    elif op < 0.975:
+                        self.hotel.find_next_available({"room_type": "standard"}, (end - start).days, start)
+                    else:
+                        self.hotel.suggest_alternatives(rng.choice(self.rooms).number, start, end)
+                except Exception as e:
+                    if not str(e).startswith("Room not available"):
+                        raise
+            booked.extend(mine)
+
+        self.run_threads(worker)
+        self.assertEqual(sorted(booked), sorted(self.hotel.bookings))
+        self.assert_consistent()
+
+    def test_reads_during_writes(self):
+        # Window and search reads walk a room's bookings while a writer inserts into them
+        done = threading.Event()
+
+        def writer(rng):
+            mine = []
+            for _ in range(3000):
+                start = self.start + timedelta(days=rng.randrange(300))
+                try:
+                    mine.append(self.hotel.book_room(rng.choice(self.rooms[:2]).number, "Guest", start,
+                                                     start + timedelta(days=1)))
+                except Exception as e:
+                    if not str(e).startswith("Room not available"):
+                        raise
+                if len(mine) > 100:
+                    self.hotel.cancel_booking(mine.pop(rng.randrange(len(mine))))
+            done.set()
+
+        def reader(rng):
+            while not done.is_set():
+                start = self.start + timedelta(days=rng.randrange(300))
+                end = start + timedelta(days=2)
+                self.hotel.find_next_available({"room_type": "standard"}, 2, start)
+                self.hotel.suggest_alternatives(self.rooms[0].number, start, end, k=20)
+                list(self.hotel.search_rooms(start, end))
+
+        roles = iter([writer, reader, reader, reader])
+        self.run_threads(lambda rng: next(roles)(rng), count=4)
+        self.assert_consistent()
+
+    def test_snapshot_views_during_writes(self):
+        stop = threading.Event()
+        errors = []
+
+        def writer(rng):
+            try:
+                write(rng)
+            except Exception as e:
+                errors.append(e)
+
+        def write(rng):
+            mine = []
+            while not stop.is_set():
+                start, end = self.random_range(rng)
+                try:
+                    if rng.random() < 0.5 or not mine:
+                        mine.append(self.hotel.book_room(rng.choice(self.rooms).number, "Guest", start, end))
+                    elif rng.random() < 0.5:
+                        self.hotel.cancel_booking(mine.pop(rng.randrange(len(mine))))
+                    else:
+                        self.hotel.update_booking(rng.choice(mine), start, end, rng.choice(self.rooms).number)
+                except Exception as e:
+                    if not str(e).startswith("Room not available"):
+                        raise
+
+        writers = [threading.Thread(target=writer, args=(random.Random(seed),)) for seed in range(8)]
+        for thread in writers:
+            thread.start()
+        try:
+            while len(self.hotel.bookings) < 20:
+                stop.wait(0.001)
+            first_id = self.hotel.next_booking_id
+            for _ in range(30):
+                with self.hotel.snapshot_view() as view:
+                    bookings = list(view.values())
+                    self.assertEqual(len(bookings), len(view))
+                    self.assertAlmostEqual(sum(booking.total_price for booking in bookings), view.get_total_income())
+                    counts = {room.number: 0 for room in self.rooms}
+                    for booking in bookings:
+                        counts[booking.room.number] += 1
+                    self.assertEqual(counts, view.report())
+                    by_room = sorted((booking.room.number, booking.start, booking.end) for booking in bookings)
+                    for before, after in zip(by_room, by_room[1:]):
+                        if before[0] == after[0]:
+                            self.assertLessEqual(before[2], after[1])
+            # Writers kept going between and during the views
+            self.assertGreater(self.hotel.next_booking_id, first_id)
+        finally:
+            stop.set()
+            for thread in writers:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assert_consistent()
+
+    def test_contended_room(self):
+        # Every thread tries to book every night of one room; each night is won exactly once
+        def worker(rng):
+            for day in rng.sample(range(100), 100):
+                start = self.start + timedelta(days=day)
+                try:
+                    self.hotel.book_room(100, "Guest", start, start + timedelta(days=1))
+                except Exception as e:
+                    if str(e) != "Room not available for the selected dates":
+                        raise
+
+        self.run_threads(worker, count=8)
+        self.assertEqual(len(self.hotel.bookings), 100)
+        self.assertEqual(max(self.hotel.bookings), 100)
+        self.assert_consistent()
+
+
+if __name__ == '__main__':
+    unittest.main()
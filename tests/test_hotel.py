@@ -1,6 +1,8 @@
 import unittest
 from datetime import date, timedelta
-from hotel_system import Room, Booking, Hotel
+from decimal import Decimal
+from fractions import Fraction
+from hotel_system import Room, Booking, Hotel, IntervalIndex, RoomRegistry
 
 class TestRoom(unittest.TestCase):
     def setUp(self):
@@ -38,6 +40,152 @@ class TestRoom(unittest.TestCase):
         self.room.add_booking(booking)
         self.assertIn(booking, self.room.bookings)
 
+    def test_add_overlapping_booking(self):
+        self.room.add_booking(Booking(1, self.room, "Alice", date(2025, 1, 1), date(2025, 1, 10)))
+        overlapping = Booking(2, self.room, "Bob", date(2025, 1, 2), date(2025, 1, 3))
+        with self.assertRaises(Exception) as context:
+            self.room.add_booking(overlapping)
+        self.assertEqual(str(context.exception), "Room not available for the selected dates")
+        with self.assertRaises(Exception):
+            self.room.bookings.append(Booking(2, self.room, "Bob", date(2024, 12, 20), date(2025, 1, 20)))
+        self.assertEqual(len(self.room.bookings), 1)
+        self.assertFalse(self.room.is_available_for(date(2025, 1, 5), date(2025, 1, 6)))
+
+
+class TestIntervalIndex(unittest.TestCase):
+    def setUp(self):
+        self.room = Room(101, "standard", 100.0, 2)
+        self.index = IntervalIndex()
+        # Ten non-overlapping 3-night stays with a one night gap between them, added out of order.
+        self.bookings = [Booking(i, self.room, "Guest", date(2025, 1, 1) + timedelta(days=4 * i),
+                                 date(2025, 1, 4) + timedelta(days=4 * i)) for i in range(10)]
+        for booking in reversed(self.bookings):
+            self.index.append(booking)
+
+    def test_sorted_by_start_date(self):
+        self.assertEqual(list(self.index), self.bookings)
+        self.assertEqual(self.index.starts, [b.start for b in self.bookings])
+        self.assertEqual(self.index.starts, [b.start_date.toordinal() for b in self.bookings])
+
+    def test_overlaps_half_open(self):
+        for booking in self.bookings:
+            self.assertTrue(self.index.overlaps(booking.start, booking.end))
+            # The night between two stays is free, and touching either neighbour is allowed.
+            self.assertFalse(self.index.overlaps(booking.end, booking.end + 1))
+        self.assertFalse(self.index.overlaps(date(2024, 12, 1).toordinal(), date(2025, 1, 1).toordinal()))
+        self.assertTrue(self.index.overlaps(date(2024, 12, 1).toordinal(), date(2025, 2, 1).toordinal()))
+        self.assertFalse(self.index.overlaps(date(2025, 3, 1).toordinal(), date(2025, 4, 1).toordinal()))
+
+    def test_windows_walk_gaps(self):
+        day = date(2025, 1, 2).toordinal()
+        forward = list(self.index.windows(day, 1))
+        self.assertEqual(forward[:2], [(2, date(2025, 1, 4).toordinal()), (6, date(2025, 1, 8).toordinal())])
+        self.assertEqual(forward[-1], (38, date(2025, 2, 9).toordinal()))
+        self.assertEqual(len(forward), 10)
+        self.assertEqual(list(self.index.windows(day, 1, forward=False)), [(2, date(2024, 12, 31).toordinal())])
+        # One-night gaps are too short for two nights
+        self.assertEqual(list(self.index.windows(day, 2)), [(38, date(2025, 2, 9).toordinal())])
+        march = date(2025, 3, 1).toordinal()
+        self.assertEqual(next(self.index.windows(march, 5)), (0, march))
+
+    def test_fits_ignores_own_interval(self):
+        booking = self.bookings[4]
+        # Extending into the free night on either side fits, reaching a neighbour does not
+        self.assertTrue(self.index.fits(4, booking.start - 1, booking.end + 1))
+        self.assertFalse(self.index.fits(4, booking.start - 2, booking.end))
+        self.assertFalse(self.index.fits(4, booking.start, booking.end + 2))
+        self.assertTrue(self.index.fits(4, date(2025, 3, 1).toordinal(), date(2025, 3, 5).toordinal()))
+        self.assertFalse(self.index.fits(4, self.bookings[7].start, self.bookings[7].end))
+
+    def test_reposition(self):
+        booking = self.bookings[4]
+        booking.start_date -= timedelta(days=1)
+        self.index.reposition(4)
+        self.assertIs(self.index[4], booking)
+        self.assertEqual((self.index.starts[4], self.index.ends[4]), (booking.start, booking.end))
+        booking.start_date, booking.end_date = date(2025, 3, 1), date(2025, 3, 3)
+        self.index.reposition(4)
+        self.assertIs(self.index[9], booking)
+        self.assertEqual(self.index.starts, sorted(self.index.starts))
+        self.assertEqual(self.index.ends, [b.end for b in self.index])
+
+    def test_drop_ended(self):
+        day = self.bookings[3].end
+        self.assertEqual(self.index.ended(day), self.bookings[:4])
+        self.index.drop_ended(day)
+        self.assertEqual(list(self.index), self.bookings[4:])
+        self.assertEqual(self.index.ends, [b.end for b in self.bookings[4:]])
+        self.index.drop_ended(day - 100)
+        self.assertEqual(len(self.index), 6)
+
+    def test_remove(self):
+        self.index.remove(self.bookings[4])
+        self.assertNotIn(self.bookings[4], self.index)
+        self.assertEqual(len(self.index), 9)
+        self.assertFalse(self.index.overlaps(self.bookings[4].start, self.bookings[4].end))
+
+    def test_remove_unknown_booking(self):
+        other = Booking(99, self.room, "Other", self.bookings[0].start_date, self.bookings[0].end_date)
+        with self.assertRaises(Exception) as context:
+            self.index.remove(other)
+        self.assertEqual(str(context.exception), "Booking not indexed")
+
+
+class TestRoomRegistry(unittest.TestCase):
+    def setUp(self):
+        self.room1 = Room(101, "standard", 100.0, 2)
+        self.room2 = Room(102, "luxury", 200.0, 3)
+        self.rooms = RoomRegistry([self.room1, self.room2])
+
+    def test_lookup(self):
+        self.assertIs(self.rooms.get(101), self.room1)
+        self.assertIs(self.rooms.get(102), self.room2)
+        self.assertIsNone(self.rooms.get(999))
+
+    def test_behaves_as_list(self):
+        self.assertEqual(self.rooms, [self.room1, self.room2])
+        self.assertEqual(len(self.rooms), 2)
+        self.assertIs(self.rooms[0], self.room1)
+
+    def test_append_and_remove(self):
+        room3 = Room(103, "standard", 90.0, 2)
+        self.rooms.append(room3)
+        self.assertIs(self.rooms.get(103), room3)
+        self.rooms.remove(self.room1)
+        self.assertIsNone(self.rooms.get(101))
+        self.assertIs(self.rooms.pop(), room3)
+        self.assertIsNone(self.rooms.get(103))
+        del self.rooms[0]
+        self.assertIsNone(self.rooms.get(102))
+
+    def test_candidates(self):
+        room3 = Room(103, "standard", 80.0, 4)
+        room4 = Room(104, "luxury", 150.0, 2)
+        self.rooms.extend([room3, room4])
+        self.assertEqual(list(self.rooms.candidates()), [room3, self.room1, room4, self.room2])
+        self.assertEqual(list(self.rooms.candidates(room_type="luxury")), [room4, self.room2])
+        self.assertEqual(list(self.rooms.candidates(min_capacity=3)), [room3, self.room2])
+        self.assertEqual(list(self.rooms.candidates(max_price=100.0)), [room3, self.room1])
+        self.assertEqual(list(self.rooms.candidates(room_type="suite")), [])
+        self.rooms.remove(room3)
+        self.assertEqual(list(self.rooms.candidates(min_capacity=3)), [self.room2])
+        room4.price_per_day = 250.0
+        self.rooms.reindex()
+        self.assertEqual(list(self.rooms.candidates(room_type="luxury")), [self.room2, room4])
+
+    def test_duplicate_numbers_first_wins(self):
+        duplicate = Room(101, "luxury", 500.0, 4)
+        self.rooms.append(duplicate)
+        self.assertIs(self.rooms.get(101), self.room1)
+        self.rooms.remove(self.room1)
+        self.assertIs(self.rooms.get(101), duplicate)
+
+    def test_replace_item(self):
+        room3 = Room(103, "standard", 90.0, 2)
+        self.rooms[1] = room3
+        self.assertIsNone(self.rooms.get(102))
+        self.assertIs(self.rooms.get(103), room3)
+
 
 class TestBooking(unittest.TestCase):
     def setUp(self):
@@ -58,6 +206,14 @@ class TestBooking(unittest.TestCase):
         self.assertEqual(booking.start_date, date(2025, 4, 2))
         self.assertEqual(booking.end_date, date(2025, 4, 6))
 
+    def test_dates_kept_as_day_ordinals(self):
+        booking = Booking(1, self.room, "Dave", date(2025, 4, 1), date(2025, 4, 4))
+        self.assertEqual((booking.start, booking.end), (date(2025, 4, 1).toordinal(), date(2025, 4, 4).toordinal()))
+        booking.end_date = date(2025, 4, 5)
+        self.assertEqual(booking.end, date(2025, 4, 5).toordinal())
+        self.assertEqual((booking.start_date, booking.end_date), (date(2025, 4, 1), date(2025, 4, 5)))
+        self.assertTrue(self.room.is_free(booking.start, booking.end))
+
     def test_update_dates_invalid_range(self):
         booking = Booking(1, self.room, "Eve", date(2025, 5, 1), date(2025, 5, 4))
         with self.assertRaises(Exception) as context:
@@ -84,7 +240,7 @@ class TestHotel(unittest.TestCase):
 
     def test_generate_booking_id(self):
         self.assertEqual(self.hotel.generate_booking_id(), 1)
-        self.hotel.bookings[1] = "dummy"
+        self.hotel.bookings[1] = Booking(1, self.room1, "Dummy", self.today, self.tomorrow)
         self.assertEqual(self.hotel.generate_booking_id(), 2)
 
     def test_book_room_success(self):
@@ -113,6 +269,42 @@ class TestHotel(unittest.TestCase):
             self.hotel.book_room(101, "Grace", date(2025, 6, 4), date(2025, 6, 7))
         self.assertEqual(str(context.exception), "Room not available for the selected dates")
 
+    def test_book_many_atomic(self):
+        ids = self.hotel.book_many([
+            (101, "Ann", date(2025, 6, 1), date(2025, 6, 4)),
+            (101, "Ben", date(2025, 6, 4), date(2025, 6, 6)),
+            (102, "Cal", date(2025, 6, 1), date(2025, 6, 8)),
+        ])
+        self.assertEqual(ids, [1, 2, 3])
+        self.assertEqual(self.hotel.bookings[2].guest_name, "Ben")
+        self.assertFalse(self.room1.is_available_for(date(2025, 6, 3), date(2025, 6, 5)))
+        self.assertAlmostEqual(self.hotel.get_total_income(), 300 + 200 + 7 * 200 * 0.9)
+
+    def test_book_many_atomic_rejects_whole_batch(self):
+        self.hotel.book_room(103, "Dee", date(2025, 6, 1), date(2025, 6, 3))
+        for conflict in [(101, "Eli", date(2025, 6, 2), date(2025, 6, 5)),  # overlaps the first request
+                         (103, "Eli", date(2025, 6, 2), date(2025, 6, 5)),  # overlaps an existing booking
+                         (999, "Eli", date(2025, 6, 2), date(2025, 6, 5))]:
+            with self.assertRaises(Exception) as context:
+                self.hotel.book_many([(101, "Fay", date(2025, 6, 1), date(2025, 6, 4)), conflict])
+            self.assertTrue(str(context.exception).startswith("Booking request 1 failed"))
+            self.assertEqual(len(self.hotel.bookings), 1)
+            self.assertTrue(self.room1.is_available_for(date(2025, 6, 1), date(2025, 6, 4)))
+        self.assertEqual(self.hotel.book_room(101, "Gus", date(2025, 6, 1), date(2025, 6, 4)), 2)
+
+    def test_book_many_best_effort(self):
+        results = self.hotel.book_many([
+            (101, "Ann", date(2025, 6, 1), date(2025, 6, 4)),
+            (101, "Ben", date(2025, 6, 3), date(2025, 6, 6)),
+            (102, "Cal", date(2025, 6, 5), date(2025, 6, 1)),
+            (102, "Dee", date(2025, 6, 1), date(2025, 6, 3)),
+        ], atomic=False)
+        self.assertEqual([r.booking_id for r in results], [1, None, None, 2])
+        self.assertEqual(str(results[1].error), "Room not available for the selected dates")
+        self.assertEqual(str(results[2].error), "Invalid date range")
+        self.assertIsNone(results[0].error)
+        self.assertEqual(self.hotel.report(), {101: 1, 102: 1, 103: 0})
+
     def test_cancel_booking_success(self):
         start = date(2025, 7, 1)
         end = date(2025, 7, 4)
@@ -155,6 +347,92 @@ class TestHotel(unittest.TestCase):
             self.hotel.get_booking_info(999)
         self.assertEqual(str(context.exception), "Booking not found")
 
+    def test_search_rooms(self):
+        self.hotel.rooms.append(Room(104, "standard", 90.0, 3))
+        start, end = date(2025, 7, 1), date(2025, 7, 5)
+        self.assertEqual(list(self.hotel.search_rooms(start, end)), [104, 101, 102, 103])
+        self.hotel.book_room(104, "Ann", start, end)
+        self.assertEqual(list(self.hotel.search_rooms(start, end, room_type="standard")), [101])
+        self.assertEqual(list(self.hotel.search_rooms(start, end, min_capacity=3)), [102, 103])
+        self.assertEqual(list(self.hotel.search_rooms(start, end, max_price=200.0, limit=1)), [101])
+        self.assertEqual(list(self.hotel.search_rooms(end, date(2025, 7, 6), min_capacity=3, max_price=100.0)), [104])
+
+    def test_search_rooms_is_lazy(self):
+        results = self.hotel.search_rooms(date(2025, 7, 1), date(2025, 7, 5))
+        self.assertEqual(next(results), 101)
+        self.assertEqual(next(results), 102)
+
+    def test_find_next_available(self):
+        self.hotel.book_room(101, "Ann", date(2025, 7, 1), date(2025, 7, 5))
+        self.hotel.book_room(101, "Ben", date(2025, 7, 6), date(2025, 7, 10))
+        self.hotel.book_room(101, "Cal", date(2025, 7, 12), date(2025, 7, 20))
+        self.assertEqual(self.hotel.find_next_available(101, 1, date(2025, 7, 2)), (101, date(2025, 7, 5), date(2025, 7, 6)))
+        self.assertEqual(self.hotel.find_next_available(101, 2, date(2025, 7, 2)), (101, date(2025, 7, 10), date(2025, 7, 12)))
+        self.assertEqual(self.hotel.find_next_available(101, 3, date(2025, 7, 2)), (101, date(2025, 7, 20), date(2025, 7, 23)))
+        self.assertEqual(self.hotel.find_next_available({"room_type": "standard"}, 3, date(2025, 7, 2)),
+                         (101, date(2025, 7, 20), date(2025, 7, 23)))
+        self.assertEqual(self.hotel.find_next_available({}, 3, date(2025, 7, 2)), (102, date(2025, 7, 2), date(2025, 7, 5)))
+        self.assertIsNone(self.hotel.find_next_available({"min_capacity": 10}, 3, date(2025, 7, 2)))
+        with self.assertRaises(Exception) as context:
+            self.hotel.find_next_available(999, 3, date(2025, 7, 2))
+        self.assertEqual(str(context.exception), "Room not found")
+
+    def test_suggest_alternatives(self):
+        self.hotel.book_room(101, "Ann", date(2025, 7, 1), date(2025, 7, 5))
+        self.hotel.book_room(101, "Ben", date(2025, 7, 8), date(2025, 7, 10))
+        self.hotel.book_room(102, "Cal", date(2025, 7, 1), date(2025, 7, 20))
+        self.assertEqual(self.hotel.suggest_alternatives(101, date(2025, 7, 3), date(2025, 7, 6), k=3), [
+            (101, date(2025, 7, 5), date(2025, 7, 8)),
+            (101, date(2025, 6, 28), date(2025, 7, 1)),
+            (101, date(2025, 7, 10), date(2025, 7, 13)),
+        ])
+        self.assertEqual(self.hotel.suggest_alternatives(101, date(2025, 7, 3), date(2025, 7, 6), k=3, earliest=date(2025, 7, 1)),
+                         [(101, date(2025, 7, 5), date(2025, 7, 8)), (101, date(2025, 7, 10), date(2025, 7, 13))])
+        # The requested dates come first when some matching room is free, then the day before them
+        self.assertEqual(self.hotel.suggest_alternatives({"min_capacity": 2}, date(2025, 7, 3), date(2025, 7, 6), k=2),
+                         [(103, date(2025, 7, 3), date(2025, 7, 6)), (103, date(2025, 7, 2), date(2025, 7, 5))])
+        with self.assertRaises(Exception) as context:
+            self.hotel.suggest_alternatives(101, date(2025, 7, 6), date(2025, 7, 3))
+        self.assertEqual(str(context.exception), "Invalid date range")
+
+    def test_suggest_alternatives_in_gap_of_start(self):
+        # The free nights just before the requested dates are in the same gap as its start
+        self.hotel.book_room(101, "Ann", date(2025, 7, 1), date(2025, 7, 2))
+        self.hotel.book_room(101, "Ben", date(2025, 7, 11), date(2025, 7, 13))
+        self.assertEqual(self.hotel.suggest_alternatives(101, date(2025, 7, 9), date(2025, 7, 12), k=3), [
+            (101, date(2025, 7, 8), date(2025, 7, 11)),
+            (101, date(2025, 7, 13), date(2025, 7, 16)),
+            (101, date(2025, 6, 28), date(2025, 7, 1)),
+        ])
+        self.assertEqual(self.hotel.suggest_alternatives(101, date(2025, 7, 20), date(2025, 7, 22), k=2), [
+            (101, date(2025, 7, 20), date(2025, 7, 22)),
+            (101, date(2025, 7, 19), date(2025, 7, 21)),
+        ])
+
+    def test_book_room_appended_room(self):
+        room4 = Room(104, "standard", 90.0, 2)
+        self.hotel.rooms.append(room4)
+        booking_id = self.hotel.book_room(104, "Zoe", self.today, self.tomorrow)
+        self.assertIs(self.hotel.bookings[booking_id].room, room4)
+        self.hotel.rooms.remove(room4)
+        with self.assertRaises(Exception) as context:
+            self.hotel.book_room(104, "Zoe", self.tomorrow, self.tomorrow + timedelta(days=1))
+        self.assertEqual(str(context.exception), "Room not found")
+
+    def test_rooms_list_is_copied(self):
+        rooms = [Room(201, "standard", 90.0, 2)]
+        hotel = Hotel("Florida Beach", rooms)
+        self.assertIsNot(hotel.rooms, rooms)
+        rooms.append(Room(202, "standard", 90.0, 2))
+        with self.assertRaises(Exception) as context:
+            hotel.book_room(202, "Zoe", self.today, self.tomorrow)
+        self.assertEqual(str(context.exception), "Room not found")
+        registry = RoomRegistry(rooms)
+        hotel.rooms = registry
+        self.assertIs(hotel.rooms, registry)
+        registry.append(Room(203, "standard", 90.0, 2))
+        self.assertEqual(hotel.book_room(203, "Zoe", self.today, self.tomorrow), 1)
+
     def test_report_initial(self):
         rep = self.hotel.report()
         self.assertEqual(rep, {101: 0, 102: 0, 103: 0})
@@ -274,6 +552,50 @@ class TestHotel(unittest.TestCase):
         id2 = self.hotel.book_room(101, "Hannah", date(2026, 11, 1), date(2026, 11, 4))  # returns 2
         self.assertEqual(id2, 2)  # updated expected value
 
+    def test_aggregates_track_direct_changes(self):
+        id1 = self.hotel.book_room(101, "Amy", date(2026, 7, 1), date(2026, 7, 4))
+        self.hotel.book_room(102, "Ben", date(2026, 7, 1), date(2026, 7, 9))
+        room4 = Room(104, "standard", 90.0, 2)
+        self.hotel.rooms.append(room4)
+        self.assertEqual(self.hotel.report(), {101: 1, 102: 1, 103: 0, 104: 0})
+        del self.hotel.bookings[id1]
+        self.hotel.rooms.remove(self.room3)
+        self.assertEqual(self.hotel.report(), {101: 0, 102: 1, 104: 0})
+        self.assertAlmostEqual(self.hotel.get_total_income(), 8 * 200.0 * 0.9)
+        self.hotel.bookings.clear()
+        self.assertEqual(self.hotel.get_total_income(), 0)
+        self.assertEqual(self.hotel.report(), {101: 0, 102: 0, 104: 0})
+
+    def test_income_does_not_drift(self):
+        self.hotel.debug = True
+        booking_id = self.hotel.book_room(101, "Amy", date(2026, 7, 1), date(2026, 7, 4))
+        for i in range(50):
+            self.hotel.update_booking(booking_id, date(2026, 7, 1), date(2026, 7, 4 + i % 7))
+            other = self.hotel.book_room(102, "Ben", date(2026, 8, 1), date(2026, 8, 2 + i % 9))
+            self.hotel.cancel_booking(other)
+        self.hotel.update_booking(booking_id, date(2026, 7, 1), date(2026, 7, 10))
+        self.assertEqual(self.hotel.get_total_income(), 9 * 100.0 * 0.9)
+
+    def test_debug_detects_stale_aggregates(self):
+        self.hotel.debug = True
+        booking_id = self.hotel.book_room(101, "Amy", date(2026, 7, 1), date(2026, 7, 4))
+        self.hotel.get_total_income()
+        # Changing the price behind the hotel's back leaves the running total stale
+        self.hotel.bookings[booking_id].total_price = 1.0
+        with self.assertRaises(Exception) as context:
+            self.hotel.get_total_income()
+        self.assertTrue(str(context.exception).startswith("Income aggregate mismatch"))
+
+    def test_income_with_non_float_prices(self):
+        self.hotel.rooms.append(Room(201, "standard", Decimal("99.99"), 2))
+        self.hotel.rooms.append(Room(202, "standard", Fraction(1, 3), 2))
+        self.hotel.book_room(201, "Amy", date(2026, 7, 1), date(2026, 7, 2))
+        self.assertAlmostEqual(self.hotel.get_total_income(), 99.99)
+        booking_id = self.hotel.book_room(202, "Ben", date(2026, 7, 1), date(2026, 7, 3))
+        self.assertAlmostEqual(self.hotel.get_total_income(), 99.99 + 2 / 3)
+        self.hotel.cancel_booking(booking_id)
+        self.assertAlmostEqual(self.hotel.get_total_income(), 99.99)
+
     def test_total_income_with_no_bookings(self):
         self.assertEqual(self.hotel.get_total_income(), 0)
 
@@ -308,6 +630,54 @@ class TestHotel(unittest.TestCase):
         # Instead of checking availability for the booked period, check for a period after the booking ends.
         self.assertTrue(self.room1.is_available_for(date(2027, 3, 8), date(2027, 3, 10)))
 
+    def test_update_booking_in_place(self):
+        first = self.hotel.book_room(101, "Ann", date(2025, 6, 1), date(2025, 6, 4))
+        second = self.hotel.book_room(101, "Ben", date(2025, 6, 6), date(2025, 6, 9))
+        third = self.hotel.book_room(101, "Cal", date(2025, 6, 12), date(2025, 6, 14))
+        booking = self.hotel.bookings[second]
+        # Shrink, extend and shift between the neighbours
+        for start, end in [(date(2025, 6, 7), date(2025, 6, 8)), (date(2025, 6, 4), date(2025, 6, 12)),
+                           (date(2025, 6, 5), date(2025, 6, 10))]:
+            self.hotel.update_booking(second, start, end)
+            self.assertIs(self.room1.bookings[1], booking)
+            self.assertEqual(self.room1.bookings.starts[1], start.toordinal())
+            self.assertEqual((booking.start_date, booking.end_date), (start, end))
+        # Shift past a neighbour
+        self.hotel.update_booking(second, date(2025, 5, 20), date(2025, 5, 25))
+        self.assertEqual([b.booking_id for b in self.room1.bookings], [second, first, third])
+        self.assertEqual(self.hotel.get_total_income(), 5 * 100.0 + 3 * 100.0 + 2 * 100.0)
+
+    def test_update_booking_moves_room(self):
+        booking_id = self.hotel.book_room(101, "Ann", date(2025, 6, 1), date(2025, 6, 4))
+        self.hotel.update_booking(booking_id, date(2025, 6, 2), date(2025, 6, 5), new_room_number=102)
+        booking = self.hotel.bookings[booking_id]
+        self.assertIs(booking.room, self.room2)
+        self.assertEqual(booking.total_price, 600.0)
+        self.assertEqual(list(self.room1.bookings), [])
+        self.assertEqual(list(self.room2.bookings), [booking])
+        self.assertEqual(self.hotel.report(), {101: 0, 102: 1, 103: 0})
+        self.assertEqual(self.hotel.get_total_income(), 600.0)
+        self.hotel.check_aggregates()
+        self.assertTrue(self.room1.is_available_for(date(2025, 6, 1), date(2025, 6, 4)))
+        self.hotel.cancel_booking(booking_id)
+        self.assertEqual(self.hotel.report(), {101: 0, 102: 0, 103: 0})
+
+    def test_rejected_update_leaves_state(self):
+        first = self.hotel.book_room(101, "Ann", date(2025, 6, 1), date(2025, 6, 4))
+        self.hotel.book_room(102, "Ben", date(2025, 6, 1), date(2025, 6, 4))
+        before = (list(self.room1.bookings), list(self.room1.bookings.starts), list(self.room2.bookings),
+                  self.hotel.report(), self.hotel.get_total_income())
+        for args, message in [((date(2025, 6, 2), date(2025, 6, 3), 102), "Room not available for the new selected dates"),
+                              ((date(2025, 6, 2), date(2025, 6, 3), 999), "Room not found"),
+                              ((date(2025, 6, 3), date(2025, 6, 2), 103), "Invalid date range")]:
+            with self.assertRaises(Exception) as context:
+                self.hotel.update_booking(first, *args)
+            self.assertEqual(str(context.exception), message)
+            self.assertEqual((list(self.room1.bookings), list(self.room1.bookings.starts), list(self.room2.bookings),
+                              self.hotel.report(), self.hotel.get_total_income()), before)
+        booking = self.hotel.bookings[first]
+        self.assertEqual((booking.room, booking.start_date, booking.end_date), (self.room1, date(2025, 6, 1), date(2025, 6, 4)))
+
     def test_update_booking_failure_rollback(self):
         # New test: if an update fails due to overlap, the original booking remains unchanged.
         start = date(2027, 4, 1)
@@ -322,5 +692,46 @@ class TestHotel(unittest.TestCase):
         self.assertIn(str(start), info)
         self.assertIn(str(end), info)
 
+    def test_snapshot_view_is_frozen(self):
+        first = self.hotel.book_room(101, "Amy", date(2026, 7, 1), date(2026, 7, 4))
+        second = self.hotel.book_room(102, "Ben", date(2026, 7, 1), date(2026, 7, 9))
+        info = self.hotel.get_booking_info(second)
+        view = self.hotel.snapshot_view()
+        report, income = self.hotel.report(), self.hotel.get_total_income()
+        iterator = view.items()
+        next(iterator)
+        # The hotel changes in every way while the view is being read
+        self.hotel.cancel_booking(first)
+        self.hotel.update_booking(second, date(2026, 8, 1), date(2026, 8, 3), 103)
+        third = self.hotel.book_room(101, "Cy", date(2026, 7, 1), date(2026, 7, 2))
+        self.assertEqual([booking_id for booking_id, _ in iterator], [second])
+        self.assertEqual(list(view), [second, first])
+        self.assertEqual(len(view), 2)
+        self.assertEqual((view[first].guest_name, view[first].room.number), ("Amy", 101))
+        self.assertEqual(view.get_booking_info(second), info)
+        self.assertNotIn(third, view)
+        with self.assertRaises(Exception) as context:
+            view.get_booking_info(third)
+        self.assertEqual(str(context.exception), "Booking not found")
+        self.assertEqual((view.report(), view.get_total_income()), (report, income))
+        self.assertEqual(self.hotel.report(), {101: 1, 102: 0, 103: 1})
+        self.assertEqual(sum(booking.total_price for booking in view.values()), income)
+        # Bookings read through the view are copies
+        view[second].total_price = 0
+        self.assertEqual(self.hotel.bookings[second].total_price, 2 * 300.0)
+        view.close()
+        self.assertEqual(self.hotel._views, ())
+
+    def test_snapshot_views_are_released(self):
+        with self.hotel.snapshot_view() as view:
+            self.hotel.snapshot_view()  # dropped right away
+            self.assertEqual(len(self.hotel._views), 1)
+            self.hotel.book_room(101, "Amy", date(2026, 7, 1), date(2026, 7, 4))
+            self.assertEqual(len(view), 0)
+        self.assertEqual(self.hotel._views, ())
+        self.hotel.book_room(101, "Ben", date(2026, 7, 5), date(2026, 7, 6))
+        self.assertEqual(len(view._overrides), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
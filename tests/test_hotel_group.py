@@ -0,0 +1,98 @@
+import random
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+from hotel_group import HotelGroup
+from pricing import RulePricing, Season
+
+
+def build_hotels():
+    hotels = []
+    for h, name in enumerate(["Florida Beach", "Lake View", "Old Town"]):
+        rooms = [Room(100 + i, "standard" if i % 2 else "luxury", 80.0 + 10 * h + i, 2 + i % 3) for i in range(5 + h)]
+        hotels.append(Hotel(name, rooms))
+    return hotels
+
+
+class TestHotelGroup(unittest.TestCase):
+    def setUp(self):
+        self.hotels = build_hotels()
+        self.start = date(2025, 6, 1)
+        self.hotels[1].book_room(100, "Ann", self.start, self.start + timedelta(days=3))
+        self.group = HotelGroup(build_hotels(), processes=2)
+        self.group.book_room("Lake View", 100, "Ann", self.start, self.start + timedelta(days=3))
+
+    def tearDown(self):
+        self.group.close()
+
+    def test_routes_operations_to_owner(self):
+        booking_id = self.group.book_room("Old Town", 103, "Bob", self.start, self.start + timedelta(days=2))
+        self.assertEqual(booking_id, 1)
+        self.assertIn("Bob", self.group.get_booking_info("Old Town", booking_id))
+        self.group.update_booking("Old Town", booking_id, self.start, self.start + timedelta(days=4))
+        self.assertEqual(self.group.hotel("Old Town").bookings[booking_id].end_date, self.start + timedelta(days=4))
+        self.group.cancel_booking("Old Town", booking_id)
+        self.assertEqual(self.group.report()["Old Town"][103], 0)
+
+    def test_errors_come_back(self):
+        with self.assertRaises(Exception) as context:
+            self.group.book_room("Lake View", 100, "Cal", self.start, self.start + timedelta(days=1))
+        self.assertEqual(str(context.exception), "Room not available for the selected dates")
+        with self.assertRaises(Exception) as context:
+            self.group.cancel_booking("Nowhere", 1)
+        self.assertEqual(str(context.exception), "Hotel not found")
+
+    def test_queries_match_local_hotels(self):
+        rng = random.Random(3)
+        requests = []
+        for _ in range(200):
+            hotel = rng.choice(self.hotels)
+            start = self.start + timedelta(days=rng.randrange(30))
+            requests.append((hotel.name, rng.randrange(100, 100 + len(hotel.rooms)), "Guest", start,
+                             start + timedelta(days=rng.randrange(1, 6))))
+        results = self.group.book_many(requests)
+        for (name, room_number, guest_name, start_date, end_date), result in zip(requests, results):
+            hotel = next(h for h in self.hotels if h.name == name)
+            try:
+                self.assertEqual(result.booking_id, hotel.book_room(room_number, guest_name, start_date, end_date))
+            except Exception as e:
+                self.assertEqual(str(result.error), str(e))
+        start, end = self.start + timedelta(days=10), self.start + timedelta(days=12)
+        self.assertEqual(self.group.get_available_rooms(start, end),
+                         {h.name: h.get_available_rooms(start, end) for h in self.hotels})
+        self.assertEqual(self.group.report(), {h.name: h.report() for h in self.hotels})
+        self.assertAlmostEqual(self.group.get_total_income(), sum(h.get_total_income() for h in self.hotels))
+        found = self.group.search_rooms(start, end, min_capacity=3)
+        prices = [next(h for h in self.hotels if h.name == name).rooms.get(number).price_per_day for name, number in found]
+        self.assertEqual(prices, sorted(prices))
+        self.assertEqual(len(found), sum(len(list(h.search_rooms(start, end, min_capacity=3))) for h in self.hotels))
+        self.assertEqual(self.group.search_rooms(start, end, min_capacity=3, limit=2), found[:2])
+
+    def test_pricing_travels_with_hotels(self):
+        pricing = RulePricing(self.start, 60, seasons=[Season(self.start, self.start + timedelta(days=30), 2.0)])
+        hotel = Hotel("Harbour", [Room(100, "standard", 100.0, 2, pricing), Room(101, "standard", 100.0, 2)])
+        local = Hotel("Harbour", [Room(100, "standard", 100.0, 2, pricing), Room(101, "standard", 100.0, 2)])
+        with HotelGroup([hotel], processes=1) as group:
+            for target in (group, local):
+                args = ("Harbour",) if target is group else ()
+                target.book_room(*args, 100, "Ann", self.start, self.start + timedelta(days=2))
+                target.book_room(*args, 101, "Bob", self.start, self.start + timedelta(days=2))
+            self.assertEqual(group.incomes(), {"Harbour": local.get_total_income()})
+            self.assertEqual(local.get_total_income(), 400.0 + 200.0)
+            copy = group.hotel("Harbour")
+        # Copies fetched back keep pricing new stays by the hotel's policy
+        booking_id = copy.book_room(100, "Cal", self.start + timedelta(days=2), self.start + timedelta(days=4))
+        self.assertEqual(copy.bookings[booking_id].total_price, 400.0)
+
+    def test_book_many_unknown_hotel(self):
+        results = self.group.book_many([("Nowhere", 100, "Dee", self.start, self.start + timedelta(days=1))])
+        self.assertEqual(str(results[0].error), "Hotel not found")
+
+    def test_duplicate_names(self):
+        with self.assertRaises(Exception) as context:
+            HotelGroup([Hotel("Twin", []), Hotel("Twin", [])], processes=1)
+        self.assertEqual(str(context.exception), "Duplicate hotel name")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from hotel_system import Room, Hotel
+from instrumentation import Instrumentation
+
+IS_FREE = Room.__dict__["is_free"]  # Captured before any test enables instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.hotel = Hotel("Florida Beach", [Room(101, "standard", 100.0, 2), Room(102, "luxury", 200.0, 3)])
+        self.events = []
+        self.metrics = Instrumentation(self.hotel, on_event=lambda event, booking: self.events.append((event, booking.booking_id)))
+
+    def tearDown(self):
+        self.metrics.disable()
+
+    def test_disabled_patches_nothing(self):
+        self.assertNotIn("book_room", vars(self.hotel))
+        self.assertIs(Room.__dict__["is_free"], IS_FREE)
+        self.hotel.book_room(101, "Ann", date(2025, 6, 1), date(2025, 6, 3))
+        self.assertEqual(self.metrics.counters, {})
+        self.assertEqual(self.events, [])
+
+    def test_counts_latencies_and_events(self):
+        with self.metrics:
+            self.assertIsNot(Room.__dict__["is_free"], IS_FREE)
+            booking_id = self.hotel.book_room(101, "Ann", date(2025, 6, 1), date(2025, 6, 3))
+            with self.assertRaises(Exception):
+                self.hotel.book_room(101, "Ben", date(2025, 6, 2), date(2025, 6, 4))
+            self.hotel.update_booking(booking_id, date(2025, 6, 1), date(2025, 6, 5))
+            self.assertEqual(self.hotel.get_available_rooms(date(2025, 6, 2), date(2025, 6, 3)), [102])
+            self.hotel.cancel_booking(booking_id)
+        self.assertIs(Room.__dict__["is_free"], IS_FREE)
+        self.assertNotIn("book_room", vars(self.hotel))
+        counters = self.metrics.counters
+        self.assertEqual(counters[("operations_total", (("operation", "book_room"), ("outcome", "ok")))], 1)
+        self.assertEqual(counters[("operations_total", (("operation", "book_room"), ("outcome", "error")))], 1)
+        self.assertEqual(self.metrics.histograms[("operation_seconds", (("operation", "book_room"),))].count, 2)
+        self.assertEqual(self.events, [("booking_added", 1), ("booking_updated", 1), ("booking_cancelled", 1)])
+        self.assertEqual(counters[("availability_checks_total", ())], 4)
+        scanned = self.metrics.histograms[("availability_scanned_bookings", ())]
+        self.assertEqual(scanned.sum, 2)
+        self.assertEqual(self.metrics.histograms[("pricing_seconds", (("policy", "DefaultPricing"),))].count, 2)
+        self.assertEqual(type(self.hotel.rooms.get(101).pricing).__name__, "DefaultPricing")
+
+    def test_export(self):
+        with self.metrics:
+            self.hotel.book_room(101, "Ann", date(2025, 6, 1), date(2025, 6, 3))
+        text = self.metrics.export_text()
+        self.assertIn("# TYPE hotel_operations_total counter", text)
+        self.assertIn('hotel_operations_total{operation="book_room",outcome="ok"} 1', text)
+        self.assertIn('hotel_operation_seconds_bucket{operation="book_room",le="+Inf"} 1', text)
+        self.assertIn('hotel_events_total{event="booking_added"} 1', text)
+        received = []
+        self.metrics.export(received.append)
+        self.assertEqual(received, [text])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.prom")
+            self.metrics.export(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), text)
+
+    def test_nested_instrumentation_is_rejected(self):
+        self.metrics.enable()
+        with self.assertRaises(Exception) as context:
+            Instrumentation(self.hotel).enable()
+        self.assertEqual(str(context.exception), "Hotel is already instrumented")
+
+
+if __name__ == '__main__':
+    unittest.main()
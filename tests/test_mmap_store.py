@@ -0,0 +1,76 @@
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+from mmap_store import MmapArchive, write_archive
+
+
+class TestMmapArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rooms = [Room(100 + i, "standard", 100.0 + i, 2) for i in range(4)]
+        # Build two years of history in one hotel, archive it, then serve it from a fresh hotel
+        history = Hotel("Florida Beach", rooms)
+        rng = random.Random(5)
+        day = date(2023, 1, 1)
+        for _ in range(400):
+            start = day + timedelta(days=rng.randrange(700))
+            try:
+                history.book_room(rng.randrange(100, 104), f"Guest {rng.randrange(30)}",
+                                  start, start + timedelta(days=rng.randrange(1, 8)))
+            except Exception:
+                pass
+        self.history = history
+        write_archive(self.tmp.name, history.bookings.values())
+        self.rooms = [Room(100 + i, "standard", 100.0 + i, 2) for i in range(4)]
+        self.hotel = Hotel("Florida Beach", self.rooms)
+        self.hotel.next_booking_id = history.next_booking_id
+        self.archive = MmapArchive(self.tmp.name, self.hotel.rooms)
+        self.hotel.attach_archive(self.archive)
+
+    def tearDown(self):
+        self.archive.close()
+        self.tmp.cleanup()
+
+    def test_aggregates_include_archive(self):
+        self.assertEqual(len(self.hotel.bookings), 0)
+        self.assertEqual(len(self.archive), len(self.history.bookings))
+        self.assertEqual(self.hotel.report(), self.history.report())
+        self.assertEqual(self.hotel.get_total_income(), self.history.get_total_income())
+        booking_id = self.hotel.book_room(100, "Zoe", date(2026, 1, 1), date(2026, 1, 3))
+        self.assertEqual(self.hotel.report()[100], self.history.report()[100] + 1)
+        self.hotel.cancel_booking(booking_id)
+        self.assertEqual(self.hotel.report(), self.history.report())
+        self.hotel.check_aggregates()
+
+    def test_availability_uses_archive(self):
+        rng = random.Random(9)
+        for _ in range(300):
+            start = date(2023, 1, 1) + timedelta(days=rng.randrange(710))
+            end = start + timedelta(days=rng.randrange(1, 6))
+            self.assertEqual(self.hotel.get_available_rooms(start, end), self.history.get_available_rooms(start, end))
+        booked = next(iter(self.history.bookings.values()))
+        with self.assertRaises(Exception) as context:
+            self.hotel.book_room(booked.room.number, "Zoe", booked.start_date, booked.end_date)
+        self.assertEqual(str(context.exception), "Room not available for the selected dates")
+
+    def test_materializes_on_lookup(self):
+        for booking_id, original in list(self.history.bookings.items())[:50]:
+            booking = self.hotel.bookings[booking_id]
+            self.assertIs(booking.room, self.hotel.rooms.get(original.room.number))
+            self.assertEqual((booking.guest_name, booking.start_date, booking.end_date, booking.total_price),
+                             (original.guest_name, original.start_date, original.end_date, original.total_price))
+            self.assertEqual(self.hotel.get_booking_info(booking_id), self.history.get_booking_info(booking_id))
+        with self.assertRaises(Exception) as context:
+            self.hotel.get_booking_info(10 ** 9)
+        self.assertEqual(str(context.exception), "Booking not found")
+
+    def test_columns_are_views(self):
+        room = self.archive.rooms[0]
+        self.assertIsInstance(room.starts, memoryview)
+        self.assertEqual(list(room.starts), sorted(room.starts))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+from retention import Retention
+from pricing import RulePricing, Season
+from persistence import (OperationLog, Persistence, read_log, replay_log, write_snapshot, read_snapshot,
+                         PRICED_BOOK, CANCEL)
+
+
+def state(hotel):
+    return {booking_id: (b.room.number, b.guest_name, b.start_date, b.end_date, b.total_price)
+            for booking_id, b in hotel.bookings.items()}
+
+
+class TestPersistence(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+        self.hotel = Hotel("Florida Beach", [Room(100 + i, "standard", 100.0 + i, 2) for i in range(5)])
+        self.start = date(2025, 1, 1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def random_operations(self, hotel, count, seed=1):
+        rng = random.Random(seed)
+        for _ in range(count):
+            start = self.start + timedelta(days=rng.randrange(100))
+            end = start + timedelta(days=rng.randrange(1, 9))
+            try:
+                op = rng.random()
+                if op < 0.6 or not hotel.bookings:
+                    hotel.book_room(rng.randrange(100, 105), f"Guest {rng.randrange(20)}", start, end)
+                elif op < 0.8:
+                    hotel.cancel_booking(rng.choice(list(hotel.bookings)))
+                elif op < 0.9:
+                    hotel.update_booking(rng.choice(list(hotel.bookings)), start, end)
+                else:
+                    hotel.update_booking(rng.choice(list(hotel.bookings)), start, end, rng.randrange(100, 105))
+            except Exception:
+                pass
+
+    def test_group_commit(self):
+        path = os.path.join(self.directory, "operations.log")
+        log = OperationLog(path, group_size=3, fsync=False)
+        self.hotel.add_listener(log)
+        self.hotel.book_room(100, "Alice", self.start, self.start + timedelta(days=2))
+        self.hotel.book_room(101, "Bob", self.start, self.start + timedelta(days=2))
+        self.assertEqual(os.path.getsize(path), 0)
+        self.hotel.cancel_booking(1)
+        self.assertEqual(os.path.getsize(path), log.position)
+        self.assertEqual([op for op, _, _ in read_log(path)], [PRICED_BOOK, PRICED_BOOK, CANCEL])
+        log.close()
+
+    def test_log_replay(self):
+        path = os.path.join(self.directory, "operations.log")
+        log = OperationLog(path, fsync=False)
+        self.hotel.add_listener(log)
+        self.random_operations(self.hotel, 300)
+        log.close()
+        restored = Hotel("Florida Beach", [Room(100 + i, "standard", 100.0 + i, 2) for i in range(5)])
+        self.assertEqual(replay_log(restored, path), os.path.getsize(path))
+        self.assertEqual(state(restored), state(self.hotel))
+        self.assertEqual(restored.next_booking_id, self.hotel.next_booking_id)
+
+    def test_snapshot_round_trip(self):
+        self.random_operations(self.hotel, 300)
+        path = os.path.join(self.directory, "snapshot.bin")
+        write_snapshot(self.hotel, path, log_offset=123)
+        restored, log_offset = read_snapshot(path)
+        self.assertEqual(log_offset, 123)
+        self.assertEqual(restored.name, "Florida Beach")
+        self.assertEqual(state(restored), state(self.hotel))
+        self.assertEqual(restored.report(), self.hotel.report())
+        self.assertEqual(restored.get_total_income(), self.hotel.get_total_income())
+        for room in restored.rooms:
+            self.assertEqual(list(room.bookings), sorted(room.bookings, key=lambda b: b.start_date))
+        restored.check_aggregates()
+
+    def test_recovery_replays_log_tail(self):
+        persistence = Persistence(self.hotel, self.directory, group_size=8, snapshot_every=50, fsync=False)
+        self.random_operations(self.hotel, 420)
+        persistence.close()
+        recovered = Persistence.open(self.directory, fsync=False)
+        self.assertEqual(state(recovered.hotel), state(self.hotel))
+        self.assertEqual(recovered.hotel.next_booking_id, self.hotel.next_booking_id)
+        # Recovered hotels keep logging where the old one stopped
+        booking_id = recovered.hotel.book_room(104, "Zoe", date(2026, 1, 1), date(2026, 1, 3))
+        recovered.close()
+        again = Persistence.open(self.directory, fsync=False)
+        self.assertEqual(again.hotel.bookings[booking_id].guest_name, "Zoe")
+        again.close()
+
+    def test_recovery_without_snapshot(self):
+        persistence = Persistence(self.hotel, self.directory, fsync=False)
+        self.random_operations(self.hotel, 50)
+        persistence.close()
+        recovered = Persistence.open(self.directory, fsync=False)
+        self.assertEqual(state(recovered.hotel), state(self.hotel))
+        recovered.close()
+
+    def test_recovery_after_room_changes(self):
+        persistence = Persistence(self.hotel, self.directory, fsync=False)
+        self.hotel.book_room(100, "Alice", self.start, self.start + timedelta(days=2))
+        self.hotel.rooms.append(Room(200, "suite", 300.0, 4))
+        self.hotel.book_room(200, "Bob", self.start, self.start + timedelta(days=3))
+        self.hotel.rooms.remove(self.hotel.rooms.get(104))
+        self.hotel.book_room(103, "Carol", self.start, self.start + timedelta(days=1))
+        persistence.close()
+        recovered = Persistence.open(self.directory, fsync=False)
+        self.assertEqual(state(recovered.hotel), state(self.hotel))
+        self.assertEqual(recovered.hotel.report(), self.hotel.report())
+        recovered.close()
+
+    def test_torn_tail_is_ignored(self):
+        persistence = Persistence(self.hotel, self.directory, fsync=False)
+        persistence.snapshot()
+        self.hotel.book_room(100, "Alice", self.start, self.start + timedelta(days=2))
+        self.hotel.book_room(101, "Bob", self.start, self.start + timedelta(days=2))
+        persistence.close()
+        log_path = os.path.join(self.directory, Persistence.LOG)
+        with open(log_path, "r+b") as f:
+            f.truncate(os.path.getsize(log_path) - 3)
+        recovered = Persistence.open(self.directory, fsync=False)
+        self.assertEqual(list(recovered.hotel.bookings), [1])
+        self.assertEqual(recovered.hotel.book_room(101, "Bob", self.start, self.start + timedelta(days=2)), 2)
+        recovered.close()
+        again = Persistence.open(self.directory, fsync=False)
+        self.assertEqual(sorted(again.hotel.bookings), [1, 2])
+        again.close()
+
+    def test_prices_survive_recovery(self):
+        pricing = RulePricing(self.start, 120, seasons=[Season(self.start, self.start + timedelta(days=30), 2.0),
+                                                        Season(self.start + timedelta(days=110), self.start + timedelta(days=120), 3.0)])
+        self.hotel.set_pricing(pricing)
+        persistence = Persistence(self.hotel, self.directory, fsync=False)
+        persistence.snapshot()
+        self.random_operations(self.hotel, 200)
+        persistence.snapshot()
+        self.random_operations(self.hotel, 100, seed=2)
+        persistence.close()
+        # Replayed or loaded with the default policy, bookings keep the prices they were given
+        restored = Hotel("Florida Beach", [Room(100 + i, "standard", 100.0 + i, 2) for i in range(5)])
+        replay_log(restored, os.path.join(self.directory, Persistence.LOG))
+        self.assertEqual(state(restored), state(self.hotel))
+        self.assertEqual(restored.get_total_income(), self.hotel.get_total_income())
+        recovered = Persistence.open(self.directory, fsync=False)
+        self.assertEqual(state(recovered.hotel), state(self.hotel))
+        recovered.hotel.check_aggregates()
+        recovered.close()
+        # And new bookings are priced by the policy given on recovery
+        recovered = Persistence.open(self.directory, pricing={100: pricing}, fsync=False)
+        self.assertIs(recovered.hotel.rooms.get(100).pricing, pricing)
+        start, end = self.start + timedelta(days=112), self.start + timedelta(days=114)
+        booking_id = recovered.hotel.book_room(100, "Zoe", start, end)
+        self.assertEqual(recovered.hotel.bookings[booking_id].total_price, 3.0 * 2 * 100.0)
+        recovered.close()
+
+    def assert_same_history(self, restored):
+        self.assertEqual(state(restored), state(self.hotel))
+        self.assertEqual(restored.report(), self.hotel.report())
+        self.assertEqual(restored.get_total_income(), self.hotel.get_total_income())
+        for day in range(0, 110, 3):
+            start = self.start + timedelta(days=day)
+            self.assertEqual(restored.get_available_rooms(start, start + timedelta(days=3)),
+                             self.hotel.get_available_rooms(start, start + timedelta(days=3)))
+        archived = [booking.booking_id for booking in self.hotel.bookings.archives[0]]
+        for booking_id in archived + list(self.hotel.bookings):
+            self.assertEqual(restored.get_booking_info(booking_id), self.hotel.get_booking_info(booking_id))
+        restored.check_aggregates()
+
+    def test_archived_bookings_are_kept(self):
+        persistence = Persistence(self.hotel, self.directory, fsync=False)
+        persistence.snapshot()
+        self.random_operations(self.hotel, 200)
+        retention = Retention(self.hotel)
+        self.assertGreater(retention.archive_before(self.start + timedelta(days=40)), 0)
+        self.random_operations(self.hotel, 100, seed=2)
+        # Replayed from the log alone, archived bookings stay archived
+        restored = Hotel("Florida Beach", [Room(100 + i, "standard", 100.0 + i, 2) for i in range(5)])
+        persistence.commit()
+        replay_log(restored, os.path.join(self.directory, Persistence.LOG))
+        self.assert_same_history(restored)
+        self.assertEqual(len(restored.bookings.archives), 1)
+        # And a snapshot carries them, to be merged with by a later Retention
+        persistence.snapshot()
+        persistence.close()
+        recovered = Persistence.open(self.directory, fsync=False)
+        self.assert_same_history(recovered.hotel)
+        self.assertEqual(Retention(recovered.hotel).watermark, retention.watermark)
+        self.assertGreater(Retention(recovered.hotel).archive_before(self.start + timedelta(days=80)), 0)
+        self.assertEqual(len(recovered.hotel.bookings.archives), 1)
+        recovered.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
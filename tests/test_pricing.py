@@ -0,0 +1,84 @@
+import random
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Booking, Hotel
+from pricing import DEFAULT_PRICING, RulePricing, Season
+
+
+class TestPricing(unittest.TestCase):
+    def setUp(self):
+        self.standard = Room(101, "standard", 100.0, 2)
+        self.luxury = Room(102, "luxury", 200.0, 3)
+        self.hotel = Hotel("Florida Beach", [self.standard, self.luxury])
+        # 2025-06-02 is a Monday
+        self.pricing = RulePricing(date(2025, 6, 2), 120,
+                                   seasons=[Season(date(2025, 7, 1), date(2025, 9, 1), 1.5),
+                                            Season(date(2025, 6, 2), date(2025, 6, 9), 2.0, "luxury")],
+                                   weekday_multipliers=[1, 1, 1, 1, 1.25, 1.25, 1],
+                                   stay_tiers=[(6, 0.9), (14, 0.8)])
+
+    def brute_force(self, room, start, end):
+        nights = (end - start).days
+        total = 0.0
+        for i in range(nights):
+            day = start + timedelta(days=i)
+            multiplier = 1.0
+            if date(2025, 6, 2) <= day < date(2025, 9, 30):
+                multiplier = [1, 1, 1, 1, 1.25, 1.25, 1][day.weekday()]
+                if date(2025, 7, 1) <= day < date(2025, 9, 1):
+                    multiplier *= 1.5
+                if room.room_type == "luxury" and day < date(2025, 6, 9):
+                    multiplier *= 2.0
+            total += multiplier
+        factor = 0.8 if nights >= 14 else 0.9 if nights >= 6 else 1.0
+        return room.price_per_day * total * factor
+
+    def test_default_policy_is_original_rule(self):
+        self.assertIs(self.standard.pricing, DEFAULT_PRICING)
+        for nights in range(1, 10):
+            expected = nights * 100.0 * (0.9 if nights > 5 else 1)
+            self.assertEqual(DEFAULT_PRICING.quote(self.standard, date(2025, 1, 1), date(2025, 1, 1 + nights)), expected)
+
+    def test_rule_quotes(self):
+        rng = random.Random(2)
+        for _ in range(200):
+            start = date(2025, 5, 20) + timedelta(days=rng.randrange(150))
+            end = start + timedelta(days=rng.randrange(1, 20))
+            for room in (self.standard, self.luxury):
+                self.assertAlmostEqual(self.pricing.quote(room, start, end), self.brute_force(room, start, end))
+                self.assertEqual(self.pricing.quote_days(room, start.toordinal(), end.toordinal()),
+                                 self.pricing.quote(room, start, end))
+                nights = self.pricing.quote_nights(room, start.toordinal(), end.toordinal())
+                self.assertEqual(len(nights), (end - start).days)
+                self.assertAlmostEqual(sum(nights), self.brute_force(room, start, end))
+
+    def test_rule_pricing_with_default_tiers_matches_default(self):
+        pricing = RulePricing(date(2025, 1, 1), 365)
+        for nights in range(1, 10):
+            start, end = date(2025, 3, 1), date(2025, 3, 1 + nights)
+            self.assertEqual(pricing.quote(self.standard, start, end), DEFAULT_PRICING.quote(self.standard, start, end))
+
+    def test_bookings_use_room_policy(self):
+        self.hotel.set_pricing(self.pricing, room_type="luxury")
+        self.assertIs(self.standard.pricing, DEFAULT_PRICING)
+        booking_id = self.hotel.book_room(102, "Ann", date(2025, 6, 6), date(2025, 6, 10))
+        booking = self.hotel.bookings[booking_id]
+        self.assertAlmostEqual(booking.total_price, 200.0 * (2.5 + 2.5 + 2 + 1))
+        self.hotel.update_booking(booking_id, date(2025, 6, 9), date(2025, 6, 10))
+        self.assertAlmostEqual(booking.total_price, 200.0)
+        self.assertAlmostEqual(self.hotel.get_total_income(), 200.0)
+
+    def test_batch_quote(self):
+        self.hotel.set_pricing(self.pricing)
+        ranges = [(date(2025, 6, 2), date(2025, 6, 4)), (date(2025, 7, 1), date(2025, 7, 15))]
+        quotes = self.hotel.quote([101, 102], ranges)
+        self.assertEqual(len(quotes), 2)
+        for room, room_quotes in zip((self.standard, self.luxury), quotes):
+            self.assertEqual(room_quotes, [Booking(None, room, "Guest", start, end).total_price for start, end in ranges])
+        with self.assertRaises(Exception) as context:
+            self.hotel.quote([999], ranges)
+        self.assertEqual(str(context.exception), "Room not found")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import random
+import time
+import unittest
+from datetime import date, timedelta
+from hotel_system import Room, Hotel
+from booking_index import BookingIndex
+from concurrent_hotel import ConcurrentHotel
+from retention import Retention
+
+
+def build(hotel_class=Hotel, seed=4):
+    hotel = hotel_class("Florida Beach", [Room(100 + i, "standard", 100.0 + i, 2) for i in range(5)])
+    rng = random.Random(seed)
+    for _ in range(600):
+        start = date(2024, 1, 1) + timedelta(days=rng.randrange(730))
+        try:
+            hotel.book_room(rng.randrange(100, 105), f"Guest {rng.randrange(40)}",
+                            start, start + timedelta(days=rng.randrange(1, 8)))
+        except Exception:
+            pass
+    return hotel
+
+
+class TestRetention(unittest.TestCase):
+    def setUp(self):
+        self.hotel = build()
+        self.reference = build()
+        self.retention = Retention(self.hotel, keep_days=30)
+
+    def assert_same(self):
+        self.assertEqual(self.hotel.report(), self.reference.report())
+        self.assertEqual(self.hotel.get_total_income(), self.reference.get_total_income())
+        rng = random.Random(7)
+        for _ in range(300):
+            start = date(2023, 12, 1) + timedelta(days=rng.randrange(800))
+            end = start + timedelta(days=rng.randrange(1, 10))
+            self.assertEqual(self.hotel.get_available_rooms(start, end), self.reference.get_available_rooms(start, end))
+        self.hotel.check_aggregates()
+
+    def test_archives_ended_bookings(self):
+        live = len(self.hotel.bookings)
+        archived = self.retention.apply(date(2025, 1, 31))
+        watermark = date(2025, 1, 1).toordinal()
+        self.assertGreater(archived, 0)
+        self.assertEqual(len(self.hotel.bookings), live - archived)
+        self.assertTrue(all(booking.end > watermark for booking in self.hotel.bookings.values()))
+        for room in self.hotel.rooms:
+            self.assertTrue(all(booking.end > watermark for booking in room.bookings))
+            self.assertEqual(len(room.archives), 1)
+        self.assertEqual(self.retention.watermark, date(2025, 1, 1))
+        self.assert_same()
+
+    def test_archived_bookings_are_read_only(self):
+        self.retention.archive_before(date(2025, 1, 1))
+        archived = [booking for booking in self.reference.bookings.values() if booking.end_date <= date(2025, 1, 1)]
+        for original in archived[:50]:
+            booking_id = original.booking_id
+            self.assertNotIn(booking_id, self.hotel.bookings)
+            booking = self.hotel.bookings[booking_id]
+            self.assertIs(booking.room, self.hotel.rooms.get(original.room.number))
+            self.assertEqual((booking.guest_name, booking.start_date, booking.end_date, booking.total_price),
+                             (original.guest_name, original.start_date, original.end_date, original.total_price))
+            self.assertEqual(self.hotel.get_booking_info(booking_id), self.reference.get_booking_info(booking_id))
+        with self.assertRaises(Exception) as context:
+            self.hotel.cancel_booking(archived[0].booking_id)
+        self.assertEqual(str(context.exception), "Booking not found")
+        with self.assertRaises(Exception) as context:
+            self.hotel.book_room(archived[0].room.number, "Zoe", archived[0].start_date, archived[0].end_date)
+        self.assertEqual(str(context.exception), "Room not available for the selected dates")
+
+    def test_runs_merge_into_one_partition(self):
+        total = 0
+        for month in range(1, 13):
+            total += self.retention.archive_before(date(2025, month, 1))
+            # Operations keep going between runs
+            booking_id = self.hotel.book_room(100, "Zoe", date(2026, 1, month), date(2026, 1, month + 1))
+            self.reference.book_room(100, "Zoe", date(2026, 1, month), date(2026, 1, month + 1))
+            self.assertEqual(booking_id, self.reference.next_booking_id - 1)
+        self.assertEqual(len(self.retention.partition), total)
+        self.assertEqual(self.hotel.bookings.archives, [self.retention.partition])
+        self.assertEqual(self.retention.archive_before(date(2024, 6, 1)), 0)
+        self.assertEqual(self.retention.watermark, date(2025, 12, 1))
+        self.assert_same()
+
+    def test_listeners(self):
+        index = BookingIndex(self.hotel)
+        day = next(booking.start_date for booking in self.hotel.bookings.values()
+                   if booking.end_date <= date(2025, 1, 1))
+        self.assertTrue(list(index.check_ins(day)))
+        self.retention.archive_before(date(2025, 1, 1))
+        self.assertEqual(list(index.check_ins(day)), [])
+        self.assertTrue(all(booking.end_date > date(2025, 1, 1) for booking in index.search_guests("guest")))
+
+    def test_concurrent_hotel(self):
+        hotel = build(ConcurrentHotel)
+        self.assertGreater(Retention(hotel).archive_before(date(2025, 6, 1)), 0)
+        self.assertEqual(hotel.report(), self.reference.report())
+        self.assertEqual(hotel.get_total_income(), self.reference.get_total_income())
+        hotel.check_aggregates()
+
+    def test_partition_is_compact(self):
+        self.retention.archive_before(date(2026, 2, 1))
+        partition = self.retention.partition
+        self.assertEqual(len(self.hotel.bookings), 0)
+        self.assertEqual(sorted(booking.booking_id for booking in partition), sorted(self.reference.bookings))
+        self.assertLess(partition.nbytes(), 40 * len(partition))
+
+    def test_iteration_is_linear(self):
+        hotel = Hotel("Florida Beach", [Room(100, "standard", 100.0, 2)])
+        for day in range(20000):
+            hotel.book_room(100, f"Guest {day % 50}", date(2000, 1, 1) + timedelta(days=day),
+                            date(2000, 1, 2) + timedelta(days=day))
+        retention = Retention(hotel)
+        retention.archive_before(date(2060, 1, 1))
+        began = time.perf_counter()
+        bookings = list(retention.partition)
+        self.assertLess(time.perf_counter() - began, 0.5)
+        self.assertEqual([booking.booking_id for booking in bookings], list(range(1, 20001)))
+        self.assertEqual(bookings[-1].guest_name, hotel.bookings[20000].guest_name)
+
+
+if __name__ == '__main__':
+    unittest.main()